@@ -2,8 +2,10 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from config import Config
+from app.replica import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession: leituras de GET vão para a réplica, se houver (app/replica.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 
 def create_app():
@@ -16,8 +18,63 @@ def create_app():
     # importa models depois do db existir
     from app import models  # noqa: F401
 
+    # versões por tabela (ETag/Last-Modified)
+    from app import data_versions
+    data_versions.init_app(app)
+
+    # feed de alterações (change_log -> GET /api/changes)
+    from app import changes
+    changes.init_app(app)
+
+    # teto/orçamentos dos caches em memória (antes de qualquer cache ser criado)
+    from app import registro_caches
+    registro_caches.init_app(app)
+
+    # cache de páginas/consultas invalidado por tags
+    from app.cache import cache
+    cache.init_app(app)
+
+    # réplica de leitura (DATABASE_REPLICA_URL); depois de cache/changes
+    from app import replica
+    replica.init_app(app)
+
+    # latência/SQL por requisição (GET /metrics)
+    from app import metrics
+    metrics.init_app(app)
+
+    # SQL_AUDIT=log|raise: N+1 e orçamento de queries por rota (dev/testes)
+    from app import query_audit
+    query_audit.init_app(app)
+
+    # ?_perfil=1 (admin): cProfile/amostrador + SQL da requisição (/admin/perfis)
+    from app import profiler
+    profiler.init_app(app)
+
     # Blueprints
     from app.routes import bp
     app.register_blueprint(bp)
 
+    from app.api import api_bp
+    app.register_blueprint(api_bp)
+
+    # comando `flask sincronizar-catalogo` (produtos.xlsx -> marcas/produtos)
+    from app import catalogo_db
+    catalogo_db.init_app(app)
+
+    # nome_normalizado dos hospitais + `flask resolver-entidades`
+    from app import entidades
+    entidades.init_app(app)
+
+    # chaves de território dos hospitais (UF/cidade/CEP) + `flask preencher-territorios`
+    from app import territorios
+    territorios.init_app(app)
+
+    # bytecode dos templates em disco (+ comando `flask compilar-templates`)
+    from app import templating
+    templating.init_app(app)
+
+    # gzip/br nas respostas de texto (HTML, CSV, JSON)
+    from app.compression import compress
+    compress.init_app(app)
+
     return app
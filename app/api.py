@@ -0,0 +1,354 @@
+# app/api.py
+"""
+API JSON somente leitura (para o sync do CRM / BI).
+
+  GET /api/hospitais                 -> lista paginada por keyset (?after=<id>&limit=)
+                                        filtros: ?cidade= ?estado= ?q= (parte do nome)
+                                                 ?resposta.<chave>=<valor> (questionário, igualdade)
+                                        projeção: ?fields=id,nome_hospital,contatos,...
+  GET /api/hospitais/batch?ids=1,2,3 -> pacote completo (contatos, dados, produtos)
+  GET /api/hospitais/<id>            -> pacote completo de um hospital
+  GET /api/changes?since=<seq>       -> alterações depois de <seq> (inclui lápides de delete)
+                                        ?limit= ?dados=1 (junta a linha atual de cada registro)
+  GET /api/catalogo.v<hash>.json     -> catálogo completo (imutável, gzip pré-calculado)
+  GET /api/produtos/<id>/equivalentes -> top-k produtos de outras marcas mais próximos em nutrientes
+                                        ?k= ?marca= (só dessa marca)
+"""
+import json
+
+from flask import Blueprint, Response, redirect, request, url_for
+from sqlalchemy import func
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload, undefer
+
+from config import Config
+from app.catalogo import get_bundle
+from app.http_cache import conditional
+from app.models import ChangeLog, Contato, DadosHospital, Hospital, ProdutoHospital
+from app.query_audit import query_budget
+from app.questionario import CHAVES, POR_CHAVE, filtro_resposta
+
+try:  # encoder rápido (opcional)
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+api_bp = Blueprint("api", __name__, url_prefix="/api")
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+CHANGES_DEFAULT_LIMIT = 1000
+CHANGES_MAX_LIMIT = 5000
+MAX_BATCH_IDS = 500
+EQUIVALENTES_DEFAULT_K = 5
+EQUIVALENTES_MAX_K = 50
+
+TODAS_TABELAS = ("hospitais", "contatos", "dados_hospitais", "produtos_hospitais")
+
+
+def _column_keys(model, skip=()):
+    return [a.key for a in sa_inspect(model).column_attrs if a.key not in skip]
+
+
+HOSPITAL_FIELDS = _column_keys(Hospital)
+CONTATO_FIELDS = _column_keys(Contato, skip=("hospital_nome",))
+# o documento de respostas sai "achatado" (uma chave por pergunta), como eram as colunas
+DADOS_FIELDS = _column_keys(DadosHospital, skip=("respostas",)) + list(CHAVES)
+PRODUTO_FIELDS = _column_keys(ProdutoHospital, skip=("nome_hospital",))
+RELATION_FIELDS = ("contatos", "dados", "produtos")
+
+# tabela do change_log -> (model, campos serializados)
+FEED_MODELS = {
+    "hospitais": (Hospital, HOSPITAL_FIELDS),
+    "contatos": (Contato, CONTATO_FIELDS),
+    "dados_hospitais": (DadosHospital, DADOS_FIELDS),
+    "produtos_hospitais": (ProdutoHospital, PRODUTO_FIELDS),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@api_bp.errorhandler(ApiError)
+def _api_error(e: ApiError):
+    return json_response({"erro": e.message}, status=e.status)
+
+
+def json_response(payload, status: int = 200) -> Response:
+    if orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    return Response(body, status=status, mimetype="application/json")
+
+
+def _as_dict(obj, keys):
+    return {k: getattr(obj, k) for k in keys}
+
+
+# ======================================================
+# PARÂMETROS
+# ======================================================
+def _parse_fields():
+    """
+    ?fields=... -> (campos escalares do hospital, relações). Sem fields = tudo.
+    """
+    raw = (request.args.get("fields") or "").strip()
+    if not raw:
+        return list(HOSPITAL_FIELDS), list(RELATION_FIELDS)
+
+    wanted = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in HOSPITAL_FIELDS and f not in RELATION_FIELDS]
+    if unknown:
+        raise ApiError(f"Campos desconhecidos: {', '.join(unknown)}")
+
+    scalars = [f for f in HOSPITAL_FIELDS if f in wanted]
+    if "id" not in scalars:
+        scalars.insert(0, "id")
+    relations = [f for f in RELATION_FIELDS if f in wanted]
+    return scalars, relations
+
+
+def _parse_int(name: str, default=None, minimum=None, maximum=None):
+    raw = (request.args.get(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        v = int(raw)
+    except ValueError:
+        raise ApiError(f"Parâmetro '{name}' deve ser inteiro.")
+    if minimum is not None and v < minimum:
+        raise ApiError(f"Parâmetro '{name}' deve ser >= {minimum}.")
+    if maximum is not None:
+        v = min(v, maximum)
+    return v
+
+
+def _parse_ids():
+    raw = (request.args.get("ids") or "").strip()
+    if not raw:
+        raise ApiError("Informe ?ids=1,2,3")
+    try:
+        ids = list(dict.fromkeys(int(x) for x in raw.split(",") if x.strip()))
+    except ValueError:
+        raise ApiError("Parâmetro 'ids' deve ser uma lista de inteiros separados por vírgula.")
+    if len(ids) > MAX_BATCH_IDS:
+        raise ApiError(f"No máximo {MAX_BATCH_IDS} ids por requisição.")
+    return ids
+
+
+# ======================================================
+# CONSULTAS (sempre com eager loading -> número fixo de queries)
+# ======================================================
+def _hospital_query(scalars, relations):
+    cols = [getattr(Hospital, f) for f in scalars]
+    q = Hospital.query.options(load_only(*cols))
+    if "contatos" in relations:
+        q = q.options(selectinload(Hospital.contatos))
+    if "produtos" in relations:
+        q = q.options(selectinload(Hospital.produtos))
+    if "dados" in relations:
+        q = q.options(joinedload(Hospital.dados).undefer(DadosHospital.respostas))
+    return q
+
+
+def _serialize(h, scalars, relations):
+    d = _as_dict(h, scalars)
+    if "contatos" in relations:
+        d["contatos"] = [_as_dict(c, CONTATO_FIELDS) for c in sorted(h.contatos, key=lambda c: c.id)]
+    if "dados" in relations:
+        d["dados"] = _as_dict(h.dados, DADOS_FIELDS) if h.dados else None
+    if "produtos" in relations:
+        d["produtos"] = [_as_dict(p, PRODUTO_FIELDS) for p in sorted(h.produtos, key=lambda p: p.id)]
+    return d
+
+
+# ======================================================
+# ROTAS
+# ======================================================
+@api_bp.route("/hospitais", methods=["GET"])
+@conditional(tables=TODAS_TABELAS, per_user=False)
+@query_budget(6)
+def listar_hospitais():
+    scalars, relations = _parse_fields()
+    after = _parse_int("after", default=0, minimum=0)
+    limit = _parse_int("limit", default=DEFAULT_LIMIT, minimum=1, maximum=MAX_LIMIT)
+
+    q = _hospital_query(scalars, relations).filter(Hospital.id > after)
+
+    cidade = (request.args.get("cidade") or "").strip()
+    if cidade:
+        q = q.filter(func.lower(Hospital.cidade) == cidade.lower())
+    estado = (request.args.get("estado") or "").strip()
+    if estado:
+        q = q.filter(func.upper(Hospital.estado) == estado.upper())
+    termo = (request.args.get("q") or "").strip()
+    if termo:
+        q = q.filter(Hospital.nome_hospital.ilike(f"%{termo}%"))
+    for nome, valor in request.args.items():
+        if not nome.startswith("resposta."):
+            continue
+        chave = nome[len("resposta."):]
+        if chave not in POR_CHAVE:
+            raise ApiError(f"Pergunta desconhecida: {chave}")
+        q = q.filter(Hospital.dados.has(filtro_resposta(chave, valor.strip())))
+
+    # busca 1 a mais para saber se existe próxima página
+    rows = q.order_by(Hospital.id.asc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return json_response({
+        "items": [_serialize(h, scalars, relations) for h in rows],
+        "next_after": rows[-1].id if has_more and rows else None,
+        "limit": limit,
+    })
+
+
+@api_bp.route("/hospitais/batch", methods=["GET"])
+@conditional(tables=TODAS_TABELAS, per_user=False)
+@query_budget(6)
+def batch_hospitais():
+    ids = _parse_ids()
+    scalars, relations = _parse_fields()
+
+    rows = _hospital_query(scalars, relations).filter(Hospital.id.in_(ids)).all()
+    by_id = {h.id: h for h in rows}
+
+    return json_response({
+        "items": [_serialize(by_id[i], scalars, relations) for i in ids if i in by_id],
+        "missing": [i for i in ids if i not in by_id],
+    })
+
+
+@api_bp.route("/hospitais/<int:hospital_id>", methods=["GET"])
+@conditional(tables=TODAS_TABELAS, per_user=False)
+@query_budget(6)
+def detalhe_hospital(hospital_id):
+    scalars, relations = _parse_fields()
+    h = _hospital_query(scalars, relations).filter(Hospital.id == hospital_id).first()
+    if not h:
+        raise ApiError("Hospital não encontrado.", status=404)
+    return json_response(_serialize(h, scalars, relations))
+
+
+# ======================================================
+# FEED DE ALTERAÇÕES (sync incremental)
+# ======================================================
+@api_bp.route("/changes", methods=["GET"])
+@conditional(tables=["change_log"], per_user=False)
+@query_budget(6)
+def listar_alteracoes():
+    """
+    Página do change_log depois de ?since=<seq> (ordem de seq, pela PK).
+    O cliente guarda next_since e repete enquanto has_more.
+    """
+    since = _parse_int("since", default=0, minimum=0)
+    limit = _parse_int("limit", default=CHANGES_DEFAULT_LIMIT, minimum=1, maximum=CHANGES_MAX_LIMIT)
+    com_dados = (request.args.get("dados") or "").strip() in ("1", "true", "sim")
+
+    rows = (
+        ChangeLog.query
+        .filter(ChangeLog.seq > since)
+        .order_by(ChangeLog.seq.asc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # linha atual de cada registro alterado: uma consulta por tabela
+    atuais = {}
+    if com_dados:
+        ids_por_tabela = {}
+        for c in rows:
+            if c.op != "D" and c.table_name in FEED_MODELS:
+                ids_por_tabela.setdefault(c.table_name, set()).add(c.row_id)
+        for table, ids in ids_por_tabela.items():
+            model, fields = FEED_MODELS[table]
+            q = model.query.filter(model.id.in_(ids))
+            if model is DadosHospital:
+                q = q.options(undefer(DadosHospital.respostas))
+            for obj in q.all():
+                atuais[(table, obj.id)] = _as_dict(obj, fields)
+
+    items = []
+    for c in rows:
+        item = {
+            "seq": c.seq,
+            "tabela": c.table_name,
+            "id": c.row_id,
+            "hospital_id": c.hospital_id,
+            "op": c.op,
+            "em": c.changed_at.isoformat() if c.changed_at else None,
+        }
+        if com_dados:
+            # None = apagado depois desta alteração (vai aparecer a lápide mais à frente)
+            item["dados"] = atuais.get((c.table_name, c.row_id))
+        items.append(item)
+
+    return json_response({
+        "items": items,
+        "next_since": rows[-1].seq if rows else since,
+        "has_more": has_more,
+        "limit": limit,
+    })
+
+
+# ======================================================
+# CATÁLOGO (pacote versionado)
+# ======================================================
+CATALOGO_IMUTAVEL = "public, max-age=31536000, immutable"
+
+
+@api_bp.route("/produtos/<int:produto_id>/equivalentes", methods=["GET"])
+@conditional(tables=["produtos"], per_user=False)
+@query_budget(4)
+def equivalentes_produto(produto_id):
+    # numpy só carrega quando alguém pede equivalentes
+    from app.equivalencia import equivalentes
+
+    k = _parse_int("k", EQUIVALENTES_DEFAULT_K, minimum=1, maximum=EQUIVALENTES_MAX_K)
+    marca = (request.args.get("marca") or "").strip() or None
+    resultado = equivalentes(produto_id, k, marca)
+    if resultado is None:
+        raise ApiError("Produto não encontrado no catálogo.", status=404)
+    return json_response(resultado)
+
+
+@api_bp.route("/catalogo.json", methods=["GET"])
+def catalogo_atual():
+    """
+    Endereço estável: redireciona para a versão atual (que pode ser cacheada para sempre).
+    """
+    bundle = get_bundle(Config.DATA_DIR)
+    resp = redirect(url_for("api.catalogo_bundle", version=bundle.version))
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@api_bp.route("/catalogo.v<version>.json", methods=["GET"])
+def catalogo_bundle(version):
+    bundle = get_bundle(Config.DATA_DIR)
+    if version != bundle.version:
+        # página antiga pedindo versão antiga: manda para a atual
+        return catalogo_atual()
+
+    use_gzip = request.accept_encodings["gzip"] > 0
+    etag = f"{bundle.version}-gz" if use_gzip else bundle.version
+
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(bundle.gzip_bytes if use_gzip else bundle.json_bytes, mimetype="application/json")
+        if use_gzip:
+            resp.headers["Content-Encoding"] = "gzip"
+
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = CATALOGO_IMUTAVEL
+    resp.vary.add("Accept-Encoding")
+    return resp
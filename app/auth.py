@@ -1,6 +1,7 @@
+import hmac
 import os
 from functools import wraps
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, session
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -21,6 +22,28 @@ def admin_required(f):
     return decorated
 
 
+def admin_or_token_required(env_var: str):
+    """
+    Admin logado OU "Authorization: Bearer <token>" igual à variável de ambiente
+    (para coletores como o Prometheus, que não fazem login). Sem a variável,
+    só o admin entra. Fora isso: 401 (não redireciona para o login).
+    """
+    def deco(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if session.get("is_admin"):
+                return f(*args, **kwargs)
+
+            token = (os.getenv(env_var) or "").strip()
+            auth = request.headers.get("Authorization", "")
+            if auth.startswith("Bearer ") and token and hmac.compare_digest(auth[7:].strip(), token):
+                return f(*args, **kwargs)
+            return Response("token inválido\n" if auth.startswith("Bearer ") else "não autorizado\n",
+                            status=401, mimetype="text/plain", headers={"WWW-Authenticate": "Bearer"})
+        return decorated
+    return deco
+
+
 @auth_bp.route("/admin/login", methods=["GET", "POST"])
 def admin_login():
     if request.method == "POST":
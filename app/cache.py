@@ -0,0 +1,375 @@
+# app/cache.py
+"""
+Cache do lado do servidor para páginas renderizadas e resultados de consultas,
+invalidado por TAGS.
+
+Tags usadas:
+  table:<tabela>    -> qualquer mudança na tabela (listas)
+  hospital:<id>     -> mudança em qualquer dado daquele hospital
+  hospital:*        -> operação em massa que não sabemos quais hospitais atingiu
+
+Cada tag tem um "token" no backend. A entrada guarda os tokens das suas tags
+no momento em que foi calculada; invalidar = trocar o token da tag.
+Os tokens são lidos ANTES de calcular o valor, então uma gravação concorrente
+nunca deixa uma entrada velha marcada como nova.
+
+Os tokens do backend lru só existem no processo que gravou. Por isso a entrada
+guarda também as versões das tabelas das suas tags (data_versions, no banco,
+iguais para todos os workers): gravou em outro worker -> versão mudou -> miss.
+As versões são lidas pela sessão, do mesmo banco que a página (ver
+app/replica.py), e são as mesmas que a ETag da requisição usa.
+
+Backends:
+  lru        -> em memória, por processo (padrão); cache "paginas" do app/registro_caches.py
+  filesystem -> diretório compartilhado entre os workers do gunicorn
+  null       -> desliga o cache
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import distinct, event, select
+
+from app import db
+from app.data_versions import TRACKED_TABLES, current_versions
+from app.registro_caches import registro
+
+_MISSING = object()
+
+# tabelas que mudam os dados de um hospital (tags hospital:<id> e hospital:*)
+HOSPITAL_TABLES = ("hospitais", "contatos", "dados_hospitais", "produtos_hospitais")
+
+
+# ======================================================
+# BACKENDS
+# ======================================================
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, entry, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def tag_tokens(self, tags) -> Dict[str, str]:
+        return {t: "" for t in tags}
+
+    def bump_tags(self, tags):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUBackend:
+    """
+    Em memória (um por worker). Os tokens valem só para o próprio processo;
+    gravações de outros workers invalidam pelas versões de data_versions (Cache.get).
+    As entradas ficam no cache "paginas" do registro (orçamento de memória + LRU;
+    orçamento em CACHE_ORCAMENTOS_MB["paginas"]).
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._data = registro.registrar(
+            "paginas", orcamento_mb=64, max_entradas=max_entries,
+            descricao="páginas e consultas (cache.get_or_set)",
+        )
+        self._data.max_entradas = max_entries
+        self._tags: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def set(self, key, entry, ttl):
+        self._data.set(key, entry, ttl=ttl)
+
+    def delete(self, key):
+        self._data.delete(key)
+
+    def tag_tokens(self, tags) -> Dict[str, str]:
+        with self._lock:
+            return {t: self._tags.get(t, "") for t in tags}
+
+    def bump_tags(self, tags):
+        with self._lock:
+            for t in tags:
+                self._tags[t] = uuid.uuid4().hex
+
+    def clear(self):
+        self._data.clear()
+        with self._lock:
+            self._tags.clear()
+
+
+class FileSystemBackend:
+    """
+    Um arquivo por entrada e um por tag, gravados de forma atômica (os.replace).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._entries = os.path.join(directory, "entries")
+        self._tags = os.path.join(directory, "tags")
+        os.makedirs(self._entries, exist_ok=True)
+        os.makedirs(self._tags, exist_ok=True)
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _write(self, path: str, data: bytes):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def get(self, key):
+        path = os.path.join(self._entries, self._name(key))
+        try:
+            with open(path, "rb") as f:
+                expires, entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires and expires < time.time():
+            self.delete(key)
+            return None
+        return entry
+
+    def set(self, key, entry, ttl):
+        expires = time.time() + ttl if ttl else 0
+        data = pickle.dumps((expires, entry), protocol=pickle.HIGHEST_PROTOCOL)
+        self._write(os.path.join(self._entries, self._name(key)), data)
+
+    def delete(self, key):
+        try:
+            os.unlink(os.path.join(self._entries, self._name(key)))
+        except OSError:
+            pass
+
+    def tag_tokens(self, tags) -> Dict[str, str]:
+        out = {}
+        for t in tags:
+            try:
+                with open(os.path.join(self._tags, self._name(t)), "r") as f:
+                    out[t] = f.read()
+            except OSError:
+                out[t] = ""
+        return out
+
+    def bump_tags(self, tags):
+        for t in tags:
+            self._write(os.path.join(self._tags, self._name(t)), uuid.uuid4().hex.encode("ascii"))
+
+    def clear(self):
+        for folder in (self._entries, self._tags):
+            for name in os.listdir(folder):
+                try:
+                    os.unlink(os.path.join(folder, name))
+                except OSError:
+                    pass
+
+
+# ======================================================
+# CACHE
+# ======================================================
+def _tables_of(tags) -> list:
+    tables = set()
+    for tag in tags:
+        if tag.startswith("table:"):
+            tables.add(tag[len("table:"):])
+        elif tag.startswith("hospital:"):
+            tables.update(HOSPITAL_TABLES)
+    return sorted(t for t in tables if t in TRACKED_TABLES)
+
+
+def _versions(tables) -> Dict[str, int]:
+    return {t: v[0] for t, v in current_versions(tables).items()}
+
+
+class Cache:
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.default_ttl = 0
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CACHE_BACKEND", os.environ.get("CACHE_BACKEND", "lru"))
+        app.config.setdefault("CACHE_DIR", os.environ.get("CACHE_DIR") or os.path.join(app.instance_path, "cache"))
+        app.config.setdefault("CACHE_LRU_MAX_ENTRIES", 512)
+        app.config.setdefault("CACHE_DEFAULT_TTL", 3600)
+
+        kind = (app.config["CACHE_BACKEND"] or "lru").lower()
+        if kind == "filesystem":
+            self.backend = FileSystemBackend(app.config["CACHE_DIR"])
+        elif kind == "null":
+            self.backend = NullBackend()
+        else:
+            self.backend = LRUBackend(app.config["CACHE_LRU_MAX_ENTRIES"])
+        self.default_ttl = app.config["CACHE_DEFAULT_TTL"]
+
+        _install_invalidation_listeners()
+
+    def get(self, key: str, default=None):
+        entry = self.backend.get(key)
+        if entry is None:
+            return default
+        try:
+            value, tokens, versions = entry
+        except (TypeError, ValueError):  # formato antigo (arquivos do filesystem)
+            self.backend.delete(key)
+            return default
+        if tokens and self.backend.tag_tokens(tokens.keys()) != tokens:
+            self.backend.delete(key)
+            return default
+        if versions and _versions(versions.keys()) != versions:
+            # sem delete: quem lê de uma réplica atrasada pode estar ATRÁS da entrada;
+            # o set que vem depois do miss sobrescreve
+            return default
+        return value
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], tags: Iterable[str] = (), ttl: Optional[int] = None):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        # tokens e versões lidos ANTES de calcular (ver docstring do módulo)
+        tags = list(tags)
+        tokens = self.backend.tag_tokens(tags)
+        versions = _versions(_tables_of(tags))
+        value = compute()
+        self.backend.set(key, (value, tokens, versions), self.default_ttl if ttl is None else ttl)
+        return value
+
+    def invalidate(self, *tags: str):
+        if tags:
+            self.backend.bump_tags(tags)
+
+    def clear(self):
+        self.backend.clear()
+
+
+cache = Cache()
+
+
+# ======================================================
+# INVALIDAÇÃO AUTOMÁTICA (eventos do SQLAlchemy)
+# ======================================================
+_listeners_installed = False
+
+
+def _hospital_id_of(obj) -> Optional[int]:
+    if obj.__table__.name == "hospitais":
+        return obj.id
+    return getattr(obj, "hospital_id", None)
+
+
+def _tags_for_objects(objs) -> set:
+    tags = set()
+    for obj in objs:
+        table = getattr(obj, "__table__", None)
+        if table is None:
+            continue
+        tags.add(f"table:{table.name}")
+        hid = _hospital_id_of(obj)
+        if hid:
+            tags.add(f"hospital:{hid}")
+    return tags
+
+
+def _after_flush(session, flush_context):
+    objs = list(session.new) + list(session.deleted)
+    objs += [o for o in session.dirty if session.is_modified(o, include_collections=False)]
+    tags = _tags_for_objects(objs)
+    if tags:
+        session.info.setdefault("_cache_tags", set()).update(tags)
+
+
+def _bulk_tags(state) -> set:
+    mapper = state.bind_mapper
+    if mapper is None:
+        return set()
+    table = mapper.local_table
+    tags = {f"table:{table.name}"}
+
+    col_name = "id" if table.name == "hospitais" else "hospital_id"
+    if col_name not in table.c:
+        return tags
+
+    if state.is_insert:
+        params = state.parameters
+        rows = params if isinstance(params, (list, tuple)) else [params or {}]
+        ids = {r.get(col_name) for r in rows if isinstance(r, dict)}
+        if None in ids or not ids:
+            tags.add("hospital:*")
+        tags.update(f"hospital:{i}" for i in ids if i is not None)
+        return tags
+
+    where = state.statement.whereclause
+    if where is None:
+        tags.add("hospital:*")
+        return tags
+
+    # quais hospitais o UPDATE/DELETE vai atingir (consulta antes de executar)
+    col = getattr(mapper.class_, col_name)
+    ids = state.session.execute(select(distinct(col)).where(where)).scalars().all()
+    tags.update(f"hospital:{i}" for i in ids if i is not None)
+    return tags
+
+
+def _do_orm_execute(state):
+    # só coleta; quem executa o statement é app/data_versions.py
+    if state.is_insert or state.is_update or state.is_delete:
+        tags = _bulk_tags(state)
+        if tags:
+            state.session.info.setdefault("_cache_tags", set()).update(tags)
+    return None
+
+
+def _after_commit(session):
+    tags = session.info.pop("_cache_tags", None)
+    if tags:
+        cache.invalidate(*tags)
+
+
+def _after_rollback(session):
+    session.info.pop("_cache_tags", None)
+
+
+def _install_invalidation_listeners():
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(db.session, "after_flush", _after_flush)
+    # insert=True: precisa rodar antes do listener que executa o statement
+    event.listen(db.session, "do_orm_execute", _do_orm_execute, insert=True)
+    event.listen(db.session, "after_commit", _after_commit)
+    event.listen(db.session, "after_rollback", _after_rollback)
+    _listeners_installed = True
+
+
+def hospital_tags(hospital_id: int):
+    """
+    Tags para qualquer coisa que dependa dos dados de UM hospital.
+    """
+    return [f"hospital:{hospital_id}", "hospital:*"]
@@ -0,0 +1,57 @@
+# app/catalogo.py
+"""
+Pacote versionado do catálogo (data/produtos.xlsx) para o formulário de produtos.
+
+O Excel é lido UMA vez por versão do arquivo (mtime); o JSON e o gzip são
+pré-calculados e a URL leva o hash do conteúdo (/api/catalogo.v<hash>.json),
+então o navegador pode guardar para sempre (immutable).
+"""
+import gzip
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.excel_loader import load_catalogo_completo_from_produtos_excel, versao_fonte
+from app.registro_caches import registro
+
+_lock = threading.Lock()
+_CACHE = registro.registrar("catalogo", orcamento_mb=32, max_entradas=1, descricao="pacote JSON/gzip do catálogo")
+
+
+class CatalogoBundle:
+    __slots__ = ("version", "marcas", "data", "nomes_por_marca", "json_bytes", "gzip_bytes")
+
+    def __init__(self, marcas: List[Dict[str, Any]]):
+        self.marcas = [m["marca"] for m in marcas]
+        self.data = marcas
+        # {marca: {produto}} para validar formulários sem reler o Excel
+        self.nomes_por_marca = {m["marca"]: {p["produto"] for p in m["produtos"]} for m in marcas}
+
+        payload = {"marcas": marcas}
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        self.version = hashlib.sha256(raw).hexdigest()[:16]
+
+        # o hash vai junto no corpo (útil para debug no navegador)
+        payload["versao"] = self.version
+        self.json_bytes = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.gzip_bytes = gzip.compress(self.json_bytes, compresslevel=9, mtime=0)
+
+
+def _file_key(data_dir: str) -> Optional[Tuple[str, float]]:
+    # produtos.xlsx, produtos.csv ou a pasta produtos/ (um CSV por marca)
+    return versao_fonte(data_dir, "produtos", abas=True)
+
+
+def get_bundle(data_dir: str = "data") -> CatalogoBundle:
+    """
+    Devolve o pacote atual (recalcula só se o produtos.xlsx mudou).
+    """
+    key = (data_dir, _file_key(data_dir))
+    bundle = _CACHE.get(key)
+    if bundle is not None:
+        return bundle
+
+    # um worker lê o Excel por vez; quem esperou acha o pacote pronto
+    with _lock:
+        return _CACHE.get_or_set(key, lambda: CatalogoBundle(load_catalogo_completo_from_produtos_excel(data_dir)))
@@ -0,0 +1,264 @@
+# app/catalogo_db.py
+"""
+Catálogo de produtos no banco (tabelas marcas / produtos).
+
+data/produtos.xlsx continua sendo a fonte: `sincronizar_catalogo` faz upsert
+em massa das marcas e produtos (um INSERT ... ON CONFLICT por tabela) e depois
+liga os produtos dos hospitais ao catálogo (ProdutoHospital.produto_id),
+casando marca + nome normalizados (sem acento, maiúsculo, espaços colapsados).
+
+Com o vínculo, relatórios e agregações viram JOIN no SQL, sem reler o Excel.
+
+Para sincronizar (ex.: depois de trocar o produtos.xlsx):
+    flask --app manage sincronizar-catalogo
+ou o botão no painel admin.
+"""
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, update
+
+from app import db
+from app.models import Marca, Produto, ProdutoHospital
+
+# colunas copiadas da planilha para a tabela produtos
+CAMPOS_CATALOGO = (
+    "embalagem", "referencia", "kcal", "ptn", "lip", "fibras",
+    "sodio", "ferro", "potassio", "vit_b12", "gordura_saturada",
+)
+
+_RE_ESPACOS = re.compile(r"\s+")
+_RE_PONTUACAO = re.compile(r"[^\w ]")
+_RE_NAO_DIGITO = re.compile(r"\D")
+
+
+def chave_nome(valor) -> str:
+    """
+    "Nestlé  nutren 1.0 " -> "NESTLE NUTREN 1.0"
+    """
+    s = unicodedata.normalize("NFKD", str(valor or ""))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return _RE_ESPACOS.sub(" ", s).strip().upper()
+
+
+def chave_cidade(cidade) -> str:
+    """
+    "São  Paulo " -> "SAO PAULO"; "Sta. Bárbara d'Oeste" -> "STA BARBARA DOESTE"; vazia -> ""
+    (a mesma chave nos territórios e na resolução de entidades)
+    """
+    return chave_nome(_RE_PONTUACAO.sub("", str(cidade or "")))
+
+
+def prefixo_cep(cep) -> Optional[str]:
+    """
+    "01310-100" -> "01310"; menos de 5 dígitos -> None
+    """
+    digitos = _RE_NAO_DIGITO.sub("", str(cep or ""))
+    return digitos[:5] if len(digitos) >= 5 else None
+
+
+# ======================================================
+# UPSERT EM MASSA
+# ======================================================
+def _upsert(model, rows: List[Dict], chaves: Tuple[str, ...], atualizar: Tuple[str, ...]):
+    if not rows:
+        return
+
+    dialeto = db.session.get_bind().dialect.name
+    if dialeto in ("postgresql", "sqlite"):
+        if dialeto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as insert_dialeto
+        else:
+            from sqlalchemy.dialects.sqlite import insert as insert_dialeto
+        stmt = insert_dialeto(model)
+        stmt = stmt.on_conflict_do_update(index_elements=list(chaves), set_={c: stmt.excluded[c] for c in atualizar})
+        db.session.execute(stmt, rows)
+        return
+
+    # outros bancos: separa o que já existe (1 SELECT) e faz insert/update em massa
+    colunas = [getattr(model, c) for c in chaves]
+    existentes = {tuple(r[1:]): r[0] for r in db.session.query(model.id, *colunas).all()}
+    novos, alterados = [], []
+    for r in rows:
+        pk = existentes.get(tuple(r[c] for c in chaves))
+        if pk is None:
+            novos.append(r)
+        else:
+            alterados.append({"id": pk, **{c: r[c] for c in atualizar}})
+    if novos:
+        db.session.execute(insert(model), novos)
+    if alterados:
+        db.session.execute(update(model), alterados)
+
+
+# ======================================================
+# ÍNDICE (marca, produto) -> produto_id
+# ======================================================
+class IndiceCatalogo:
+    """
+    Carrega o catálogo do banco numa consulta e resolve nomes das planilhas/formulários.
+    """
+    __slots__ = ("por_marca", "por_nome")
+
+    def __init__(self):
+        rows = (
+            db.session.query(Produto.id, Produto.chave, Marca.chave)
+            .join(Marca, Produto.marca_id == Marca.id)
+            .all()
+        )
+        self.por_marca: Dict[Tuple[str, str], int] = {}
+        por_nome: Dict[str, set] = {}
+        for pid, chave_produto, chave_marca in rows:
+            self.por_marca[(chave_marca, chave_produto)] = pid
+            por_nome.setdefault(chave_produto, set()).add(pid)
+        # sem marca (ou marca com outro nome): só vale se o nome for único no catálogo
+        self.por_nome: Dict[str, int] = {k: next(iter(v)) for k, v in por_nome.items() if len(v) == 1}
+
+    def resolver(self, marca, produto) -> Optional[int]:
+        chave_produto = chave_nome(produto)
+        if not chave_produto:
+            return None
+        pid = self.por_marca.get((chave_nome(marca), chave_produto))
+        if pid is None:
+            pid = self.por_nome.get(chave_produto)
+        return pid
+
+
+def resolver_produto_id(marca, produto) -> Optional[int]:
+    """
+    produto_id de UM item (formulário); None se não estiver no catálogo.
+    """
+    chave_produto = chave_nome(produto)
+    if not chave_produto:
+        return None
+    ids = (
+        db.session.query(Produto.id, Marca.chave)
+        .join(Marca, Produto.marca_id == Marca.id)
+        .filter(Produto.chave == chave_produto)
+        .all()
+    )
+    chave_marca = chave_nome(marca)
+    for pid, marca_do_item in ids:
+        if marca_do_item == chave_marca:
+            return pid
+    return ids[0][0] if len(ids) == 1 else None
+
+
+# ======================================================
+# SINCRONIZAÇÃO
+# ======================================================
+def vincular_produtos_hospitais(indice: Optional[IndiceCatalogo] = None) -> int:
+    """
+    Preenche produto_id das linhas ainda sem vínculo. Devolve quantas ligou.
+    Não faz commit.
+    """
+    indice = indice or IndiceCatalogo()
+    pendentes = (
+        db.session.query(ProdutoHospital.id, ProdutoHospital.marca_planilha, ProdutoHospital.produto)
+        .filter(ProdutoHospital.produto_id.is_(None))
+        .all()
+    )
+    alteracoes = []
+    for ph_id, marca, produto in pendentes:
+        pid = indice.resolver(marca, produto)
+        if pid is not None:
+            alteracoes.append({"id": ph_id, "produto_id": pid})
+    if alteracoes:
+        # UPDATE em massa pela PK (executemany)
+        db.session.execute(update(ProdutoHospital), alteracoes)
+    return len(alteracoes)
+
+
+def sincronizar_catalogo(data_dir: str) -> Dict[str, int]:
+    """
+    produtos.xlsx -> marcas/produtos (upsert) -> vínculo dos produtos dos hospitais.
+    Produtos que saíram da planilha ficam no banco (podem estar ligados a hospitais).
+    """
+    from app.catalogo import get_bundle
+
+    catalogo = get_bundle(data_dir).data
+
+    marcas = {}
+    for m in catalogo:
+        chave = chave_nome(m["marca"])
+        if chave:
+            marcas[chave] = {"nome": m["marca"].strip(), "chave": chave}
+    _upsert(Marca, list(marcas.values()), ("chave",), ("nome",))
+
+    ids_marca = dict(db.session.query(Marca.chave, Marca.id).all())
+
+    produtos = {}
+    for m in catalogo:
+        marca_id = ids_marca.get(chave_nome(m["marca"]))
+        if marca_id is None:
+            continue
+        for p in m["produtos"]:
+            chave = chave_nome(p.get("produto"))
+            if not chave:
+                continue
+            # nome repetido na mesma aba: vale a primeira linha (igual ao formulário)
+            produtos.setdefault((marca_id, chave), {
+                "marca_id": marca_id,
+                "nome": str(p["produto"]).strip(),
+                "chave": chave,
+                **{c: (p.get(c) or "") for c in CAMPOS_CATALOGO},
+            })
+    _upsert(Produto, list(produtos.values()), ("marca_id", "chave"), ("nome",) + CAMPOS_CATALOGO)
+
+    vinculados = vincular_produtos_hospitais()
+    db.session.commit()
+
+    return {
+        "marcas": len(marcas),
+        "produtos": len(produtos),
+        "vinculados": vinculados,
+        "sem_vinculo": db.session.query(func.count(ProdutoHospital.id)).filter(ProdutoHospital.produto_id.is_(None)).scalar(),
+    }
+
+
+# ======================================================
+# AGREGAÇÕES
+# ======================================================
+def ranking_produtos(limite: int = 20) -> List[Dict]:
+    """
+    Produtos do catálogo mais presentes nos hospitais (um GROUP BY com JOIN).
+    """
+    rows = (
+        db.session.query(
+            Marca.nome,
+            Produto.nome,
+            Produto.embalagem,
+            func.count(ProdutoHospital.hospital_id.distinct()),
+            func.coalesce(func.sum(ProdutoHospital.quantidade), 0),
+        )
+        .join(Produto, ProdutoHospital.produto_id == Produto.id)
+        .join(Marca, Produto.marca_id == Marca.id)
+        .group_by(Produto.id, Marca.nome, Produto.nome, Produto.embalagem)
+        .order_by(func.count(ProdutoHospital.hospital_id.distinct()).desc(), Produto.nome.asc())
+        .limit(limite)
+        .all()
+    )
+    return [
+        {"marca": marca, "produto": nome, "embalagem": embalagem, "hospitais": int(hospitais), "quantidade": int(qtd)}
+        for marca, nome, embalagem, hospitais, qtd in rows
+    ]
+
+
+def init_app(app):
+    app.cli.add_command(sincronizar_catalogo_cmd)
+
+
+@click.command("sincronizar-catalogo")
+@with_appcontext
+def sincronizar_catalogo_cmd():
+    """Atualiza marcas/produtos a partir do produtos.xlsx e liga os produtos dos hospitais."""
+    from config import Config
+
+    r = sincronizar_catalogo(Config.DATA_DIR)
+    click.echo(
+        f"{r['marcas']} marcas, {r['produtos']} produtos | "
+        f"{r['vinculados']} produtos de hospitais ligados, {r['sem_vinculo']} sem correspondência"
+    )
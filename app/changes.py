@@ -0,0 +1,148 @@
+# app/changes.py
+"""
+Feed incremental de alterações (tabela change_log) para o sync do BI / CRM.
+
+Toda escrita em hospitais, contatos, dados_hospitais e produtos_hospitais
+vira uma linha em change_log (seq, tabela, id, hospital_id, op), gravada na
+MESMA transação, logo antes do commit:
+  - flush do ORM (add/alteração/delete)        -> after_flush
+  - insert/update/delete em massa (Query.delete,
+    insert(Model) com executemany, update por PK) -> do_orm_execute
+    (no insert, os ids vêm do RETURNING do próprio INSERT)
+Deletes ficam como lápide (op="D").
+
+O seq é monotônico na ordem de COMMIT: antes de gravar, a transação
+incrementa a linha "change_log" de data_versions (trava a linha no Postgres
+até o commit). Assim um leitor de /api/changes?since=<seq> nunca vê um seq
+maior antes de um menor ficar visível.
+"""
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event, insert, select
+
+from app import db
+from app.data_versions import bump_versions
+from app.models import ChangeLog
+
+# tabelas com feed de alterações
+FEED_TABLES = ("hospitais", "contatos", "dados_hospitais", "produtos_hospitais")
+
+_listeners_installed = False
+
+
+def _hospital_col(table):
+    return table.c.id if table.name == "hospitais" else table.c.hospital_id
+
+
+def _pendentes(session) -> List[Tuple[str, int, int, str]]:
+    return session.info.setdefault("_changes_pendentes", [])
+
+
+# ======================================================
+# COLETA
+# ======================================================
+def _after_flush(session, flush_context):
+    # aqui new/dirty/deleted ainda mostram o estado de antes do flush, mas os ids já existem
+    pend = _pendentes(session)
+    for objs, op in ((session.new, "I"), (session.deleted, "D")):
+        for obj in objs:
+            table = obj.__table__.name
+            if table in FEED_TABLES:
+                pend.append((table, obj.id, obj.id if table == "hospitais" else obj.hospital_id, op))
+    for obj in session.dirty:
+        table = obj.__table__.name
+        if table in FEED_TABLES and session.is_modified(obj, include_collections=False):
+            pend.append((table, obj.id, obj.id if table == "hospitais" else obj.hospital_id, "U"))
+
+
+def _do_orm_execute(state):
+    # só coleta; quem executa o statement é app/data_versions.py
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    mapper = state.bind_mapper
+    if mapper is None or mapper.local_table.name not in FEED_TABLES:
+        return None
+
+    table = mapper.local_table
+    session = state.session
+
+    if state.is_insert:
+        # os ids só existem depois: pede de volta ao próprio INSERT (RETURNING), o que
+        # não pega linhas de outras transações. invoke_statement segue para os próximos
+        # listeners (data_versions executa); o resultado volta ao chamador congelado.
+        model = mapper.class_
+        cols = [model.id] if table.name == "hospitais" else [model.id, model.hospital_id]
+        pedidas = len(state.statement.returning_column_descriptions)  # RETURNING do próprio chamador
+        frozen = state.invoke_statement(statement=state.statement.returning(*cols)).freeze()
+        _pendentes(session).extend(
+            (table.name, row[pedidas], row[-1], "I") for row in frozen().tuples()
+        )
+        # o chamador recebe só as colunas que pediu
+        return frozen().columns(*range(pedidas)) if pedidas else frozen()
+
+    # UPDATE/DELETE: quais linhas serão atingidas (consulta antes de executar)
+    params = state.parameters
+    if isinstance(params, (list, tuple)):
+        # update em massa pela PK
+        ids = [p["id"] for p in params if isinstance(p, dict) and "id" in p]
+        q = select(table.c.id, _hospital_col(table)).where(table.c.id.in_(ids)) if ids else None
+    else:
+        q = select(table.c.id, _hospital_col(table))
+        if state.statement.whereclause is not None:
+            q = q.where(state.statement.whereclause)
+    if q is None:
+        return None
+
+    op = "D" if state.is_delete else "U"
+    _pendentes(session).extend((table.name, rid, hid, op) for rid, hid in session.execute(q).all())
+    return None
+
+
+# ======================================================
+# GRAVAÇÃO
+# ======================================================
+def _before_commit(session):
+    if not session.in_transaction():
+        return
+    # o commit ainda faria um último flush depois deste evento: antecipa
+    session.flush()
+
+    pend = session.info.pop("_changes_pendentes", None)
+    if not pend:
+        return
+
+    conn = session.connection()
+
+    # uma linha por registro: vale a última operação ("I" seguido de "U" continua "I")
+    ultimas: Dict[Tuple[str, int], Tuple[int, str]] = {}
+    for table, rid, hid, op in pend:
+        anterior = ultimas.get((table, rid))
+        if anterior and anterior[1] == "I" and op == "U":
+            op = "I"
+        ultimas.pop((table, rid), None)
+        ultimas[(table, rid)] = (hid, op)
+
+    # trava antes de pegar os seqs: seq em ordem de commit
+    bump_versions(conn, ["change_log"])
+    now = datetime.utcnow()
+    conn.execute(insert(ChangeLog.__table__), [
+        {"table_name": table, "row_id": rid, "hospital_id": hid, "op": op, "changed_at": now}
+        for (table, rid), (hid, op) in ultimas.items()
+    ])
+
+
+def _after_rollback(session):
+    session.info.pop("_changes_pendentes", None)
+
+
+def init_app(app):
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(db.session, "after_flush", _after_flush)
+    # insert=True: precisa rodar antes do listener que executa o statement
+    event.listen(db.session, "do_orm_execute", _do_orm_execute, insert=True)
+    event.listen(db.session, "before_commit", _before_commit)
+    event.listen(db.session, "after_rollback", _after_rollback)
+    _listeners_installed = True
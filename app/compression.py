@@ -0,0 +1,186 @@
+# app/compression.py
+"""
+Compressão das respostas (gzip e, se o pacote `brotli` estiver instalado, br).
+
+- negocia pelo Accept-Encoding do navegador
+- só comprime tipos de texto (HTML, CSV, JSON, ...) e acima de um tamanho mínimo
+- respostas em streaming (generators) são comprimidas em streaming
+- respostas com ETag guardam o corpo comprimido num cache pequeno (LRU por bytes):
+  um artefato "quente" é comprimido uma vez, não a cada requisição
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+from flask import request
+
+try:  # brotli é opcional
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    "text/html",
+    "text/css",
+    "text/csv",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+
+
+class _CompressedCache:
+    """
+    LRU limitado por número de entradas e por bytes.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            body = self._data.get(key)
+            if body is not None:
+                self._data.move_to_end(key)
+            return body
+
+    def set(self, key, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._data[key] = body
+            self._bytes += len(body)
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+class Compress:
+    def __init__(self, app=None):
+        self.cache: Optional[_CompressedCache] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("COMPRESS_ENABLED", True)
+        app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+        app.config.setdefault("COMPRESS_MIMETYPES", DEFAULT_MIMETYPES)
+        app.config.setdefault("COMPRESS_GZIP_LEVEL", 6)
+        app.config.setdefault("COMPRESS_BR_LEVEL", 5)
+        app.config.setdefault("COMPRESS_CACHE_ENTRIES", 128)
+        app.config.setdefault("COMPRESS_CACHE_MAX_BYTES", 8 * 1024 * 1024)
+
+        self.config = app.config
+        self.cache = _CompressedCache(
+            app.config["COMPRESS_CACHE_ENTRIES"],
+            app.config["COMPRESS_CACHE_MAX_BYTES"],
+        )
+        app.after_request(self._after_request)
+
+    # ---------------- negociação ----------------
+    def _choose_encoding(self) -> Optional[str]:
+        accept = request.accept_encodings
+        if brotli is not None and accept["br"] > 0:
+            return "br"
+        if accept["gzip"] > 0:
+            return "gzip"
+        return None
+
+    def _should_compress(self, response) -> bool:
+        if not self.config["COMPRESS_ENABLED"]:
+            return False
+        if response.status_code < 200 or response.status_code >= 300 or response.status_code in (204, 206):
+            return False
+        if response.direct_passthrough or "Content-Encoding" in response.headers:
+            return False
+        if response.mimetype not in self.config["COMPRESS_MIMETYPES"]:
+            return False
+        if not response.is_streamed:
+            length = response.content_length
+            if length is not None and length < self.config["COMPRESS_MIN_SIZE"]:
+                return False
+        return True
+
+    # ---------------- compressores ----------------
+    def _compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.config["COMPRESS_BR_LEVEL"])
+        return gzip.compress(data, compresslevel=self.config["COMPRESS_GZIP_LEVEL"], mtime=0)
+
+    def _compress_stream(self, chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        if encoding == "br":
+            comp = brotli.Compressor(quality=self.config["COMPRESS_BR_LEVEL"])
+            for chunk in chunks:
+                # flush a cada pedaço: o navegador recebe enquanto o servidor gera
+                out = comp.process(chunk) + comp.flush()
+                if out:
+                    yield out
+            yield comp.finish()
+            return
+
+        comp = zlib.compressobj(self.config["COMPRESS_GZIP_LEVEL"], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            out = comp.compress(chunk) + comp.flush(zlib.Z_SYNC_FLUSH)
+            if out:
+                yield out
+        yield comp.flush()
+
+    # ---------------- hook ----------------
+    def _after_request(self, response):
+        if not self._should_compress(response):
+            return response
+
+        encoding = self._choose_encoding()
+        response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_stream(response.iter_encoded(), encoding)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            self._tag_etag(response, encoding)
+            return response
+
+        etag, _ = response.get_etag()
+        cache_key = (request.path, etag, encoding) if etag else None
+
+        body = self.cache.get(cache_key) if cache_key else None
+        if body is None:
+            data = response.get_data()
+            if len(data) < self.config["COMPRESS_MIN_SIZE"]:
+                return response
+            body = self._compress(data, encoding)
+            if cache_key:
+                self.cache.set(cache_key, body)
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        self._tag_etag(response, encoding)
+        return response
+
+    @staticmethod
+    def _tag_etag(response, encoding: str):
+        # ETag forte precisa mudar junto com a codificação; a fraca pode ficar igual
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f"{etag}-{encoding}")
+
+
+compress = Compress()
@@ -0,0 +1,122 @@
+# app/dados_compactos.py
+"""
+Cache compacto do dadoshospitais.xlsx (uma cópia por worker).
+
+Em vez de uma lista de dicts (cada linha com as ~35 perguntas inteiras como
+chave + a tabela hash do dict), guarda:
+  - UM esquema de colunas compartilhado (nomes internados, posição por nome);
+  - por linha, só uma tupla com os valores, indexada por id_hospital;
+  - valores repetidos ("Sim", "Não", "", ...) deduplicados: todas as linhas
+    apontam para o mesmo objeto str.
+
+LinhaDados é uma visão somente-leitura (Mapping) criada na hora do acesso,
+então quem lia dict (row.get("Quantos leitos?"), _pick) continua funcionando.
+
+Medição de memória antes/depois:
+    python -m bench.memoria_dados --dados /tmp/dados_10k
+"""
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class EsquemaColunas:
+    """
+    Nomes das colunas (uma vez por planilha) + posição exata e sem caixa.
+    """
+    __slots__ = ("nomes", "posicao", "posicao_maiuscula")
+
+    def __init__(self, nomes: Sequence[str]):
+        self.nomes: Tuple[str, ...] = tuple(sys.intern(str(n)) for n in nomes)
+        self.posicao: Dict[str, int] = {n: i for i, n in enumerate(self.nomes)}
+        self.posicao_maiuscula: Dict[str, int] = {}
+        for i, n in enumerate(self.nomes):
+            # nome repetido sem caixa: vale a primeira coluna (igual ao _pick)
+            self.posicao_maiuscula.setdefault(n.strip().upper(), i)
+
+    def indice(self, nome: str) -> Optional[int]:
+        i = self.posicao.get(nome)
+        if i is None:
+            i = self.posicao_maiuscula.get(str(nome).strip().upper())
+        return i
+
+
+class LinhaDados(Mapping):
+    """
+    Uma linha vista como dict somente-leitura (sem copiar os valores).
+    """
+    __slots__ = ("esquema", "valores")
+
+    def __init__(self, esquema: EsquemaColunas, valores: tuple):
+        self.esquema = esquema
+        self.valores = valores
+
+    def __getitem__(self, nome):
+        i = self.esquema.posicao.get(nome)
+        if i is None:
+            raise KeyError(nome)
+        return self.valores[i]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.esquema.nomes)
+
+    def __len__(self) -> int:
+        return len(self.esquema.nomes)
+
+    def primeiro(self, candidatos: Iterable[str]) -> str:
+        """
+        Valor da primeira coluna encontrada (exata ou sem caixa) — o _pick sem montar mapa por chamada.
+        """
+        for c in candidatos:
+            i = self.esquema.indice(c)
+            if i is not None:
+                return self.valores[i] or ""
+        return ""
+
+
+class TabelaDados:
+    """
+    Linhas por id_hospital (primeira ocorrência vence, como a busca linear antiga).
+    """
+    __slots__ = ("esquema", "por_hospital")
+
+    def __init__(self, esquema: EsquemaColunas, por_hospital: Dict[int, tuple]):
+        self.esquema = esquema
+        self.por_hospital = por_hospital
+
+    def get(self, hospital_id: int) -> Optional[LinhaDados]:
+        valores = self.por_hospital.get(hospital_id)
+        return LinhaDados(self.esquema, valores) if valores is not None else None
+
+    def __len__(self) -> int:
+        return len(self.por_hospital)
+
+    def __iter__(self) -> Iterator[LinhaDados]:
+        for valores in self.por_hospital.values():
+            yield LinhaDados(self.esquema, valores)
+
+
+def montar_tabela(colunas: Sequence[str], linhas: Iterable[Tuple[int, Sequence[str]]]) -> TabelaDados:
+    """
+    linhas = (id_hospital, valores na ordem de `colunas`).
+    """
+    esquema = EsquemaColunas(colunas)
+    unicos: Dict[str, str] = {}
+    por_hospital: Dict[int, tuple] = {}
+    for hid, valores in linhas:
+        if hid in por_hospital:
+            continue
+        por_hospital[hid] = tuple(unicos.setdefault(v, v) for v in valores)
+    return TabelaDados(esquema, por_hospital)
+
+
+def tabela_vazia() -> TabelaDados:
+    return TabelaDados(EsquemaColunas(()), {})
+
+
+def linhas_para_tabela(rows: List[dict]) -> TabelaDados:
+    """
+    Converte o formato antigo (lista de dicts com id_hospital) — usado na medição.
+    """
+    colunas = list(rows[0].keys()) if rows else []
+    return montar_tabela(colunas, ((r["id_hospital"], [r.get(c, "") for c in colunas]) for r in rows))
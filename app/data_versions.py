@@ -0,0 +1,151 @@
+# app/data_versions.py
+"""
+Versões de dados por tabela.
+
+Toda escrita (flush do ORM ou insert/update/delete em massa) incrementa o
+contador da tabela em data_versions, DENTRO da mesma transação. Assim a versão
+só "vira" quando os dados viram, e vale para todos os workers.
+"""
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, text
+
+from app import db
+from app.models import DataVersion
+
+# tabelas cujas mudanças interessam para cache HTTP
+TRACKED_TABLES = ("hospitais", "contatos", "dados_hospitais", "produtos_hospitais", "produtos")
+
+# versões já lidas nesta sessão (ETag e cache da mesma requisição usam a mesma leitura)
+_LIDAS = "_versoes_lidas"
+
+_listeners_installed = False
+
+
+def _tables_from_flush(session) -> set:
+    tables = set()
+    for obj in session.new:
+        tables.add(obj.__table__.name)
+    for obj in session.deleted:
+        tables.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(obj.__table__.name)
+    return {t for t in tables if t in TRACKED_TABLES}
+
+
+# upsert numa instrução só (Postgres e SQLite >= 3.24): dois primeiros escritores
+# concorrentes não batem na PK, e a linha fica travada até o commit
+_BUMP = text(
+    "INSERT INTO data_versions (table_name, version, updated_at) VALUES (:t, 1, :now) "
+    "ON CONFLICT (table_name) DO UPDATE SET version = data_versions.version + 1, updated_at = :now"
+)
+
+
+def bump_versions(connection, tables: Iterable[str]):
+    now = datetime.utcnow()
+    # ordem fixa: transações concorrentes travam as linhas na mesma sequência
+    for t in sorted(tables):
+        connection.execute(_BUMP, {"now": now, "t": t})
+
+
+def _before_flush(session, flush_context, instances):
+    # guarda antes do flush: depois dele new/dirty/deleted já foram esvaziados
+    tables = _tables_from_flush(session)
+    if tables:
+        session.info.setdefault("_versoes_pendentes", set()).update(tables)
+
+
+def _after_flush(session, flush_context):
+    tables = session.info.pop("_versoes_pendentes", None)
+    if tables:
+        bump_versions(session.connection(), tables)
+        session.info["versoes_alteradas"] = True
+        session.info.pop(_LIDAS, None)
+
+
+def _do_orm_execute(state):
+    # Query.delete()/update() e insert(...) em massa não passam pelo flush
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    mapper = state.bind_mapper
+    table = mapper.local_table.name if mapper is not None else None
+    if table not in TRACKED_TABLES:
+        return None
+
+    result = state.invoke_statement()
+    bump_versions(state.session.connection(), [table])
+    state.session.info["versoes_alteradas"] = True
+    state.session.info.pop(_LIDAS, None)
+    return result
+
+
+def _fim_transacao(session):
+    # outra transação pode ter gravado: a próxima leitura vai ao banco
+    session.info.pop(_LIDAS, None)
+
+
+def esquecer_versoes(session):
+    """
+    Descarta as versões guardadas na sessão (ex.: a sessão trocou de banco, ver app/replica.py).
+    """
+    session.info.pop(_LIDAS, None)
+
+
+def init_app(app):
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(db.session, "before_flush", _before_flush)
+    event.listen(db.session, "after_flush", _after_flush)
+    event.listen(db.session, "do_orm_execute", _do_orm_execute)
+    event.listen(db.session, "after_commit", _fim_transacao)
+    event.listen(db.session, "after_rollback", _fim_transacao)
+    _listeners_installed = True
+
+
+def current_versions(tables: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """
+    {tabela: (versão, updated_at)} numa única consulta barata (PK).
+    Tabela sem linha ainda = versão 0.
+
+    A leitura passa pela sessão, então vem do mesmo banco que as consultas da
+    página (réplica ou primário). Fica guardada na sessão até a próxima
+    gravação/commit: a ETag e o cache (app/cache.py) da mesma requisição
+    enxergam as mesmas versões, com uma consulta só.
+    """
+    tables = list(tables)
+    if not tables:
+        return {}
+
+    lidas = db.session.info.get(_LIDAS)
+    if lidas is None or any(t not in lidas for t in tables):
+        pedir = set(TRACKED_TABLES) | set(tables)
+        rows = (
+            db.session.query(DataVersion.table_name, DataVersion.version, DataVersion.updated_at)
+            .filter(DataVersion.table_name.in_(pedir))
+            .all()
+        )
+        lidas = {t: (0, None) for t in pedir}
+        for name, version, updated_at in rows:
+            lidas[name] = (int(version or 0), updated_at)
+        db.session.info[_LIDAS] = lidas
+    return {t: lidas[t] for t in tables}
+
+
+def file_version(path: str) -> Optional[float]:
+    """
+    Versão de um arquivo de dados = mtime (None se não existir).
+    Sem extensão (ex.: data/produtos): a fonte atual entre .xlsx/.csv/.tsv (ver excel_loader).
+    """
+    if not os.path.splitext(path)[1]:
+        from app.excel_loader import versao_fonte
+
+        fonte = versao_fonte(os.path.dirname(path), os.path.basename(path), abas=True)
+        return fonte[1] if fonte else None
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
@@ -0,0 +1,91 @@
+# app/edicao.py
+"""
+Formulários de edição (info do hospital, dados do hospital): só grava o que mudou.
+
+O formulário manda, além dos campos:
+  versao   versão da linha quando a página foi aberta (version_id_col do model)
+  _base    JSON com os valores que a página mostrou
+
+No POST:
+  - nada mudou em relação ao banco          -> não faz commit;
+  - mesma versão                            -> UPDATE só das colunas alteradas
+                                               (WHERE versao = <lida>);
+  - versão diferente (outro usuário salvou) -> merge de 3 vias com _base:
+      campo que só eu mudei       -> aplica
+      campo que só o outro mudou  -> fica o do banco
+      os dois mudaram (diferente) -> conflito: a rota mostra a tela de escolha.
+"""
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.questionario import CHAVES, PERGUNTAS
+
+CAMPOS_HOSPITAL_INFO = ("nome_hospital", "endereco", "numero", "complemento", "cep", "cidade", "estado")
+
+# perguntas do questionário (propriedades de DadosHospital sobre o JSON respostas)
+CAMPOS_DADOS = CHAVES
+
+# rótulos da tela de conflito (mesmos textos dos formulários)
+ROTULOS = {
+    "nome_hospital": "Nome do hospital", "endereco": "Endereço", "numero": "Número",
+    "complemento": "Complemento", "cep": "CEP", "cidade": "Cidade", "estado": "UF",
+    **{p.chave: p.rotulo for p in PERGUNTAS},
+}
+
+Conflito = Dict[str, str]
+
+
+def valores_obj(obj, campos: Sequence[str]) -> Dict[str, str]:
+    return {c: (getattr(obj, c) or "") for c in campos}
+
+
+def valores_form(form, campos: Sequence[str]) -> Dict[str, str]:
+    """
+    Só os campos que vieram no POST (a tela de conflito manda um subconjunto).
+    """
+    return {c: (form.get(c) or "").strip() for c in campos if c in form}
+
+
+def versao_form(form) -> Optional[int]:
+    return form.get("versao", type=int)
+
+
+def base_form(form, campos: Sequence[str]) -> Optional[Dict[str, str]]:
+    try:
+        base = json.loads(form.get("_base") or "")
+    except ValueError:
+        return None
+    if not isinstance(base, dict):
+        return None
+    return {c: str(base.get(c) or "") for c in campos}
+
+
+def alteracoes(atuais: Dict[str, str], novos: Dict[str, str]) -> Dict[str, str]:
+    return {c: v for c, v in novos.items() if atuais.get(c, "") != v}
+
+
+def mesclar(base: Optional[Dict[str, str]], meus: Dict[str, str],
+            atuais: Dict[str, str]) -> Tuple[Dict[str, str], List[Conflito]]:
+    """
+    Merge de 3 vias. Devolve (o que aplicar, conflitos).
+    Sem _base (form antigo), todo campo diferente do banco vira conflito.
+    """
+    aplicar: Dict[str, str] = {}
+    conflitos: List[Conflito] = []
+    for campo, meu in meus.items():
+        atual = atuais.get(campo, "")
+        if meu == atual:
+            continue
+        original = base.get(campo, "") if base is not None else None
+        if original is not None and meu == original:
+            continue  # não mexi; vale o do outro usuário
+        if original is not None and atual == original:
+            aplicar[campo] = meu  # só eu mexi
+            continue
+        conflitos.append({"campo": campo, "base": original or "", "atual": atual, "meu": meu})
+    return aplicar, conflitos
+
+
+def aplicar_valores(obj, valores: Dict[str, str]):
+    for campo, valor in valores.items():
+        setattr(obj, campo, valor)
@@ -0,0 +1,410 @@
+# app/entidades.py
+"""
+Resolução de entidades: contatos órfãos -> hospital e hospitais duplicados.
+
+Comparar todo mundo com todo mundo é O(n²). Aqui cada nome vira um conjunto
+de trigramas (do nome normalizado) e só são comparados os pares que dividem
+um trigrama RARO (filtro de prefixo): os trigramas de cada nome são
+ordenados do mais raro para o mais comum e só os primeiros entram no
+índice. Para similaridade de Jaccard >= t, dois nomes obrigatoriamente
+dividem um trigrama dos seus prefixos, então nada se perde e cada bloco é
+pequeno: o custo fica perto de linear.
+
+Nota final de cada par = Jaccard dos trigramas, + bônus se cidade/CEP batem,
+- penalidade se as cidades são diferentes. Números no nome ("HOSPITAL 2")
+precisam ser iguais.
+
+Uso:
+    /admin/entidades                              (propostas + aplicar o que marcar)
+    flask --app manage resolver-entidades [--limiar 0.8] [--aplicar-acima 0.95]
+"""
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, update
+
+from app import db
+from app.catalogo_db import chave_cidade, chave_nome, prefixo_cep
+from app.models import Contato, DadosHospital, Hospital, ProdutoHospital
+
+LIMIAR_PADRAO = 0.75
+
+# bônus/penalidade sobre o Jaccard (o filtro de prefixo usa limiar - BONUS_MAXIMO)
+BONUS_CIDADE = 0.1
+BONUS_CEP = 0.1
+PENALIDADE_CIDADE = 0.25
+BONUS_MAXIMO = BONUS_CIDADE + BONUS_CEP
+
+_PALAVRAS_VAZIAS = {"DE", "DA", "DO", "DAS", "DOS", "E"}
+# ficam no nome normalizado, mas não contam na similaridade ("Santa Casa X" = "Hospital Santa Casa X")
+_PALAVRAS_GENERICAS = {"HOSPITAL"}
+_ABREVIACOES = {
+    "H": "HOSPITAL",
+    "HOSP": "HOSPITAL",
+    "HOSPT": "HOSPITAL",
+    "STA": "SANTA",
+    "STO": "SANTO",
+    "SRA": "SENHORA",
+    "N": "NOSSA",
+    "NS": "NOSSA SENHORA",
+    "S": "SAO",
+    "UNIV": "UNIVERSITARIO",
+    "MUN": "MUNICIPAL",
+    "REG": "REGIONAL",
+    "INST": "INSTITUTO",
+    "FUND": "FUNDACAO",
+    "GER": "GERAL",
+}
+_RE_NAO_ALFANUM = re.compile(r"[^A-Z0-9]+")
+
+_listeners_installed = False
+
+
+# ======================================================
+# NORMALIZAÇÃO
+# ======================================================
+def normalizar_nome(nome) -> str:
+    """
+    "Hosp. Sta. Casa de Misericórdia" -> "HOSPITAL SANTA CASA MISERICORDIA"
+    """
+    s = _RE_NAO_ALFANUM.sub(" ", chave_nome(nome))
+    palavras = []
+    for p in s.split():
+        p = _ABREVIACOES.get(p, p)
+        palavras.extend(w for w in p.split() if w not in _PALAVRAS_VAZIAS)
+    return " ".join(palavras)
+
+
+def trigramas(nome_normalizado: str) -> frozenset:
+    palavras = [w for w in nome_normalizado.split() if w not in _PALAVRAS_GENERICAS] or nome_normalizado.split()
+    if not palavras:
+        return frozenset()
+    s = f" {' '.join(palavras)} "
+    return frozenset(s[i:i + 3] for i in range(len(s) - 2))
+
+
+def _preencher_nome_normalizado(mapper, connection, target):
+    target.nome_normalizado = normalizar_nome(target.nome_hospital)
+
+
+# ======================================================
+# REGISTROS E ÍNDICE
+# ======================================================
+class Registro:
+    __slots__ = ("id", "nome", "gramas", "numeros", "cidade", "cep")
+
+    def __init__(self, id_: Optional[int], nome: str, nome_normalizado: Optional[str] = None, cidade=None, cep=None):
+        norm = nome_normalizado if nome_normalizado is not None else normalizar_nome(nome)
+        self.id = id_
+        self.nome = nome
+        self.gramas = trigramas(norm)
+        self.numeros = frozenset(w for w in norm.split() if w.isdigit())
+        self.cidade = chave_cidade(cidade)
+        self.cep = prefixo_cep(cep)
+
+
+def similaridade(a: Registro, b: Registro) -> float:
+    if not a.gramas or not b.gramas or a.numeros != b.numeros:
+        return 0.0
+    comum = len(a.gramas & b.gramas)
+    if not comum:
+        return 0.0
+    s = comum / (len(a.gramas) + len(b.gramas) - comum)
+    if a.cidade and b.cidade:
+        s += BONUS_CIDADE if a.cidade == b.cidade else -PENALIDADE_CIDADE
+    if a.cep and b.cep and a.cep == b.cep:
+        s += BONUS_CEP
+    return max(0.0, min(1.0, s))
+
+
+class IndiceBlocagem:
+    """
+    Índice invertido trigrama -> registros, só com os trigramas do prefixo (os mais raros).
+
+    A chave do bloco inclui os números do nome: como a similaridade exige números
+    iguais, "HOSPITAL X 12" e "HOSPITAL X 13" nem chegam a ser comparados.
+    """
+
+    def __init__(self, registros: Iterable[Registro], limiar: float = LIMIAR_PADRAO):
+        self.registros: Dict[int, Registro] = {r.id: r for r in registros}
+        self.jaccard_minimo = max(0.1, limiar - BONUS_MAXIMO)
+
+        frequencia: Dict[Tuple[frozenset, str], int] = defaultdict(int)
+        for r in self.registros.values():
+            for g in r.gramas:
+                frequencia[(r.numeros, g)] += 1
+        self._frequencia = frequencia
+
+        # prefixo guardado: a mesma lista serve para indexar e para consultar
+        self._prefixos: Dict[int, List[Tuple[frozenset, str]]] = {}
+        self.blocos: Dict[Tuple[frozenset, str], List[int]] = defaultdict(list)
+        for r in sorted(self.registros.values(), key=lambda r: r.id):
+            self._prefixos[r.id] = self.prefixo(r)
+            for chave in self._prefixos[r.id]:
+                self.blocos[chave].append(r.id)
+
+    def prefixo(self, r: Registro) -> List[Tuple[frozenset, str]]:
+        if not r.gramas:
+            return []
+        ordem = sorted(((r.numeros, g) for g in r.gramas), key=lambda k: (self._frequencia.get(k, 0), k[1]))
+        tamanho = len(ordem) - math.ceil(self.jaccard_minimo * len(ordem)) + 1
+        return ordem[:max(1, tamanho)]
+
+    def candidatos(self, r: Registro, so_menores: bool = False) -> List[Registro]:
+        minimo = self.jaccard_minimo * len(r.gramas)
+        vistos = set()
+        out = []
+        prefixo = self._prefixos.get(r.id) if r.id is not None else None
+        for chave in prefixo if prefixo is not None else self.prefixo(r):
+            for outro_id in self.blocos.get(chave, ()):
+                if outro_id in vistos or outro_id == r.id or (so_menores and outro_id > r.id):
+                    continue
+                vistos.add(outro_id)
+                outro = self.registros[outro_id]
+                # filtro de tamanho: conjuntos muito diferentes não chegam no Jaccard mínimo
+                if minimo <= len(outro.gramas) and len(outro.gramas) * self.jaccard_minimo <= len(r.gramas):
+                    out.append(outro)
+        return out
+
+    def melhores(self, r: Registro, limiar: float, so_menores: bool = False) -> List[Tuple[Registro, float]]:
+        pares = [(o, similaridade(r, o)) for o in self.candidatos(r, so_menores=so_menores)]
+        pares = [(o, s) for o, s in pares if s >= limiar]
+        pares.sort(key=lambda p: (-p[1], p[0].id))
+        return pares
+
+
+def _registros_hospitais() -> List[Registro]:
+    rows = db.session.query(
+        Hospital.id, Hospital.nome_hospital, Hospital.nome_normalizado, Hospital.cidade, Hospital.cep
+    ).all()
+    return [Registro(hid, nome, norm, cidade, cep) for hid, nome, norm, cidade, cep in rows]
+
+
+# ======================================================
+# PROPOSTAS
+# ======================================================
+def propor_contatos_orfaos(limiar: float = LIMIAR_PADRAO, indice: Optional[IndiceBlocagem] = None) -> List[Dict]:
+    """
+    Contatos sem hospital_id -> hospital mais parecido com o hospital_nome do contato.
+    """
+    indice = indice or IndiceBlocagem(_registros_hospitais(), limiar)
+    orfaos = (
+        db.session.query(Contato.id, Contato.nome_contato, Contato.hospital_nome)
+        .filter(Contato.hospital_id.is_(None), Contato.hospital_nome.isnot(None), Contato.hospital_nome != "")
+        .order_by(Contato.id.asc())
+        .all()
+    )
+    propostas = []
+    for cid, nome_contato, hospital_nome in orfaos:
+        # id None: o contato não é um registro do índice
+        melhores = indice.melhores(Registro(None, hospital_nome), limiar)
+        if not melhores:
+            continue
+        h, score = melhores[0]
+        propostas.append({
+            "contato_id": cid,
+            "nome_contato": nome_contato,
+            "hospital_nome": hospital_nome,
+            "hospital_id": h.id,
+            "hospital": h.nome,
+            "score": round(score, 3),
+            # empate: duas opções com a mesma nota, melhor decidir na mão
+            "ambiguo": len(melhores) > 1 and melhores[1][1] == score,
+        })
+    return propostas
+
+
+def propor_duplicados(limiar: float = LIMIAR_PADRAO, indice: Optional[IndiceBlocagem] = None) -> List[Dict]:
+    """
+    Grupos de hospitais parecidos. O principal é o de menor id (o que veio do Excel).
+
+    O grupo é transitivo (A~B e B~C juntam A, B e C), mas a nota de cada duplicado
+    é contra o PRINCIPAL: é nela que o --aplicar-acima confia para mesclar.
+    """
+    indice = indice or IndiceBlocagem(_registros_hospitais(), limiar)
+
+    pai: Dict[int, int] = {}
+
+    def raiz(x):
+        while pai.get(x, x) != x:
+            x = pai[x]
+        return x
+
+    ligados = set()
+    for r in sorted(indice.registros.values(), key=lambda r: r.id):
+        for outro, _ in indice.melhores(r, limiar, so_menores=True):
+            a, b = raiz(r.id), raiz(outro.id)
+            if a != b:
+                pai[max(a, b)] = min(a, b)
+            ligados.update((r.id, outro.id))
+
+    grupos: Dict[int, List[int]] = defaultdict(list)
+    for hid in ligados:
+        grupos[raiz(hid)].append(hid)
+
+    out = []
+    for principal, membros in sorted(grupos.items()):
+        membros.sort()
+        p = indice.registros[principal]
+        out.append({
+            "principal": {"id": principal, "nome": p.nome},
+            "duplicados": [
+                {"id": m, "nome": indice.registros[m].nome, "score": round(similaridade(p, indice.registros[m]), 3)}
+                for m in membros if m != principal
+            ],
+        })
+    return out
+
+
+def possiveis_duplicados(nome: str, limite: int = 10) -> List[Hospital]:
+    """
+    Checagem do formulário de novo hospital: mesmo nome normalizado (consulta pelo índice).
+    """
+    norm = normalizar_nome(nome)
+    if not norm:
+        return []
+    return Hospital.query.filter(Hospital.nome_normalizado == norm).order_by(Hospital.id.asc()).limit(limite).all()
+
+
+# ======================================================
+# APLICAÇÃO
+# ======================================================
+def vincular_contatos(pares: Iterable[Tuple[int, int]]) -> int:
+    """
+    [(contato_id, hospital_id)] -> grava hospital_id (só em quem ainda é órfão). Faz commit.
+    """
+    pares = dict(pares)
+    if not pares:
+        return 0
+    ainda_orfaos = {
+        cid for (cid,) in db.session.query(Contato.id)
+        .filter(Contato.id.in_(list(pares)), Contato.hospital_id.is_(None))
+        .all()
+    }
+    existentes = {hid for (hid,) in db.session.query(Hospital.id).filter(Hospital.id.in_(set(pares.values()))).all()}
+    alteracoes = [
+        {"id": cid, "hospital_id": hid}
+        for cid, hid in pares.items()
+        if cid in ainda_orfaos and hid in existentes
+    ]
+    if alteracoes:
+        db.session.execute(update(Contato), alteracoes)
+    db.session.commit()
+    return len(alteracoes)
+
+
+CAMPOS_ENDERECO = ("endereco", "numero", "complemento", "cep", "cidade", "estado")
+
+
+def mesclar_hospitais(principal_id: int, duplicados: Iterable[int]) -> int:
+    """
+    Move contatos/produtos/dados dos duplicados para o principal e apaga os duplicados.
+    Campos de endereço vazios no principal são completados. Faz commit.
+    """
+    duplicados = sorted({int(d) for d in duplicados if int(d) != principal_id})
+    principal = db.session.get(Hospital, principal_id)
+    if principal is None or not duplicados:
+        return 0
+    outros = Hospital.query.filter(Hospital.id.in_(duplicados)).order_by(Hospital.id.asc()).all()
+    duplicados = [h.id for h in outros]
+    if not duplicados:
+        return 0
+
+    for campo in CAMPOS_ENDERECO:
+        if not (getattr(principal, campo) or "").strip():
+            valor = next((getattr(h, campo) for h in outros if (getattr(h, campo) or "").strip()), None)
+            if valor:
+                setattr(principal, campo, valor)
+
+    Contato.query.filter(Contato.hospital_id.in_(duplicados)).update(
+        {"hospital_id": principal_id}, synchronize_session=False
+    )
+    ProdutoHospital.query.filter(ProdutoHospital.hospital_id.in_(duplicados)).update(
+        {"hospital_id": principal_id, "nome_hospital": principal.nome_hospital}, synchronize_session=False
+    )
+
+    # dados_hospitais é 1 por hospital: o principal fica com o seu, ou herda o do 1º duplicado
+    tem_dados = db.session.query(DadosHospital.id).filter_by(hospital_id=principal_id).first() is not None
+    if not tem_dados:
+        herdado = (
+            db.session.query(DadosHospital.id)
+            .filter(DadosHospital.hospital_id.in_(duplicados))
+            .order_by(DadosHospital.hospital_id.asc())
+            .first()
+        )
+        if herdado:
+            DadosHospital.query.filter(DadosHospital.id == herdado[0]).update(
+                {"hospital_id": principal_id}, synchronize_session=False
+            )
+    DadosHospital.query.filter(DadosHospital.hospital_id.in_(duplicados)).delete(synchronize_session=False)
+
+    Hospital.query.filter(Hospital.id.in_(duplicados)).delete(synchronize_session=False)
+    db.session.commit()
+    return len(duplicados)
+
+
+def preencher_nomes_normalizados() -> int:
+    """
+    Completa nome_normalizado de linhas antigas (antes da coluna existir). Faz commit.
+    """
+    pendentes = (
+        db.session.query(Hospital.id, Hospital.nome_hospital, Hospital.versao)
+        .filter(Hospital.nome_normalizado.is_(None))
+        .all()
+    )
+    if pendentes:
+        # update em massa pela PK com version_id_col: precisa da versão lida
+        db.session.execute(update(Hospital), [
+            {"id": hid, "nome_normalizado": normalizar_nome(nome), "versao": versao}
+            for hid, nome, versao in pendentes
+        ])
+        db.session.commit()
+    return len(pendentes)
+
+
+# ======================================================
+# REGISTRO NO APP / CLI
+# ======================================================
+def init_app(app):
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Hospital, "before_insert", _preencher_nome_normalizado)
+        event.listen(Hospital, "before_update", _preencher_nome_normalizado)
+        _listeners_installed = True
+    app.cli.add_command(resolver_entidades_cmd)
+
+
+@click.command("resolver-entidades")
+@click.option("--limiar", default=LIMIAR_PADRAO, show_default=True, help="nota mínima para propor")
+@click.option("--aplicar-acima", type=float, default=None, help="aplica sozinho as propostas com nota >= este valor")
+@with_appcontext
+def resolver_entidades_cmd(limiar, aplicar_acima):
+    """Propõe (e opcionalmente aplica) vínculos de contatos órfãos e mesclas de hospitais duplicados."""
+    preencher_nomes_normalizados()
+    indice = IndiceBlocagem(_registros_hospitais(), limiar)
+
+    contatos = propor_contatos_orfaos(limiar, indice)
+    grupos = propor_duplicados(limiar, indice)
+    click.echo(f"{len(contatos)} contato(s) órfão(s) com hospital provável")
+    for p in contatos:
+        click.echo(f"  contato {p['contato_id']} '{p['hospital_nome']}' -> hospital {p['hospital_id']} '{p['hospital']}' ({p['score']})")
+    click.echo(f"{len(grupos)} grupo(s) de hospitais duplicados")
+    for g in grupos:
+        dups = ", ".join(f"{d['id']} '{d['nome']}' ({d['score']})" for d in g["duplicados"])
+        click.echo(f"  {g['principal']['id']} '{g['principal']['nome']}' <- {dups}")
+
+    if aplicar_acima is None:
+        return
+    ligados = vincular_contatos(
+        (p["contato_id"], p["hospital_id"]) for p in contatos if p["score"] >= aplicar_acima and not p["ambiguo"]
+    )
+    mesclados = 0
+    for g in grupos:
+        ids = [d["id"] for d in g["duplicados"] if d["score"] >= aplicar_acima]
+        if ids:
+            mesclados += mesclar_hospitais(g["principal"]["id"], ids)
+    click.echo(f"aplicado: {ligados} contato(s) ligados, {mesclados} hospital(is) mesclados")
@@ -0,0 +1,234 @@
+# app/equivalencia.py
+"""
+Equivalentes entre marcas por vetor de nutrientes (catálogo no banco).
+
+Cada produto do catálogo vira um vetor (kcal, ptn, lip, fibras, sódio, ferro,
+potássio, B12, gordura saturada, forma líquida/pó). Cada coluna é padronizada
+(z-score sobre o catálogo) e multiplicada pelo peso do nutriente, para que
+"200 kcal" não esmague "1,8 g de ferro". A distância é euclidiana, calculada
+em bloco com NumPy:
+
+    |a - b|² = |a|² + |b|² - 2·a·b    (um produto de matrizes para todas as linhas)
+
+Nutriente em branco na planilha é "sem dado" (NaN), não zero: fica fora da
+média/desvio da coluna e, na distância, só entram os nutrientes que os dois
+produtos têm, com a soma reescalada para o total de colunas
+(d² · colunas / colunas em comum). Sem nenhum nutriente em comum = sem
+distância (a forma líquida/pó sozinha não faz dois produtos equivalentes).
+
+e o top-k sai de argpartition, sem ordenar o catálogo inteiro.
+
+O índice é montado uma vez por processo e refeito quando a versão da tabela
+"produtos" (data_versions) muda (cache "equivalencia" em app/registro_caches.py).
+
+MARCA_PROPRIA (config, padrão PRODIET) é a marca "nossa": as oportunidades de
+troca de um hospital são os produtos de concorrentes com o equivalente mais
+próximo dela.
+"""
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app import db
+from app.data_versions import current_versions
+from app.models import Marca, Produto, ProdutoHospital
+from app.registro_caches import registro
+
+# (atributo de Produto, peso na distância)
+NUTRIENTES = (
+    ("kcal", 2.0),
+    ("ptn", 2.0),
+    ("lip", 1.0),
+    ("fibras", 1.0),
+    ("sodio", 0.5),
+    ("ferro", 0.5),
+    ("potassio", 0.5),
+    ("vit_b12", 0.5),
+    ("gordura_saturada", 0.5),
+)
+# líquido (referência em mL) x pó (g): pesa como um nutriente principal
+PESO_FORMA = 2.0
+
+K_PADRAO = 5
+
+_RE_NUMERO = re.compile(r"-?\d+(?:[.,]\d+)?")
+
+_lock = threading.Lock()
+_CACHE = registro.registrar("equivalencia", orcamento_mb=32, max_entradas=1, descricao="índice de nutrientes do catálogo")
+
+
+def numero(valor) -> float:
+    """
+    "1,5" / "150 kcal" / "" -> 1.5 / 150.0 / nan (sem dado)
+    """
+    m = _RE_NUMERO.search(str(valor or ""))
+    return float(m.group(0).replace(",", ".")) if m else np.nan
+
+
+def _forma_liquida(referencia) -> float:
+    return 1.0 if "ML" in str(referencia or "").upper() else 0.0
+
+
+# ======================================================
+# ÍNDICE
+# ======================================================
+class IndiceNutrientes:
+    """
+    Matriz (produtos x nutrientes) padronizada e ponderada (0 onde falta dado),
+    a máscara de presença e os quadrados pré-calculados.
+    """
+    __slots__ = ("ids", "marca_ids", "posicao", "info", "matriz", "presente", "quadrados")
+
+    def __init__(self, produtos: Sequence[Dict]):
+        self.ids = np.array([p["id"] for p in produtos], dtype=np.int64)
+        self.marca_ids = np.array([p["marca_id"] for p in produtos], dtype=np.int64)
+        self.posicao = {int(pid): i for i, pid in enumerate(self.ids)}
+        self.info = list(produtos)
+
+        colunas = [n for n, _ in NUTRIENTES]
+        pesos = np.array([p for _, p in NUTRIENTES] + [PESO_FORMA])
+        bruto = np.array(
+            [[numero(p[c]) for c in colunas] + [_forma_liquida(p["referencia"])] for p in produtos],
+            dtype=np.float64,
+        ).reshape(len(produtos), len(pesos))
+
+        # média/desvio só sobre quem tem o dado (nanmean avisaria em coluna toda vazia)
+        presente = ~np.isnan(bruto)
+        valores = np.where(presente, bruto, 0.0)
+        n = np.maximum(presente.sum(axis=0), 1)
+        media = valores.sum(axis=0) / n
+        desvio = np.sqrt((np.where(presente, bruto - media, 0.0) ** 2).sum(axis=0) / n)
+        desvio[desvio == 0] = 1.0  # coluna constante (ou vazia) não pesa
+        self.matriz = np.where(presente, (valores - media) / desvio * pesos, 0.0)
+        self.presente = presente.astype(np.float64)
+        self.quadrados = self.matriz * self.matriz
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def distancias(self, linhas: np.ndarray) -> np.ndarray:
+        """
+        (len(linhas), n) distâncias de cada linha para todo o catálogo
+        (inf para pares sem nenhum nutriente em comum; a última coluna é a forma).
+        """
+        a, pa, qa = self.matriz[linhas], self.presente[linhas], self.quadrados[linhas]
+        # |a|² e |b|² só nas colunas que o outro também tem (zeros da matriz fazem o resto)
+        d2 = qa @ self.presente.T + pa @ self.quadrados.T - 2.0 * (a @ self.matriz.T)
+        np.maximum(d2, 0.0, out=d2)  # arredondamento pode dar -1e-15
+        # a forma está sempre presente: comuns >= 1
+        d2 *= self.matriz.shape[1] / (pa @ self.presente.T)
+        d2[(pa[:, :-1] @ self.presente[:, :-1].T) == 0] = np.inf
+        return np.sqrt(d2)
+
+    def vizinhos(self, produto_ids: Sequence[int], k: int = K_PADRAO,
+                 marca_id: Optional[int] = None) -> Dict[int, List[Dict]]:
+        """
+        Top-k equivalentes de vários produtos de uma vez.
+        marca_id: só dessa marca; None: qualquer marca diferente da do produto.
+        """
+        conhecidos = [pid for pid in produto_ids if pid in self.posicao]
+        if not conhecidos or not len(self):
+            return {pid: [] for pid in produto_ids}
+
+        linhas = np.array([self.posicao[pid] for pid in conhecidos])
+        dist = self.distancias(linhas)
+
+        # fora do alvo = infinito (mesma marca, ou marca diferente da pedida)
+        if marca_id is None:
+            dist[self.marca_ids[linhas, None] == self.marca_ids[None, :]] = np.inf
+        else:
+            dist[:, self.marca_ids != marca_id] = np.inf
+        dist[np.arange(len(linhas)), linhas] = np.inf
+
+        k = min(k, dist.shape[1])
+        topo = np.argpartition(dist, k - 1, axis=1)[:, :k]
+
+        out: Dict[int, List[Dict]] = {pid: [] for pid in produto_ids}
+        for i, pid in enumerate(conhecidos):
+            ordem = topo[i][np.argsort(dist[i, topo[i]])]
+            for j in ordem:
+                d = float(dist[i, j])
+                if not np.isfinite(d):
+                    break
+                out[pid].append(dict(self.info[j], distancia=round(d, 3), similaridade=round(1.0 / (1.0 + d), 3)))
+        return out
+
+
+def _carregar_produtos() -> List[Dict]:
+    rows = (
+        db.session.query(Produto, Marca.nome)
+        .join(Marca, Produto.marca_id == Marca.id)
+        .order_by(Produto.id)
+        .all()
+    )
+    campos = ("id", "marca_id", "nome", "embalagem", "referencia") + tuple(n for n, _ in NUTRIENTES)
+    return [dict({c: getattr(p, c) for c in campos}, marca=marca) for p, marca in rows]
+
+
+def get_indice() -> IndiceNutrientes:
+    """
+    Índice do processo; refeito quando a tabela produtos muda (1 consulta barata por chamada).
+    """
+    versao = current_versions(["produtos"])["produtos"][0]
+    indice = _CACHE.get(versao)
+    if indice is not None:
+        return indice
+    with _lock:
+        return _CACHE.get_or_set(versao, lambda: IndiceNutrientes(_carregar_produtos()))
+
+
+def marca_id_por_nome(nome: str) -> Optional[int]:
+    from app.catalogo_db import chave_nome
+
+    return db.session.query(Marca.id).filter(Marca.chave == chave_nome(nome)).scalar()
+
+
+# ======================================================
+# CONSULTAS
+# ======================================================
+def equivalentes(produto_id: int, k: int = K_PADRAO, marca: Optional[str] = None) -> Optional[Dict]:
+    """
+    Produto + top-k equivalentes (de `marca`, ou de qualquer outra marca). None se o produto não existe.
+    """
+    indice = get_indice()
+    i = indice.posicao.get(produto_id)
+    if i is None:
+        return None
+    marca_id = marca_id_por_nome(marca) if marca else None
+    if marca and marca_id is None:
+        return {"produto": indice.info[i], "equivalentes": []}
+    return {"produto": indice.info[i], "equivalentes": indice.vizinhos([produto_id], k, marca_id)[produto_id]}
+
+
+def oportunidades_hospital(hospital_id: int, marca_propria: str, k: int = 3) -> List[Dict]:
+    """
+    Linhas de ProdutoHospital de concorrentes (ligadas ao catálogo) com os
+    equivalentes mais próximos da marca própria — uma só conta de matriz.
+    """
+    indice = get_indice()
+    marca_id = marca_id_por_nome(marca_propria)
+    rows = (
+        db.session.query(ProdutoHospital.id, ProdutoHospital.produto_id, ProdutoHospital.quantidade)
+        .filter(ProdutoHospital.hospital_id == hospital_id, ProdutoHospital.produto_id.isnot(None))
+        .order_by(ProdutoHospital.id)
+        .all()
+    )
+    concorrentes = [
+        r for r in rows
+        if r.produto_id in indice.posicao and int(indice.marca_ids[indice.posicao[r.produto_id]]) != marca_id
+    ]
+    if marca_id is None or not concorrentes:
+        return []
+
+    vizinhos = indice.vizinhos(sorted({r.produto_id for r in concorrentes}), k, marca_id)
+    return [
+        {
+            "produto_hospital_id": r.id,
+            "quantidade": r.quantidade or 0,
+            "produto": indice.info[indice.posicao[r.produto_id]],
+            "equivalentes": vizinhos[r.produto_id],
+        }
+        for r in concorrentes
+    ]
@@ -1,9 +1,46 @@
 # app/excel_loader.py
+"""
+Leitura das planilhas de data/.
+
+Cada arquivo pode vir como .xlsx ou como .csv/.tsv (exportação direta dos
+sistemas regionais), com o mesmo cabeçalho:
+    data/hospitais.csv | hospitais.tsv | hospitais.xlsx
+    data/produtos/<MARCA>.csv          (uma aba por arquivo) | produtos.xlsx
+Se existir mais de um, vale o modificado por último.
+
+CSV é lido em streaming pelo módulo csv (sem pandas/openpyxl), com encoding
+(UTF-8 com/sem BOM ou cp1252) e separador (, ; tab |) detectados numa
+amostra do início do arquivo. Os dois formatos passam pela mesma resolução
+de cabeçalho (_posicao) e devolvem exatamente as mesmas estruturas.
+"""
+import codecs
+import csv
 import os
-import re
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
-import pandas as pd
+from app.metrics import timed_excel_load
+
+if TYPE_CHECKING:  # pandas só é importado de verdade na primeira leitura (ver _pd)
+    import pandas as pd
+
+    from app.dados_compactos import TabelaDados
+
+EXTENSOES_TEXTO = (".csv", ".tsv")
+EXTENSOES = EXTENSOES_TEXTO + (".xlsx",)
+
+# bytes lidos para detectar encoding/separador
+AMOSTRA_CSV = 64 * 1024
+
+# (cabeçalho, linhas); cada linha é uma lista de str
+Tabela = Tuple[List[str], Iterator[List[str]]]
+
+
+def _pd():
+    """
+    Import tardio do pandas (~0,4 s): páginas e comandos que não leem Excel não pagam.
+    """
+    import pandas
+    return pandas
 
 
 def _safe_str(v: Any) -> str:
@@ -24,243 +61,431 @@ def _to_int(v: Any, default: int = 0) -> int:
         return default
 
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [str(c).strip() for c in df.columns]
-    return df
+# ======================================================
+# FONTES (.xlsx / .csv / .tsv / pasta de CSVs)
+# ======================================================
+def _mtime(path: str) -> float:
+    if os.path.isdir(path):
+        arquivos = [os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(EXTENSOES_TEXTO)]
+        return max([os.path.getmtime(path)] + [os.path.getmtime(f) for f in arquivos])
+    return os.path.getmtime(path)
+
+
+def arquivo_fonte(data_dir: str, nome: str, abas: bool = False) -> Optional[str]:
+    """
+    Caminho que será lido para `nome` (ex.: "hospitais"); None se não existir.
+    abas=True aceita também a pasta data/<nome>/ com um CSV por aba.
+    """
+    candidatos = [os.path.join(data_dir, nome + ext) for ext in EXTENSOES]
+    if abas:
+        candidatos.append(os.path.join(data_dir, nome))
+    existentes = [
+        p for p in candidatos
+        if os.path.isfile(p) or (abas and os.path.isdir(p) and p == candidatos[-1])
+    ]
+    if not existentes:
+        return None
+    return max(existentes, key=_mtime)
 
 
-def _find_col(df: pd.DataFrame, exact_names_upper: List[str], contains_any: Optional[List[str]] = None) -> Optional[str]:
+def versao_fonte(data_dir: str, nome: str, abas: bool = False) -> Optional[Tuple[str, float]]:
+    """
+    (caminho, mtime) da fonte atual — chave de cache que muda se trocar de formato.
     """
-    Encontra coluna por:
+    path = arquivo_fonte(data_dir, nome, abas)
+    if path is None:
+        return None
+    try:
+        return path, _mtime(path)
+    except OSError:
+        return None
+
+
+# ======================================================
+# LEITURA
+# ======================================================
+def _formato_csv(path: str) -> Tuple[str, Any]:
+    """
+    (encoding, dialeto) a partir dos primeiros AMOSTRA_CSV bytes.
+    """
+    with open(path, "rb") as f:
+        amostra = f.read(AMOSTRA_CSV)
+
+    if amostra.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
+        try:
+            # final=False: a amostra pode cortar um caractere multibyte no fim
+            codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            # exportação do Excel/sistemas em português
+            encoding = "cp1252"
+
+    texto = amostra.decode(encoding, errors="ignore")
+    if path.lower().endswith(".tsv"):
+        return encoding, csv.excel_tab
+    try:
+        dialeto = csv.Sniffer().sniff(texto, delimiters=",;\t|")
+    except csv.Error:
+        # uma coluna só, ou amostra ambígua: o separador mais comum na 1ª linha
+        primeira = texto.split("\n", 1)[0]
+        sep = max(",;\t|", key=primeira.count)
+
+        class dialeto(csv.excel):
+            delimiter = sep
+    return encoding, dialeto
+
+
+def _linhas_csv(path: str) -> Iterator[List[str]]:
+    encoding, dialeto = _formato_csv(path)
+    with open(path, newline="", encoding=encoding, errors="replace") as f:
+        yield from csv.reader(f, dialeto)
+
+
+def _dedup_cabecalho(cabecalho: Sequence[str]) -> List[str]:
+    """
+    Mesmos nomes que o pandas dá às colunas repetidas: "Qual?", "Qual?.1", ...
+    """
+    vistos: Dict[str, int] = {}
+    out = []
+    for c in cabecalho:
+        n = vistos.get(c, 0)
+        vistos[c] = n + 1
+        out.append(c if n == 0 else f"{c}.{n}")
+    return out
+
+
+def _tabela_csv(path: str) -> Tabela:
+    linhas = _linhas_csv(path)
+    cabecalho = _dedup_cabecalho([str(c) for c in next(linhas, [])])
+    cabecalho = [c.strip() for c in cabecalho]
+    return cabecalho, linhas
+
+
+def _tabela_df(df: "pd.DataFrame") -> Tabela:
+    df = df.fillna("")
+    cabecalho = [str(c).strip() for c in df.columns]
+    return cabecalho, (list(t) for t in df.itertuples(index=False, name=None))
+
+
+def _ler_tabela(data_dir: str, nome: str) -> Optional[Tabela]:
+    path = arquivo_fonte(data_dir, nome)
+    if path is None:
+        return None
+    if path.lower().endswith(EXTENSOES_TEXTO):
+        return _tabela_csv(path)
+    return _tabela_df(_pd().read_excel(path, dtype=str))
+
+
+def _abas_pasta(path: str) -> Dict[str, str]:
+    """
+    {aba: arquivo} de uma pasta de CSVs (aba = nome do arquivo sem extensão).
+    """
+    out = {}
+    for f in sorted(os.listdir(path)):
+        base, ext = os.path.splitext(f)
+        if ext.lower() in EXTENSOES_TEXTO and base.strip():
+            out[base] = os.path.join(path, f)
+    return out
+
+
+def _nomes_abas(data_dir: str, nome: str) -> Optional[List[str]]:
+    path = arquivo_fonte(data_dir, nome, abas=True)
+    if path is None:
+        return None
+    if os.path.isdir(path):
+        return list(_abas_pasta(path))
+    if path.lower().endswith(EXTENSOES_TEXTO):
+        return [nome]
+    return [str(s) for s in _pd().ExcelFile(path).sheet_names]
+
+
+def _ler_aba(data_dir: str, nome: str, aba: str) -> Optional[Tabela]:
+    path = arquivo_fonte(data_dir, nome, abas=True)
+    if path is None:
+        return None
+    if os.path.isdir(path):
+        arquivo = _abas_pasta(path).get(aba)
+        return _tabela_csv(arquivo) if arquivo else None
+    if path.lower().endswith(EXTENSOES_TEXTO):
+        return _tabela_csv(path) if aba == nome else None
+    return _tabela_df(_pd().read_excel(path, sheet_name=aba, dtype=str))
+
+
+def _ler_todas_abas(data_dir: str, nome: str) -> Iterator[Tuple[str, Tabela]]:
+    path = arquivo_fonte(data_dir, nome, abas=True)
+    if path is None:
+        return
+    if os.path.isdir(path):
+        for aba, arquivo in _abas_pasta(path).items():
+            yield aba, _tabela_csv(arquivo)
+    elif path.lower().endswith(EXTENSOES_TEXTO):
+        yield nome, _tabela_csv(path)
+    else:
+        # um único parse do arquivo para todas as abas
+        for aba, df in _pd().read_excel(path, sheet_name=None, dtype=str).items():
+            yield str(aba), _tabela_df(df)
+
+
+# ======================================================
+# CABEÇALHO
+# ======================================================
+def _posicao(cabecalho: Sequence[str], exact_names_upper: List[str],
+             contains_any: Optional[List[str]] = None) -> Optional[int]:
+    """
+    Encontra a coluna por:
       1) match exato (case-insensitive)
       2) fallback por "contém" (case-insensitive)
     """
-    if df is None or df.empty:
+    if not cabecalho:
         return None
 
-    cols = list(df.columns)
-    upper_map = {str(c).strip().upper(): c for c in cols}
+    upper_map: Dict[str, int] = {}
+    for i, c in enumerate(cabecalho):
+        upper_map.setdefault(str(c).strip().upper(), i)
 
     for name in exact_names_upper:
         if name.upper() in upper_map:
             return upper_map[name.upper()]
 
     if contains_any:
-        for c in cols:
+        for i, c in enumerate(cabecalho):
             cu = str(c).strip().upper()
             for token in contains_any:
                 if token.upper() in cu:
-                    return c
+                    return i
 
     return None
 
 
+def _campo(row: Sequence[Any], i: Optional[int]) -> str:
+    if i is None or i >= len(row):
+        return ""
+    return _safe_str(row[i])
+
+
 # ======================================================
-# HOSPITAIS (data/hospitais.xlsx)
+# HOSPITAIS (data/hospitais.xlsx|csv)
 # ======================================================
+@timed_excel_load
 def load_hospitais_from_excel(data_dir: str = "data") -> List[Dict[str, Any]]:
     """
     Espera colunas típicas:
       id_hospital, nome_hospital, endereco, numero, complemento, cep, cidade, estado
     """
-    path = os.path.join(data_dir, "hospitais.xlsx")
-    if not os.path.exists(path):
+    tabela = _ler_tabela(data_dir, "hospitais")
+    if tabela is None:
         return []
-
-    df = pd.read_excel(path, dtype=str).fillna("")
-    df = _normalize_columns(df)
+    cab, linhas = tabela
 
     # tenta localizar colunas
-    col_id = _find_col(df, ["ID_HOSPITAL", "ID"], ["ID_HOSP"])
-    col_nome = _find_col(df, ["NOME_HOSPITAL", "HOSPITAL", "NOME"], ["NOME"])
-    col_end = _find_col(df, ["ENDERECO", "ENDEREÇO"], ["ENDERE"])
-    col_num = _find_col(df, ["NUMERO", "NÚMERO"], ["NUM"])
-    col_comp = _find_col(df, ["COMPLEMENTO"], ["COMPLE"])
-    col_cep = _find_col(df, ["CEP"], ["CEP"])
-    col_cid = _find_col(df, ["CIDADE"], ["CIDAD"])
-    col_uf = _find_col(df, ["ESTADO", "UF"], ["UF", "ESTAD"])
+    col_id = _posicao(cab, ["ID_HOSPITAL", "ID"], ["ID_HOSP"])
+    col_nome = _posicao(cab, ["NOME_HOSPITAL", "HOSPITAL", "NOME"], ["NOME"])
+    col_end = _posicao(cab, ["ENDERECO", "ENDEREÇO"], ["ENDERE"])
+    col_num = _posicao(cab, ["NUMERO", "NÚMERO"], ["NUM"])
+    col_comp = _posicao(cab, ["COMPLEMENTO"], ["COMPLE"])
+    col_cep = _posicao(cab, ["CEP"], ["CEP"])
+    col_cid = _posicao(cab, ["CIDADE"], ["CIDAD"])
+    col_uf = _posicao(cab, ["ESTADO", "UF"], ["UF", "ESTAD"])
 
     out: List[Dict[str, Any]] = []
-    for _, r in df.iterrows():
-        hid = _to_int(r.get(col_id)) if col_id else 0
-        nome = _safe_str(r.get(col_nome)) if col_nome else ""
+    for r in linhas:
+        hid = _to_int(_campo(r, col_id))
+        nome = _campo(r, col_nome)
         if not hid or not nome:
             continue
 
         out.append({
             "id_hospital": hid,
             "nome_hospital": nome,
-            "endereco": _safe_str(r.get(col_end)) if col_end else "",
-            "numero": _safe_str(r.get(col_num)) if col_num else "",
-            "complemento": _safe_str(r.get(col_comp)) if col_comp else "",
-            "cep": _safe_str(r.get(col_cep)) if col_cep else "",
-            "cidade": _safe_str(r.get(col_cid)) if col_cid else "",
-            "estado": _safe_str(r.get(col_uf)) if col_uf else "",
+            "endereco": _campo(r, col_end),
+            "numero": _campo(r, col_num),
+            "complemento": _campo(r, col_comp),
+            "cep": _campo(r, col_cep),
+            "cidade": _campo(r, col_cid),
+            "estado": _campo(r, col_uf),
         })
 
     return out
 
 
 # ======================================================
-# CONTATOS (data/contatos.xlsx)
+# CONTATOS (data/contatos.xlsx|csv)
 # ======================================================
+@timed_excel_load
 def load_contatos_from_excel(data_dir: str = "data") -> List[Dict[str, Any]]:
     """
     Espera colunas típicas:
       id_hospital, hospital_nome, nome_contato, cargo, telefone
     """
-    path = os.path.join(data_dir, "contatos.xlsx")
-    if not os.path.exists(path):
+    tabela = _ler_tabela(data_dir, "contatos")
+    if tabela is None:
         return []
+    cab, linhas = tabela
 
-    df = pd.read_excel(path, dtype=str).fillna("")
-    df = _normalize_columns(df)
-
-    col_id = _find_col(df, ["ID_HOSPITAL", "HOSPITAL_ID"], ["ID_HOSP"])
-    col_hnome = _find_col(df, ["HOSPITAL_NOME", "NOME_HOSPITAL"], ["HOSPITAL"])
-    col_nome = _find_col(df, ["NOME_CONTATO", "CONTATO"], ["CONTATO", "NOME"])
-    col_cargo = _find_col(df, ["CARGO"], ["CARGO"])
-    col_tel = _find_col(df, ["TELEFONE", "TEL"], ["TEL"])
+    col_id = _posicao(cab, ["ID_HOSPITAL", "HOSPITAL_ID"], ["ID_HOSP"])
+    col_hnome = _posicao(cab, ["HOSPITAL_NOME", "NOME_HOSPITAL"], ["HOSPITAL"])
+    col_nome = _posicao(cab, ["NOME_CONTATO", "CONTATO"], ["CONTATO", "NOME"])
+    col_cargo = _posicao(cab, ["CARGO"], ["CARGO"])
+    col_tel = _posicao(cab, ["TELEFONE", "TEL"], ["TEL"])
 
     out: List[Dict[str, Any]] = []
-    for _, r in df.iterrows():
-        nome = _safe_str(r.get(col_nome)) if col_nome else ""
+    for r in linhas:
+        nome = _campo(r, col_nome)
         if not nome:
             continue
 
         out.append({
-            "id_hospital": _to_int(r.get(col_id)) if col_id else None,
-            "hospital_nome": _safe_str(r.get(col_hnome)) if col_hnome else "",
+            "id_hospital": _to_int(_campo(r, col_id)) if col_id is not None else None,
+            "hospital_nome": _campo(r, col_hnome),
             "nome_contato": nome,
-            "cargo": _safe_str(r.get(col_cargo)) if col_cargo else "",
-            "telefone": _safe_str(r.get(col_tel)) if col_tel else "",
+            "cargo": _campo(r, col_cargo),
+            "telefone": _campo(r, col_tel),
         })
 
     return out
 
 
 # ======================================================
-# DADOS DO HOSPITAL (data/dadoshospitais.xlsx)
+# DADOS DO HOSPITAL (data/dadoshospitais.xlsx|csv)
 # ======================================================
+def _linhas_dados(data_dir: str) -> Tuple[List[str], Iterator[Tuple[int, List[Any]]]]:
+    """
+    (colunas, (id_hospital, valores)) — colunas = cabeçalho + "id_hospital" (int).
+    """
+    tabela = _ler_tabela(data_dir, "dadoshospitais")
+    if tabela is None:
+        return [], iter(())
+    cab, linhas = tabela
+
+    col_id = _posicao(cab, ["ID_HOSPITAL"], ["ID_HOSP"])
+    colunas = list(cab)
+    if "id_hospital" not in colunas:
+        colunas.append("id_hospital")
+    pos_id = colunas.index("id_hospital")
+    n = len(colunas)
+
+    def gerar():
+        for r in linhas:
+            hid = _to_int(_campo(r, col_id))
+            if not hid:
+                continue
+            vals: List[Any] = [_safe_str(v) for v in r[:len(cab)]]
+            vals.extend([""] * (n - len(vals)))
+            vals[pos_id] = hid
+            yield hid, vals
+
+    return colunas, gerar()
+
+
+@timed_excel_load
 def load_dados_hospitais_from_excel(data_dir: str = "data") -> List[Dict[str, Any]]:
     """
     Lê o Excel e devolve uma lista de dicts por linha.
     Mantém as chaves exatamente como no cabeçalho, mas também inclui id_hospital como int.
     """
-    path = os.path.join(data_dir, "dadoshospitais.xlsx")
-    if not os.path.exists(path):
-        return []
-
-    df = pd.read_excel(path, dtype=str).fillna("")
-    df = _normalize_columns(df)
+    colunas, linhas = _linhas_dados(data_dir)
+    return [dict(zip(colunas, vals)) for _, vals in linhas]
 
-    # garante id_hospital
-    col_id = _find_col(df, ["ID_HOSPITAL"], ["ID_HOSP"])
-    out: List[Dict[str, Any]] = []
 
-    for _, row in df.iterrows():
-        d = {str(k): _safe_str(v) for k, v in row.to_dict().items()}
-        hid = _to_int(row.get(col_id)) if col_id else 0
-        if not hid:
-            continue
-        d["id_hospital"] = hid
-        out.append(d)
+@timed_excel_load
+def load_dados_hospitais_compacto(data_dir: str = "data") -> "TabelaDados":
+    """
+    Mesmo conteúdo de load_dados_hospitais_from_excel no formato compacto de
+    app/dados_compactos.py (esquema compartilhado + uma tupla por hospital).
+    É o que fica em cache em cada worker.
+    """
+    from app.dados_compactos import montar_tabela
 
-    return out
+    colunas, linhas = _linhas_dados(data_dir)
+    return montar_tabela(colunas, linhas)
 
 
 # ======================================================
-# PRODUTOS POR HOSPITAL (data/produtoshospitais.xlsx)
+# PRODUTOS POR HOSPITAL (data/produtoshospitais.xlsx|csv)
 # ======================================================
+@timed_excel_load
 def load_produtos_hospitais_from_excel(data_dir: str = "data") -> List[Dict[str, Any]]:
     """
     Espera colunas típicas:
       hospital_id (ou id_hospital), nome_hospital, marca_planilha, produto, quantidade
     """
-    path = os.path.join(data_dir, "produtoshospitais.xlsx")
-    if not os.path.exists(path):
+    tabela = _ler_tabela(data_dir, "produtoshospitais")
+    if tabela is None:
         return []
+    cab, linhas = tabela
 
-    df = pd.read_excel(path, dtype=str).fillna("")
-    df = _normalize_columns(df)
-
-    col_hid = _find_col(df, ["HOSPITAL_ID", "ID_HOSPITAL"], ["HOSPITAL", "ID_HOSP"])
-    col_hnome = _find_col(df, ["NOME_HOSPITAL", "HOSPITAL_NOME"], ["HOSPITAL"])
-    col_marca = _find_col(df, ["MARCA_PLANILHA", "MARCA"], ["MARCA"])
-    col_prod = _find_col(df, ["PRODUTO"], ["PROD"])
-    col_qtd = _find_col(df, ["QUANTIDADE", "QTD"], ["QTD", "QUANT"])
+    col_hid = _posicao(cab, ["HOSPITAL_ID", "ID_HOSPITAL"], ["HOSPITAL", "ID_HOSP"])
+    col_hnome = _posicao(cab, ["NOME_HOSPITAL", "HOSPITAL_NOME"], ["HOSPITAL"])
+    col_marca = _posicao(cab, ["MARCA_PLANILHA", "MARCA"], ["MARCA"])
+    col_prod = _posicao(cab, ["PRODUTO"], ["PROD"])
+    col_qtd = _posicao(cab, ["QUANTIDADE", "QTD"], ["QTD", "QUANT"])
 
     out: List[Dict[str, Any]] = []
-    for _, r in df.iterrows():
-        hid = _to_int(r.get(col_hid)) if col_hid else 0
-        produto = _safe_str(r.get(col_prod)) if col_prod else ""
+    for r in linhas:
+        hid = _to_int(_campo(r, col_hid))
+        produto = _campo(r, col_prod)
         if not hid or not produto:
             continue
 
         out.append({
             "hospital_id": hid,
-            "nome_hospital": _safe_str(r.get(col_hnome)) if col_hnome else "",
-            "marca_planilha": _safe_str(r.get(col_marca)) if col_marca else "",
+            "nome_hospital": _campo(r, col_hnome),
+            "marca_planilha": _campo(r, col_marca),
             "produto": produto,
-            "quantidade": _to_int(r.get(col_qtd), 0) if col_qtd else 0,
+            "quantidade": _to_int(_campo(r, col_qtd), 0),
         })
 
     return out
 
 
 # ======================================================
-# CATÁLOGO DE PRODUTOS (data/produtos.xlsx) -> ABAS = MARCAS
+# CATÁLOGO DE PRODUTOS (data/produtos.xlsx ou data/produtos/*.csv) -> ABAS = MARCAS
 # ======================================================
+@timed_excel_load
 def load_marcas_from_produtos_excel(data_dir: str = "data") -> List[str]:
     """
     Retorna as marcas como os nomes das abas do data/produtos.xlsx
+    (ou dos arquivos de data/produtos/)
     """
-    path = os.path.join(data_dir, "produtos.xlsx")
-    if not os.path.exists(path):
+    abas = _nomes_abas(data_dir, "produtos")
+    if not abas:
         return []
 
-    xls = pd.ExcelFile(path)
-    marcas = [str(s).strip() for s in xls.sheet_names if str(s).strip()]
+    marcas = [str(s).strip() for s in abas if str(s).strip()]
     return sorted(marcas)
 
 
+def _coluna_produto(cab: Sequence[str]) -> Optional[int]:
+    # procura a coluna PRODUTO; fallback "contém"; fallback final: primeira coluna
+    col_prod = _posicao(cab, ["PRODUTO"], ["PROD"])
+    if col_prod is None and len(cab) > 0:
+        col_prod = 0
+    return col_prod
+
+
+@timed_excel_load
 def load_produtos_by_marca_from_produtos_excel(marca: str, data_dir: str = "data") -> List[str]:
     """
     Recebe a marca (nome da aba) e retorna os produtos dessa aba (coluna 'PRODUTO').
     """
-    path = os.path.join(data_dir, "produtos.xlsx")
-    if not os.path.exists(path):
-        return []
-
     marca = _safe_str(marca)
     if not marca:
         return []
 
-    df = pd.read_excel(path, sheet_name=marca, dtype=str).fillna("")
-    df = _normalize_columns(df)
-
-    # procura a coluna PRODUTO (case-insensitive)
-    col_prod = None
-    for c in df.columns:
-        if str(c).strip().upper() == "PRODUTO":
-            col_prod = c
-            break
-
-    # fallback: tenta por "contém"
-    if not col_prod:
-        col_prod = _find_col(df, ["PRODUTO"], ["PROD"])
-
-    # fallback final: primeira coluna
-    if not col_prod and len(df.columns) > 0:
-        col_prod = df.columns[0]
+    tabela = _ler_aba(data_dir, "produtos", marca)
+    if tabela is None:
+        return []
+    cab, linhas = tabela
 
-    if not col_prod:
+    col_prod = _coluna_produto(cab)
+    if col_prod is None:
         return []
 
     produtos = []
-    for v in df[col_prod].tolist():
-        p = _safe_str(v)
+    for r in linhas:
+        p = _campo(r, col_prod)
         if p:
             produtos.append(p)
 
@@ -269,11 +494,61 @@ def load_produtos_by_marca_from_produtos_excel(marca: str, data_dir: str = "data
     return produtos
 
 
+# colunas do catálogo -> (nomes exatos, fallback "contém"); chaves = atributos de ProdutoHospital
+CATALOGO_COLUNAS = [
+    ("produto", ["PRODUTO"], ["PROD"]),
+    ("embalagem", ["EMBALAGEM"], ["EMBAL"]),
+    ("referencia", ["REFERENCIA", "REFERÊNCIA"], ["REFER"]),
+    ("kcal", ["KCAL"], ["KCAL"]),
+    ("ptn", ["PTN", "PTN (G)"], ["PTN"]),
+    ("lip", ["LIP", "LIP (G)"], ["LIP"]),
+    ("fibras", ["FIBRAS", "FIBRAS (G)"], ["FIBRA"]),
+    ("sodio", ["SODIO", "SÓDIO", "SODIO (MG)"], ["SODIO", "SÓDIO"]),
+    ("ferro", ["FERRO", "FERRO (MG)"], ["FERRO"]),
+    ("potassio", ["POTASSIO", "POTÁSSIO", "POTASSIO (MG)"], ["POTASS", "POTÁSS"]),
+    ("vit_b12", ["VIT.B12", "VIT.B12 (MCG)"], ["B12"]),
+    ("gordura_saturada", ["GORDURA SATURADA", "GORDURA SATURADA (G)"], ["SATURADA"]),
+]
+
+
+@timed_excel_load
+def load_catalogo_completo_from_produtos_excel(data_dir: str = "data") -> List[Dict[str, Any]]:
+    """
+    Lê TODAS as abas do data/produtos.xlsx de uma vez (um único parse do arquivo).
+    Retorna [{"marca": <aba>, "produtos": [{"produto", "embalagem", ..., "gordura_saturada"}]}]
+    ordenado por marca; produtos ordenados por nome e sem duplicados.
+    """
+    out: List[Dict[str, Any]] = []
+
+    for sheet_name, (cab, linhas) in _ler_todas_abas(data_dir, "produtos"):
+        marca = _safe_str(sheet_name)
+        if not marca:
+            continue
+
+        cols = {key: _posicao(cab, exact, contains) for key, exact, contains in CATALOGO_COLUNAS}
+        if cols["produto"] is None and len(cab) > 0:
+            cols["produto"] = 0
+
+        produtos: Dict[str, Dict[str, str]] = {}
+        if cols["produto"] is not None:
+            for r in linhas:
+                nome = _campo(r, cols["produto"])
+                if not nome or nome in produtos:
+                    continue
+                produtos[nome] = {key: _campo(r, col) for key, col in cols.items()}
+
+        out.append({"marca": marca, "produtos": [produtos[k] for k in sorted(produtos)]})
+
+    out.sort(key=lambda m: m["marca"])
+    return out
+
+
 # ======================================================
 # (Opcional) Compat: se você tinha uma função antiga com esse nome,
 # deixo aqui para não quebrar imports antigos.
 # Ela retorna lista de dicts {"marca_planilha": <aba>, "produto": <produto>}
 # ======================================================
+@timed_excel_load
 def load_catalogo_produtos_from_excel(data_dir: str = "data") -> List[Dict[str, str]]:
     """
     Compat: monta um catálogo (marca_planilha, produto) lendo todas as abas.
@@ -0,0 +1,128 @@
+# app/http_cache.py
+"""
+GET condicional (ETag / Last-Modified / Cache-Control) guiado pelas versões dos dados.
+
+A ETag é calculada ANTES de rodar a view, só com:
+  - versões das tabelas (1 consulta em data_versions)
+  - mtime dos arquivos de data/
+  - rota + argumentos + query string + se é admin
+Se o navegador já tem a versão atual (If-None-Match), devolvemos 304 sem
+consultar as tabelas principais e sem renderizar template. O Last-Modified vai
+na resposta só como informação: If-Modified-Since sozinho nunca dá 304.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Iterable, Optional, Tuple
+
+from flask import make_response, request, session
+from werkzeug.wrappers import Response
+
+from app import db
+from app.data_versions import current_versions, file_version
+
+_TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+
+def _build_id() -> str:
+    """
+    Identifica o "build" (templates mudam no deploy => ETag muda).
+    """
+    commit = os.environ.get("RENDER_GIT_COMMIT") or os.environ.get("APP_BUILD_ID")
+    if commit:
+        return commit
+    try:
+        return str(max(
+            os.path.getmtime(os.path.join(_TEMPLATES_DIR, f)) for f in os.listdir(_TEMPLATES_DIR)
+        ))
+    except (OSError, ValueError):
+        return "dev"
+
+
+BUILD_ID = _build_id()
+
+
+def _fingerprint(tables: Iterable[str], files: Iterable[str], view_kwargs: dict, per_user: bool
+                 ) -> Tuple[str, Optional[datetime]]:
+    versions = current_versions(tables)
+    mtimes = {f: file_version(f) for f in files}
+
+    parts = [BUILD_ID, request.endpoint or "", repr(sorted(view_kwargs.items())),
+             request.query_string.decode("latin-1")]
+    parts += [f"{t}={v[0]}" for t, v in sorted(versions.items())]
+    parts += [f"{f}={m}" for f, m in sorted(mtimes.items())]
+    if per_user:
+        parts.append(f"admin={bool(session.get('is_admin'))}")
+
+    etag = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=12).hexdigest()
+
+    stamps = [v[1].replace(tzinfo=timezone.utc) for v in versions.values() if v[1]]
+    stamps += [datetime.fromtimestamp(m, tz=timezone.utc) for m in mtimes.values() if m]
+    last_modified = max(stamps).replace(microsecond=0) if stamps else None
+    return etag, last_modified
+
+
+def _is_current(etag: str) -> bool:
+    # só a ETag valida: If-Modified-Since é ignorado. O Last-Modified tem resolução de
+    # segundo e não enxerga admin/query string/build, que entram na ETag (304 errado).
+    return bool(request.if_none_match) and request.if_none_match.contains_weak(etag)
+
+
+def _apply_headers(resp: Response, etag: str, last_modified: Optional[datetime], cache_control: str, per_user: bool):
+    # ETag fraca: o mesmo conteúdo pode sair comprimido ou não
+    resp.set_etag(etag, weak=True)
+    if last_modified:
+        resp.last_modified = last_modified
+    resp.headers["Cache-Control"] = cache_control
+    if per_user:
+        resp.vary.add("Cookie")
+    return resp
+
+
+def conditional(tables: Iterable[str] = (), files: Iterable[str] = (), max_age: int = 0,
+                public: bool = False, per_user: bool = True):
+    """
+    Decorator para views de leitura.
+
+    tables   -> tabelas das quais a página depende (ver TRACKED_TABLES)
+    files    -> arquivos de dados (caminhos) dos quais a página depende
+    max_age  -> 0 = navegador sempre revalida (barato: 304)
+    public   -> pode ficar em cache compartilhado (só para conteúdo sem sessão)
+    per_user -> a página muda se o usuário é admin (varia por cookie)
+    """
+    tables = tuple(tables)
+    files = tuple(files)
+    scope = "public" if public else "private"
+    cache_control = f"{scope}, max-age={max_age}" if max_age else f"{scope}, no-cache"
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            # mensagens flash pendentes: a página muda só desta vez
+            if per_user and session.get("_flashes"):
+                resp = make_response(view(*args, **kwargs))
+                resp.headers["Cache-Control"] = "private, no-store"
+                return resp
+
+            etag, last_modified = _fingerprint(tables, files, kwargs, per_user)
+            if _is_current(etag):
+                resp = Response(status=304)
+                return _apply_headers(resp, etag, last_modified, cache_control, per_user)
+
+            db.session.info.pop("versoes_alteradas", None)
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code != 200:
+                return resp
+
+            # a própria view pode ter gravado (ex.: dados completados do Excel): recalcula
+            if db.session.info.pop("versoes_alteradas", None):
+                etag, last_modified = _fingerprint(tables, files, kwargs, per_user)
+            return _apply_headers(resp, etag, last_modified, cache_control, per_user)
+
+        return wrapped
+
+    return decorator
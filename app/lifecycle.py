@@ -0,0 +1,151 @@
+# app/lifecycle.py
+"""
+Ciclo de vida do gunicorn: aquecimento dos caches no master e reset de conexões depois do fork.
+
+Com `preload_app` (gunicorn.conf.py) o app é criado UMA vez no master e os
+workers nascem por fork, compartilhando a memória (copy-on-write). Por isso o
+aquecimento roda no master, ANTES do fork (when_ready): pandas, dadoshospitais,
+catálogo do produtos e templates são carregados uma vez só e todos os workers
+já nascem com eles. No fim o master fecha as conexões que abriu.
+Depois do fork cada worker só descarta o pool herdado do SQLAlchemy (não se
+compartilha socket de banco entre processos).
+
+Sem preload cada worker cria o próprio app e aquece numa thread logo depois
+de subir (post_worker_init): enquanto ela roda, GET /ready responde 503
+("aquecendo"). Com preload os workers já nascem quentes e /ready é 200 desde
+a primeira requisição. GET /ping responde sempre (liveness). Fora do gunicorn
+(flask run, scripts) ninguém chama o aquecimento e o app já nasce "pronto".
+
+Etapa que falhou deixa o status em "erro", que CONTA como pronto: as etapas só
+adiantam caches que a primeira requisição enche sozinha, e um worker fora do
+balanceador para sempre seria pior. As falhas aparecem em "erros" no /ready.
+"""
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import text
+
+from app import db
+
+_lock = threading.Lock()
+_STATE: Dict = {
+    "status": "pronto",   # aquecendo | pronto | erro
+    "inicio": None,
+    "fim": None,
+    "etapas": {},         # nome -> ms
+    "erros": [],
+}
+
+_WARMERS: List[Tuple[str, Callable]] = []
+
+
+def warmer(name: str):
+    """
+    Registra uma etapa de aquecimento (roda dentro do app_context, em ordem).
+    """
+    def deco(fn):
+        _WARMERS.append((name, fn))
+        return fn
+    return deco
+
+
+# ======================================================
+# ETAPAS PADRÃO
+# ======================================================
+@warmer("banco")
+def _aquecer_banco(app):
+    # confere conexão/credenciais antes de subir os workers (o pool é descartado no fim)
+    db.session.execute(text("SELECT 1"))
+    db.session.remove()
+
+
+@warmer("dados_excel")
+def _aquecer_dados(app):
+    from app.routes import DATA_DIR, _load_dados_excel_cached
+    _load_dados_excel_cached(DATA_DIR)
+
+
+@warmer("catalogo")
+def _aquecer_catalogo(app):
+    from app.catalogo import get_bundle
+    from app.routes import DATA_DIR
+    get_bundle(DATA_DIR)
+
+
+@warmer("templates")
+def _aquecer_templates(app):
+    env = app.jinja_env
+    for nome in env.list_templates(filter_func=lambda n: n.endswith(".html")):
+        env.get_template(nome)
+
+
+# ======================================================
+# API
+# ======================================================
+def reset_connections(app):
+    """
+    Depois do fork: esquece as conexões herdadas do master SEM fechá-las
+    (fechar mandaria o 'terminate' no socket que o master ainda usa).
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def warm_up(app):
+    with _lock:
+        _STATE.update(status="aquecendo", inicio=time.time(), fim=None, etapas={}, erros=[])
+
+    for name, fn in _WARMERS:
+        t = time.perf_counter()
+        try:
+            with app.app_context():
+                fn(app)
+        except Exception as e:
+            app.logger.error("aquecimento '%s' falhou: %s\n%s", name, e, traceback.format_exc())
+            with _lock:
+                _STATE["erros"].append(f"{name}: {e}")
+        with _lock:
+            _STATE["etapas"][name] = round(1000 * (time.perf_counter() - t), 1)
+
+    with _lock:
+        # etapa com erro não derruba o worker: o cache só vai ser lido na 1ª requisição
+        _STATE["status"] = "erro" if _STATE["erros"] else "pronto"
+        _STATE["fim"] = time.time()
+
+
+def warm_up_master(app):
+    """
+    Chamado pelo when_ready do gunicorn (master, app pré-carregado, antes do fork).
+    Síncrono: os workers só nascem com o cache quente.
+    """
+    warm_up(app)
+    # nenhuma conexão aberta no master atravessa o fork
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def warm_up_worker(app) -> threading.Thread:
+    """
+    Chamado pelo post_worker_init do gunicorn quando NÃO há preload: aquece numa
+    thread para o worker já atender /ping e responder 503 no /ready até acabar.
+    """
+    # antes da thread: um /ready que chegue antes dela começar já vê "aquecendo"
+    with _lock:
+        _STATE.update(status="aquecendo", inicio=time.time(), fim=None, etapas={}, erros=[])
+    t = threading.Thread(target=warm_up, args=(app,), name="aquecimento", daemon=True)
+    t.start()
+    return t
+
+
+def readiness() -> Tuple[bool, Dict]:
+    with _lock:
+        estado = dict(_STATE, etapas=dict(_STATE["etapas"]), erros=list(_STATE["erros"]))
+    # "erro" conta como pronto (ver docstring do módulo): o worker atende, só não está com o cache quente
+    ready = estado["status"] in ("pronto", "erro")
+    if estado["inicio"] and estado["fim"]:
+        estado["duracao_ms"] = round(1000 * (estado["fim"] - estado["inicio"]), 1)
+    return ready, estado
@@ -0,0 +1,137 @@
+# app/lote.py
+"""
+Entrada em lote (vários produtos / vários contatos num único POST).
+
+Aqui só ficam o parse e a validação. Cada função devolve (linhas_validas, erros),
+onde erros = [(numero_da_linha, mensagem)]. Se houver QUALQUER erro, a rota não
+grava nada (o lote entra inteiro ou não entra).
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+MAX_LINHAS_LOTE = 200
+
+Erros = List[Tuple[int, str]]
+
+
+def _to_quantidade(raw: str) -> Optional[int]:
+    raw = (raw or "").strip().replace(",", ".")
+    if not raw:
+        return 0
+    try:
+        v = float(raw)
+    except ValueError:
+        return None
+    if v < 0 or v != int(v):
+        return None
+    return int(v)
+
+
+# ======================================================
+# PRODUTOS (grade marca / produto / quantidade)
+# ======================================================
+def validar_lote_produtos(marcas: List[str], produtos: List[str], quantidades: List[str],
+                          catalogo: Dict[str, set]) -> Tuple[List[Dict], Erros]:
+    """
+    catalogo = {marca: {nomes de produto}}. Se a marca está no catálogo, o produto
+    precisa existir nela; marca fora do catálogo aceita produto livre (como o form simples).
+    Linhas totalmente vazias são ignoradas.
+    """
+    n = max(len(marcas), len(produtos), len(quantidades))
+    linhas: List[Dict] = []
+    erros: Erros = []
+
+    for i in range(n):
+        marca = (marcas[i] if i < len(marcas) else "").strip()
+        produto = (produtos[i] if i < len(produtos) else "").strip()
+        qtd_raw = (quantidades[i] if i < len(quantidades) else "").strip()
+        num = i + 1
+
+        if not produto and not marca:
+            continue  # linha em branco da grade
+
+        if not produto:
+            erros.append((num, "Informe o produto."))
+            continue
+        if len(produto) > 255:
+            erros.append((num, "Nome do produto muito longo (máx. 255)."))
+            continue
+        if len(marca) > 50:
+            erros.append((num, "Marca muito longa (máx. 50)."))
+            continue
+        if marca in catalogo and produto not in catalogo[marca]:
+            erros.append((num, f"Produto '{produto}' não existe no catálogo da marca {marca}."))
+            continue
+
+        quantidade = _to_quantidade(qtd_raw)
+        if quantidade is None:
+            erros.append((num, f"Quantidade inválida: '{qtd_raw}' (use um inteiro >= 0)."))
+            continue
+
+        linhas.append({"linha": num, "marca_planilha": marca, "produto": produto, "quantidade": quantidade})
+
+    if len(linhas) > MAX_LINHAS_LOTE:
+        erros.append((0, f"No máximo {MAX_LINHAS_LOTE} linhas por envio."))
+    if not linhas and not erros:
+        erros.append((0, "Nenhuma linha preenchida."))
+
+    return linhas, erros
+
+
+# ======================================================
+# CONTATOS (colar do Excel: nome, cargo, telefone)
+# ======================================================
+_CABECALHOS_NOME = {"nome", "nome_contato", "contato", "nome do contato"}
+
+
+def _split_linha(linha: str) -> List[str]:
+    # Excel cola com TAB; CSV brasileiro costuma usar ";"
+    if "\t" in linha:
+        return linha.split("\t")
+    if ";" in linha:
+        return linha.split(";")
+    return [linha]
+
+
+def validar_lote_contatos(texto: str) -> Tuple[List[Dict], Erros]:
+    linhas: List[Dict] = []
+    erros: Erros = []
+
+    raw_lines = (texto or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    for i, raw in enumerate(raw_lines):
+        num = i + 1
+        if not raw.strip():
+            continue
+
+        cols = [c.strip() for c in _split_linha(raw)]
+        nome = cols[0] if len(cols) > 0 else ""
+        cargo = cols[1] if len(cols) > 1 else ""
+        telefone = cols[2] if len(cols) > 2 else ""
+
+        # primeira linha pode ser o cabeçalho copiado junto
+        if not linhas and not erros and nome.lower() in _CABECALHOS_NOME:
+            continue
+
+        if len(cols) > 3 and any(cols[3:]):
+            erros.append((num, "Colunas demais (esperado: nome, cargo, telefone)."))
+            continue
+        if not nome:
+            erros.append((num, "Nome do contato é obrigatório."))
+            continue
+        if len(nome) > 255 or len(cargo) > 255:
+            erros.append((num, "Nome/cargo muito longo (máx. 255)."))
+            continue
+        if telefone:
+            digitos = re.sub(r"\D", "", telefone)
+            if len(telefone) > 80 or not (8 <= len(digitos) <= 13):
+                erros.append((num, f"Telefone inválido: '{telefone}'."))
+                continue
+
+        linhas.append({"linha": num, "nome_contato": nome, "cargo": cargo, "telefone": telefone})
+
+    if len(linhas) > MAX_LINHAS_LOTE:
+        erros.append((0, f"No máximo {MAX_LINHAS_LOTE} linhas por envio."))
+    if not linhas and not erros:
+        erros.append((0, "Nenhuma linha preenchida."))
+
+    return linhas, erros
@@ -0,0 +1,252 @@
+# app/metrics.py
+"""
+Métricas em memória, expostas em formato texto do Prometheus (GET /metrics).
+
+  http_request_duration_seconds{endpoint,method,status}  histograma de latência
+  db_statements_per_request{endpoint}                    nº de SQL por requisição
+  db_time_per_request_seconds{endpoint}                  tempo de SQL por requisição
+  excel_load_duration_seconds{loader}                    leituras do app/excel_loader.py
+  pdf_render_duration_seconds                            geração do relatório em PDF
+  cache_hits_total / cache_misses_total                  cache de páginas (app/cache.py)
+  cache_memory_bytes / cache_memory_evictions_total      caches em memória (app/registro_caches.py)
+
+O SQL é contado pelos eventos before/after_cursor_execute do SQLAlchemy e
+acumulado no `g` da requisição. Cada worker do gunicorn tem os próprios
+contadores (o Prometheus soma por instância); o label `worker` não é usado
+para não multiplicar séries a cada restart.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+# ======================================================
+# TIPOS
+# ======================================================
+class Histogram:
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List] = {}  # labels -> [contagens por bucket..., soma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labelvalues)
+            if s is None:
+                s = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t, *labelvalues)
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        for labelvalues, s in series:
+            acumulado = 0
+            for le, n in zip(self.buckets, s):
+                acumulado += n
+                bucket = _labels(self.labelnames, labelvalues, 'le="%s"' % _fmt(le))
+                out.append(f"{self.name}_bucket{bucket} {acumulado}")
+            inf = _labels(self.labelnames, labelvalues, 'le="+Inf"')
+            lbl = _labels(self.labelnames, labelvalues)
+            out.append(f"{self.name}_bucket{inf} {s[-1]}")
+            out.append(f"{self.name}_sum{lbl} {_fmt(s[-2])}")
+            out.append(f"{self.name}_count{lbl} {s[-1]}")
+        return out
+
+
+class CallbackMetric:
+    """
+    Valor lido na hora do scrape (ex.: contadores que já existem em outro módulo).
+    """
+
+    def __init__(self, name: str, doc: str, kind: str, fn: Callable[[], float]):
+        self.name = name
+        self.doc = doc
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}", f"{self.name} {_fmt(self.fn())}"]
+
+
+REGISTRY: List = []
+
+
+def _register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+REQUEST_LATENCY = _register(Histogram(
+    "http_request_duration_seconds", "Latência por endpoint (até a view devolver a resposta).",
+    ("endpoint", "method", "status"),
+))
+SQL_PER_REQUEST = _register(Histogram(
+    "db_statements_per_request", "Comandos SQL executados por requisição.",
+    ("endpoint",), buckets=COUNT_BUCKETS,
+))
+SQL_TIME_PER_REQUEST = _register(Histogram(
+    "db_time_per_request_seconds", "Tempo gasto em SQL por requisição.",
+    ("endpoint",),
+))
+EXCEL_LOAD = _register(Histogram(
+    "excel_load_duration_seconds", "Leitura de planilhas (app/excel_loader.py).",
+    ("loader",), buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+))
+PDF_RENDER = _register(Histogram(
+    "pdf_render_duration_seconds", "Geração do relatório em PDF (sem cache).",
+))
+
+
+def render_all() -> str:
+    lines: List[str] = []
+    for m in REGISTRY:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+def timed_excel_load(fn):
+    """
+    Decorator para os loaders do Excel: label = nome da função sem o prefixo load_.
+    """
+    name = fn.__name__[5:] if fn.__name__.startswith("load_") else fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with EXCEL_LOAD.time(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+# ======================================================
+# SQL (eventos do SQLAlchemy)
+# ======================================================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("_metrics_t0")
+    if not stack:
+        return
+    elapsed = time.perf_counter() - stack.pop()
+    if has_request_context() and "_metrics_t0" in g:
+        g._metrics_sql_count += 1
+        g._metrics_sql_time += elapsed
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("_metrics_t0"):
+        conn.info["_metrics_t0"].pop()
+
+
+_listeners_installed = False
+
+
+def _install_sql_listeners():
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    # na classe Engine: vale para todos os binds (inclusive os criados depois)
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _listeners_installed = True
+
+
+# ======================================================
+# REQUISIÇÕES
+# ======================================================
+def _before_request():
+    g._metrics_t0 = time.perf_counter()
+    g._metrics_sql_count = 0
+    g._metrics_sql_time = 0.0
+
+
+def _record(status):
+    t0 = g.pop("_metrics_t0", None)
+    if t0 is None:
+        return
+    endpoint = request.endpoint or "sem_rota"
+    REQUEST_LATENCY.observe(time.perf_counter() - t0, endpoint, request.method, status)
+    SQL_PER_REQUEST.observe(g._metrics_sql_count, endpoint)
+    SQL_TIME_PER_REQUEST.observe(g._metrics_sql_time, endpoint)
+
+
+def _after_request(response):
+    _record(response.status_code)
+    return response
+
+
+def _teardown_request(exc):
+    # só sobra _metrics_t0 aqui se a view levantou exceção (after_request não rodou)
+    if exc is not None:
+        _record(500)
+
+
+def init_app(app):
+    app.config.setdefault("METRICS_ENABLED", True)
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    _install_sql_listeners()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+    from app.cache import cache
+    if not any(m.name == "cache_hits_total" for m in REGISTRY):
+        _register(CallbackMetric("cache_hits_total", "Acertos do cache de páginas/consultas.", "counter", lambda: cache.hits))
+        _register(CallbackMetric("cache_misses_total", "Faltas do cache de páginas/consultas.", "counter", lambda: cache.misses))
+
+    from app.registro_caches import registro
+    if not any(m.name == "cache_memory_bytes" for m in REGISTRY):
+        _register(CallbackMetric("cache_memory_bytes", "Memória estimada dos caches em memória do worker.", "gauge",
+                                 registro.total_bytes))
+        _register(CallbackMetric("cache_memory_evictions_total", "Entradas despejadas por orçamento/teto.", "counter",
+                                 lambda: sum(c.despejos for c in registro.caches())))
@@ -1,5 +1,10 @@
 from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
+
 from app import db
+from app.questionario import documento_vazio, instalar_propriedades
 
 
 class AppMeta(db.Model):
@@ -10,11 +15,41 @@ class AppMeta(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class DataVersion(db.Model):
+    """
+    Contador de alterações por tabela (usado para ETag/Last-Modified).
+    Incrementado automaticamente em app/data_versions.py.
+    """
+    __tablename__ = "data_versions"
+
+    table_name = db.Column(db.String(80), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ChangeLog(db.Model):
+    """
+    Feed de alterações (GET /api/changes?since=<seq>).
+    Uma linha por registro inserido/alterado/apagado, gravada em app/changes.py.
+    op = "I" | "U" | "D" ("D" é a lápide: o registro não existe mais).
+    """
+    __tablename__ = "change_log"
+
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    table_name = db.Column(db.String(80), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    hospital_id = db.Column(db.Integer, nullable=True)
+    op = db.Column(db.String(1), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
 class Hospital(db.Model):
     __tablename__ = "hospitais"
 
     id = db.Column(db.Integer, primary_key=True)
     nome_hospital = db.Column(db.String(255), nullable=False)
+    # nome sem acento/pontuação/abreviação (app/entidades.py): busca de duplicados pelo índice
+    nome_normalizado = db.Column(db.String(255), index=True)
 
     endereco = db.Column(db.String(255))
     numero = db.Column(db.String(50))
@@ -23,6 +58,21 @@ class Hospital(db.Model):
     cidade = db.Column(db.String(120))
     estado = db.Column(db.String(20))
 
+    # chaves de território (app/territorios.py): UF canônica, cidade sem acento, 5 dígitos do CEP
+    uf_key = db.Column(db.String(2))
+    cidade_key = db.Column(db.String(120))
+    cep_prefixo = db.Column(db.String(5), index=True)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # concorrência otimista: UPDATE ... WHERE versao = <lida>; 0 linhas -> StaleDataError
+    versao = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": versao}
+    __table_args__ = (
+        # drill-down UF -> cidade e GROUP BY por nível
+        db.Index("ix_hospitais_territorio", "uf_key", "cidade_key"),
+    )
+
     contatos = db.relationship(
         "Contato",
         backref="hospital",
@@ -64,6 +114,8 @@ class Contato(db.Model):
     cargo = db.Column(db.String(255))
     telefone = db.Column(db.String(80))
 
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 
 class DadosHospital(db.Model):
     __tablename__ = "dados_hospitais"
@@ -73,46 +125,71 @@ class DadosHospital(db.Model):
     # FK
     hospital_id = db.Column(db.Integer, db.ForeignKey("hospitais.id"), unique=True, nullable=False)
 
-    # Colunas principais (já existiam no seu form inicial)
-    especialidade = db.Column(db.Text, default="")
-    leitos = db.Column(db.Text, default="")
-    leitos_uti = db.Column(db.Text, default="")
-    fatores_decisorios = db.Column(db.Text, default="")
-    prioridades_atendimento = db.Column(db.Text, default="")
-    certificacao = db.Column(db.Text, default="")
-    emtn = db.Column(db.Text, default="")
-    emtn_membros = db.Column(db.Text, default="")
+    # respostas do questionário: {"_v": 1, "<chave>": "..."} (perguntas em app/questionario.py).
+    # deferred: só vem do banco quando alguém lê; telas com poucas chaves usam respostas_parciais.
+    respostas = deferred(db.Column(
+        db.JSON().with_variant(JSONB(), "postgresql"),
+        nullable=False,
+        default=documento_vazio,
+        server_default="{}",
+    ))
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    versao = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": versao}
+    __table_args__ = (
+        # consultas por chave/valor (respostas ? 'chave', respostas @> '{"chave": "valor"}')
+        db.Index("ix_dados_respostas_gin", "respostas", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
-    # Novas colunas (vindas do Excel dadoshospitais.xlsx)
-    comissao_feridas = db.Column(db.Text, default="")
-    comissao_feridas_membros = db.Column(db.Text, default="")
 
-    nutricao_enteral_dia = db.Column(db.Text, default="")
-    pacientes_tno_dia = db.Column(db.Text, default="")
+# dados.especialidade, dados.leitos, ... -> respostas["especialidade"], ...
+instalar_propriedades(DadosHospital)
 
-    altas_orientadas = db.Column(db.Text, default="")
-    quem_orienta_alta = db.Column(db.Text, default="")
 
-    protocolo_evolucao_dieta = db.Column(db.Text, default="")
-    protocolo_evolucao_dieta_qual = db.Column(db.Text, default="")
 
-    protocolo_lesao_pressao = db.Column(db.Text, default="")
+class Marca(db.Model):
+    """
+    Marca do catálogo (uma aba de data/produtos.xlsx).
+    Sincronizada em app/catalogo_db.py.
+    """
+    __tablename__ = "marcas"
 
-    maior_desafio = db.Column(db.Text, default="")
-    dieta_padrao = db.Column(db.Text, default="")
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(50), nullable=False)
+    # nome normalizado (sem acento, maiúsculo): é por ela que se casa com as planilhas
+    chave = db.Column(db.String(50), nullable=False, unique=True)
 
-    bomba_infusao_modelo = db.Column(db.Text, default="")
-    fornecedor = db.Column(db.Text, default="")
+    produtos = db.relationship("Produto", backref="marca", lazy=True)
 
-    convenio_empresas = db.Column(db.Text, default="")
-    convenio_empresas_modelo_pagamento = db.Column(db.Text, default="")
 
-    reembolso = db.Column(db.Text, default="")
+class Produto(db.Model):
+    """
+    Produto do catálogo com os nutrientes (uma linha de data/produtos.xlsx).
+    """
+    __tablename__ = "produtos"
+    __table_args__ = (
+        db.UniqueConstraint("marca_id", "chave", name="uq_produtos_marca_chave"),
+    )
 
-    modelo_compras = db.Column(db.Text, default="")
-    contrato_tipo = db.Column(db.Text, default="")
-    nova_etapa_negociacao = db.Column(db.Text, default="")
+    id = db.Column(db.Integer, primary_key=True)
+    marca_id = db.Column(db.Integer, db.ForeignKey("marcas.id", ondelete="CASCADE"), nullable=False)
 
+    nome = db.Column(db.String(255), nullable=False)
+    chave = db.Column(db.String(255), nullable=False)
+
+    embalagem = db.Column(db.String(120))
+    referencia = db.Column(db.String(120))
+    kcal = db.Column(db.String(50))
+    ptn = db.Column(db.String(50))
+    lip = db.Column(db.String(50))
+    fibras = db.Column(db.String(50))
+    sodio = db.Column(db.String(50))
+    ferro = db.Column(db.String(50))
+    potassio = db.Column(db.String(50))
+    vit_b12 = db.Column(db.String(50))
+    gordura_saturada = db.Column(db.String(50))
 
 
 class ProdutoHospital(db.Model):
@@ -130,6 +207,13 @@ class ProdutoHospital(db.Model):
     marca_planilha = db.Column(db.String(50))
 
     produto = db.Column(db.String(255), nullable=False)
+    # item do catálogo (NULL = nome sem correspondência em produtos.xlsx)
+    produto_id = db.Column(
+        db.Integer,
+        db.ForeignKey("produtos.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
     quantidade = db.Column(db.Integer, nullable=False, default=0)
 
     embalagem = db.Column(db.String(120))
@@ -143,3 +227,7 @@ class ProdutoHospital(db.Model):
     potassio = db.Column(db.String(50))
     vit_b12 = db.Column(db.String(50))
     gordura_saturada = db.Column(db.String(50))
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    produto_catalogo = db.relationship("Produto", lazy=True)
@@ -0,0 +1,273 @@
+# app/pdf_layout.py
+"""
+Motor de layout simples para os relatórios em PDF (reportlab/canvas).
+
+- mede o texto pela largura real da fonte (stringWidth com cache)
+- quebra parágrafos pela largura disponível, não por número de caracteres
+- faz a quebra de página em TODOS os caminhos (campo, parágrafo, tabela)
+- só troca de fonte no canvas quando ela realmente muda
+"""
+import io
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+
+
+@lru_cache(maxsize=16384)
+def text_width(text: str, font: str, size: float) -> float:
+    """
+    Largura do texto em pontos (cacheada: palavras se repetem muito nos relatórios).
+    """
+    return stringWidth(text, font, size)
+
+
+def _split_long_word(word: str, max_width: float, font: str, size: float) -> List[str]:
+    """
+    Quebra uma palavra maior que a linha (ex.: URLs, códigos) em pedaços que cabem.
+    """
+    parts: List[str] = []
+    current = ""
+    current_w = 0.0
+    for ch in word:
+        ch_w = text_width(ch, font, size)
+        if current and current_w + ch_w > max_width:
+            parts.append(current)
+            current, current_w = ch, ch_w
+        else:
+            current += ch
+            current_w += ch_w
+    if current:
+        parts.append(current)
+    return parts
+
+
+def wrap_text(text: str, max_width: float, font: str = FONT, size: float = 9) -> List[str]:
+    """
+    Quebra o texto em linhas que cabem em max_width (respeita quebras de linha do usuário).
+    """
+    txt = "" if text is None else str(text)
+    space_w = text_width(" ", font, size)
+    lines: List[str] = []
+
+    for raw_line in txt.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        words = raw_line.split()
+        if not words:
+            lines.append("")
+            continue
+
+        current: List[str] = []
+        current_w = 0.0
+        for word in words:
+            w = text_width(word, font, size)
+
+            if w > max_width:
+                # palavra sozinha não cabe: fecha a linha atual e fatia a palavra
+                if current:
+                    lines.append(" ".join(current))
+                    current, current_w = [], 0.0
+                pieces = _split_long_word(word, max_width, font, size)
+                lines.extend(pieces[:-1])
+                current = [pieces[-1]]
+                current_w = text_width(pieces[-1], font, size)
+                continue
+
+            needed = w if not current else current_w + space_w + w
+            if needed <= max_width:
+                current.append(word)
+                current_w = needed
+            else:
+                lines.append(" ".join(current))
+                current, current_w = [word], w
+
+        if current:
+            lines.append(" ".join(current))
+
+    return lines or [""]
+
+
+class ReportLayout:
+    """
+    Canvas + cursor vertical. Cada método desenha e avança o cursor,
+    quebrando a página quando necessário.
+    """
+
+    def __init__(self, pagesize=A4, margin: float = 2 * cm, font_size: float = 9, leading: float = 0.45 * cm):
+        self._buffer = io.BytesIO()
+        self.canvas = canvas.Canvas(self._buffer, pagesize=pagesize)
+        self.page_width, self.page_height = pagesize
+
+        self.left = margin
+        self.right = self.page_width - margin
+        self.top = self.page_height - margin
+        self.bottom = margin
+        self.content_width = self.right - self.left
+
+        self.font_size = font_size
+        self.leading = leading
+
+        self.y = self.top
+        self.pages = 1
+        self._font: Optional[Tuple[str, float]] = None
+        self._on_new_page = None
+        self.pdf_bytes = b""
+
+    # ---------------- página / fonte ----------------
+    def set_font(self, name: str, size: float):
+        if self._font != (name, size):
+            self.canvas.setFont(name, size)
+            self._font = (name, size)
+
+    def new_page(self):
+        self.canvas.showPage()
+        self.pages += 1
+        self.y = self.top
+        # o reportlab reinicia o estado gráfico a cada página
+        self._font = None
+        if self._on_new_page:
+            self._on_new_page()
+
+    def ensure_space(self, height: float) -> bool:
+        """
+        Garante espaço vertical; devolve True se precisou abrir página nova.
+        """
+        if self.y - height < self.bottom:
+            self.new_page()
+            return True
+        return False
+
+    def spacer(self, height: float):
+        self.y -= height
+
+    # ---------------- texto ----------------
+    def _draw_lines(self, x: float, lines: Sequence[str], font: str, size: float, leading: float):
+        """
+        Desenha as linhas num único text object por página (um setFont por bloco).
+        """
+        pending = list(lines)
+        while pending:
+            available = int((self.y - self.bottom) // leading)
+            if available <= 0:
+                self.new_page()
+                continue
+
+            chunk, pending = pending[:available], pending[available:]
+            # a fonte vem do canvas (o text object herda); assim o estado rastreado não se perde
+            self.set_font(font, size)
+            t = self.canvas.beginText(x, self.y)
+            t.setLeading(leading)
+            for ln in chunk:
+                t.textLine(ln)
+            self.canvas.drawText(t)
+            self.y -= leading * len(chunk)
+
+    def title(self, txt: str, size: float = 14):
+        self.ensure_space(0.8 * cm)
+        self.set_font(FONT_BOLD, size)
+        self.canvas.drawString(self.left, self.y, txt)
+        self.y -= 0.8 * cm
+
+    def field(self, label: str, value, label_width: float = 4 * cm):
+        """
+        "Label: valor" numa linha; o valor quebra na largura restante (sem truncar).
+        """
+        size = self.font_size
+        value_width = self.content_width - label_width
+        lines = wrap_text(_text_or_dash(value), value_width, FONT, size)
+
+        self.ensure_space(self.leading)
+        self.set_font(FONT_BOLD, size)
+        self.canvas.drawString(self.left, self.y, f"{label}:")
+        self._draw_lines(self.left + label_width, lines, FONT, size, self.leading)
+        self.y -= 0.05 * cm
+
+    def paragraph(self, label: str, value):
+        """
+        Label em negrito e o texto abaixo ocupando a largura toda.
+        """
+        size = self.font_size
+        lines = wrap_text(_text_or_dash(value), self.content_width, FONT, size)
+
+        # evita label "órfão" no rodapé da página
+        self.ensure_space(self.leading * 2)
+        self.set_font(FONT_BOLD, size)
+        self.canvas.drawString(self.left, self.y, f"{label}:")
+        self.y -= self.leading
+        self._draw_lines(self.left, lines, FONT, size, self.leading)
+        self.y -= 0.2 * cm
+
+    # ---------------- tabela ----------------
+    def table(self, headers: Sequence[str], rows: Sequence[Sequence], col_widths: Sequence[float],
+              font_size: float = 8, leading: float = 0.4 * cm, empty_label: str = "Itens"):
+        """
+        Tabela com colunas de largura relativa (col_widths soma ~1.0).
+        Células quebram por largura; o cabeçalho é repetido em cada página.
+        """
+        total = float(sum(col_widths)) or 1.0
+        widths = [self.content_width * (w / total) for w in col_widths]
+        xs = []
+        x = self.left
+        for w in widths:
+            xs.append(x)
+            x += w
+        pad = 0.1 * cm
+
+        def draw_header():
+            self.set_font(FONT_BOLD, font_size)
+            for hx, hw, h in zip(xs, widths, headers):
+                # cabeçalho fica numa linha só
+                self.canvas.drawString(hx, self.y, wrap_text(h, hw - pad, FONT_BOLD, font_size)[0])
+            self.canvas.line(self.left, self.y - 0.12 * cm, self.right, self.y - 0.12 * cm)
+            self.y -= leading + 0.05 * cm
+
+        if not rows:
+            self.field(empty_label, "-")
+            return
+
+        self.ensure_space(leading * 2)
+        draw_header()
+
+        previous_hook = self._on_new_page
+        self._on_new_page = draw_header
+        try:
+            for row in rows:
+                cells = [
+                    wrap_text(_text_or_dash(v), w - pad, FONT, font_size)
+                    for v, w in zip(row, widths)
+                ]
+                n_lines = max(len(c) for c in cells)
+
+                # tenta manter a linha inteira na mesma página
+                if n_lines * leading <= (self.top - self.bottom) / 2:
+                    self.ensure_space(n_lines * leading)
+
+                self.set_font(FONT, font_size)
+                for i in range(n_lines):
+                    if self.ensure_space(leading):
+                        self.set_font(FONT, font_size)
+                    for cx, cell in zip(xs, cells):
+                        if i < len(cell) and cell[i]:
+                            self.canvas.drawString(cx, self.y, cell[i])
+                    self.y -= leading
+        finally:
+            self._on_new_page = previous_hook
+
+        self.y -= 0.2 * cm
+
+    # ---------------- saída ----------------
+    def finish(self) -> bytes:
+        self.canvas.showPage()
+        self.canvas.save()
+        self.pdf_bytes = self._buffer.getvalue()
+        return self.pdf_bytes
+
+
+def _text_or_dash(value) -> str:
+    txt = "" if value is None else str(value).strip()
+    return txt or "-"
@@ -1,111 +1,98 @@
-import io
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 from reportlab.lib.units import cm
 
-def build_hospital_report_pdf(hospital, contatos, dados, produtos) -> bytes:
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
+from app.pdf_layout import ReportLayout
+from app.questionario import PERGUNTAS
 
-    y = height - 2*cm
+# (rótulo no PDF, atributo de DadosHospital) — na mesma ordem da tela de dados
+DADOS_PDF_FIELDS = [(p.curto, p.chave) for p in PERGUNTAS]
 
-    def title(txt):
-        nonlocal y
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(2*cm, y, txt)
-        y -= 0.8*cm
+# (cabeçalho, atributo de ProdutoHospital / Produto do catálogo)
+NUTRIENTES_PDF_COLS = [
+    ("Kcal", "kcal"),
+    ("PTN (g)", "ptn"),
+    ("LIP (g)", "lip"),
+    ("Fibras (g)", "fibras"),
+    ("Sódio (mg)", "sodio"),
+    ("Ferro (mg)", "ferro"),
+    ("Potássio (mg)", "potassio"),
+    ("B12 (mcg)", "vit_b12"),
+    ("G. sat. (g)", "gordura_saturada"),
+]
 
-    def line(label, value):
-        nonlocal y
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(2*cm, y, f"{label}:")
-        c.setFont("Helvetica", 9)
-        c.drawString(6*cm, y, (value or "")[:120])
-        y -= 0.5*cm
 
-    def paragraph(label, value):
-        nonlocal y
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(2*cm, y, f"{label}:")
-        y -= 0.45*cm
-        c.setFont("Helvetica", 9)
-        txt = (value or "").strip()
-        if not txt:
-            txt = "-"
-        # quebra simples em linhas
-        max_chars = 110
-        for i in range(0, len(txt), max_chars):
-            c.drawString(2*cm, y, txt[i:i+max_chars])
-            y -= 0.45*cm
-            if y < 2*cm:
-                c.showPage()
-                y = height - 2*cm
+def _campo_produto(p, attr):
+    """
+    Valor gravado no produto do hospital; se vazio, o do catálogo (produto_catalogo).
+    """
+    valor = getattr(p, attr, None)
+    if (valor or "").strip():
+        return valor
+    item = getattr(p, "produto_catalogo", None)
+    return getattr(item, attr, None) if item is not None else None
 
-        y -= 0.2*cm
 
-    title("RELATÓRIO DO HOSPITAL")
-    line("ID", str(hospital.id))
-    line("Nome", hospital.nome_hospital)
-    line("Endereço", f"{hospital.endereco or ''}, {hospital.numero or ''} {hospital.complemento or ''}".strip())
-    line("CEP", hospital.cep)
-    line("Cidade/Estado", f"{hospital.cidade or ''} - {hospital.estado or ''}".strip())
+def build_hospital_report(hospital, contatos, dados, produtos) -> ReportLayout:
+    """
+    Monta o relatório e devolve o layout já finalizado (bytes em .pdf_bytes, páginas em .pages).
+    """
+    doc = ReportLayout()
 
-    y -= 0.3*cm
-    title("CONTATOS")
-    if contatos:
-        for ct in contatos:
-            line("Contato", f"{ct.nome_contato} | {ct.cargo or ''} | {ct.telefone or ''}")
-            if y < 2*cm:
-                c.showPage()
-                y = height - 2*cm
-    else:
-        line("Contatos", "-")
+    doc.title("RELATÓRIO DO HOSPITAL")
+    doc.field("ID", str(hospital.id))
+    doc.field("Nome", hospital.nome_hospital)
+    endereco = f"{hospital.endereco or ''}, {hospital.numero or ''} {hospital.complemento or ''}".strip(" ,")
+    doc.field("Endereço", endereco)
+    doc.field("CEP", hospital.cep)
+    doc.field("Cidade/Estado", f"{hospital.cidade or ''} - {hospital.estado or ''}".strip(" -"))
 
-    y -= 0.3*cm
-    title("DADOS DO HOSPITAL")
+    doc.spacer(0.3 * cm)
+    doc.title("CONTATOS")
+    doc.table(
+        ["Nome", "Cargo", "Telefone"],
+        [[ct.nome_contato, ct.cargo, ct.telefone] for ct in (contatos or [])],
+        col_widths=[0.4, 0.35, 0.25],
+        empty_label="Contatos",
+    )
+
+    doc.spacer(0.3 * cm)
+    doc.title("DADOS DO HOSPITAL")
     if dados:
-        paragraph("Especialidade", dados.especialidade)
-        paragraph("Leitos", dados.leitos)
-        paragraph("Leitos UTI", dados.leitos_uti)
-        paragraph("Fatores decisórios", dados.fatores_decisorios)
-        paragraph("Prioridades (excelência)", dados.prioridades_atendimento)
-        paragraph("Certificação", dados.certificacao)
-        paragraph("EMTN", dados.emtn)
-        paragraph("EMTN (membros)", dados.emtn_membros)
-        paragraph("Comissão de feridas", dados.comissao_feridas)
-        paragraph("Comissão de feridas (membros)", dados.comissao_feridas_membros)
-        paragraph("Nutrição enteral/dia", dados.nutricao_enteral_dia)
-        paragraph("Pacientes em TNO/dia", dados.pacientes_tno_dia)
-        paragraph("Altas orientadas", dados.altas_orientadas)
-        paragraph("Quem orienta alta", dados.quem_orienta_alta)
-        paragraph("Protocolo evolução dieta", dados.protocolo_evolucao_dieta)
-        paragraph("Qual (evolução dieta)", dados.protocolo_evolucao_dieta_qual)
-        paragraph("Protocolo lesão/feridas", dados.protocolo_lesao_pressao)
-        paragraph("Qual (lesão/feridas)", dados.protocolo_lesao_pressao_qual)
-        paragraph("Maior desafio", dados.maior_desafio)
-        paragraph("Dieta padrão", dados.dieta_padrao)
-        paragraph("Bomba de infusão (modelo)", dados.bomba_infusao_modelo)
-        paragraph("Fornecedor", dados.fornecedor)
-        paragraph("Convênio / modelo pagamento", dados.convenio_empresas)
-        paragraph("Reembolso", dados.reembolso)
-        paragraph("Modelo de compras", dados.modelo_compras)
-        paragraph("Contrato (anual/semestral)", dados.contrato_tipo)
-        paragraph("Nova etapa de negociação", dados.nova_etapa_negociacao)
+        for label, attr in DADOS_PDF_FIELDS:
+            doc.paragraph(label, getattr(dados, attr, None))
     else:
-        line("Dados", "-")
+        doc.field("Dados", "-")
 
-    y -= 0.3*cm
-    title("PRODUTOS DO HOSPITAL")
-    if produtos:
-        for p in produtos:
-            line("Produto", f"{p.marca_planilha or ''} | {p.produto} | Qtd: {p.quantidade}")
-            if y < 2*cm:
-                c.showPage()
-                y = height - 2*cm
-    else:
-        line("Produtos", "-")
+    doc.spacer(0.3 * cm)
+    doc.title("PRODUTOS DO HOSPITAL")
+    produtos = list(produtos or [])
+    doc.table(
+        ["Marca", "Produto", "Embalagem", "Referência", "Qtd"],
+        [
+            [p.marca_planilha, p.produto, _campo_produto(p, "embalagem"), _campo_produto(p, "referencia"), p.quantidade]
+            for p in produtos
+        ],
+        col_widths=[0.15, 0.4, 0.2, 0.15, 0.1],
+        empty_label="Produtos",
+    )
 
-    c.showPage()
-    c.save()
-    return buffer.getvalue()
+    # só lista na tabela de nutrientes quem tem pelo menos um valor preenchido
+    com_nutrientes = [
+        p for p in produtos
+        if any((_campo_produto(p, attr) or "").strip() for _, attr in NUTRIENTES_PDF_COLS)
+    ]
+    doc.spacer(0.3 * cm)
+    doc.title("NUTRIENTES DOS PRODUTOS")
+    doc.table(
+        ["Produto"] + [h for h, _ in NUTRIENTES_PDF_COLS],
+        [[p.produto] + [_campo_produto(p, attr) for _, attr in NUTRIENTES_PDF_COLS] for p in com_nutrientes],
+        col_widths=[0.28] + [0.08] * len(NUTRIENTES_PDF_COLS),
+        font_size=7,
+        empty_label="Nutrientes",
+    )
+
+    doc.finish()
+    return doc
+
+
+def build_hospital_report_pdf(hospital, contatos, dados, produtos) -> bytes:
+    return build_hospital_report(hospital, contatos, dados, produtos).pdf_bytes
@@ -0,0 +1,356 @@
+# app/profiler.py
+"""
+Perfil de uma requisição sob demanda (só para o admin logado).
+
+Liga por requisição com ?_perfil=1 (ou o header X-Perfil: 1):
+  - 1 / cprofile: roda a requisição sob o cProfile (view + template);
+  - amostra:      amostrador por pilha a cada PROFILER_SAMPLE_INTERVAL s
+                  (sobrecarga baixa, bom para páginas lentas de verdade).
+Junto vão os comandos SQL que a requisição executou, com o tempo de cada um.
+
+Cada perfil fica em PROFILER_DIR (padrão instance/perfis), um por arquivo,
+e só os PROFILER_KEEP mais recentes são mantidos:
+    <id>.json    resumo (rota, status, duração, SQL)
+    <id>.prof    pstats (python -m pstats / snakeviz)
+    <id>.stacks  pilhas colapsadas do amostrador (flamegraph.pl / speedscope)
+Para o cProfile as pilhas colapsadas são derivadas do grafo de chamadas (aproximação).
+
+Sem o parâmetro a requisição não paga nada além de olhar a query string:
+o listener de SQL sai na primeira linha enquanto nenhum perfil estiver ativo.
+PROFILER=off nem registra os hooks. Admin: /admin/perfis.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import current_app, g, request, session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PARAMETRO = "_perfil"
+HEADER = "X-Perfil"
+MODOS = {"1": "cprofile", "cprofile": "cprofile", "amostra": "amostra"}
+
+_RE_ID = re.compile(r"^\d{14}-[0-9a-f]{6}$")
+
+# perfis em andamento (em qualquer thread); 0 = listener de SQL não faz nada
+_ativos = 0
+_lock = threading.Lock()
+
+
+# ======================================================
+# AMOSTRADOR
+# ======================================================
+def _rotulo(filename: str, funcname: str) -> str:
+    # ";" separa os quadros no formato colapsado
+    return f"{os.path.basename(filename)}:{funcname}".replace(";", ",")
+
+
+class Amostrador(threading.Thread):
+    """
+    Lê a pilha da thread da requisição a cada `intervalo` s (sys._current_frames).
+    """
+
+    def __init__(self, thread_id: int, intervalo: float):
+        super().__init__(daemon=True, name="perfil-amostrador")
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.pilhas: Counter = Counter()
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.thread_id)
+            quadros = []
+            while frame is not None:
+                quadros.append(_rotulo(frame.f_code.co_filename, frame.f_code.co_name))
+                frame = frame.f_back
+            if quadros:
+                self.pilhas[";".join(reversed(quadros))] += 1
+
+    def parar(self) -> Counter:
+        self._parar.set()
+        self.join()
+        return self.pilhas
+
+
+# ======================================================
+# PSTATS -> PILHAS COLAPSADAS
+# ======================================================
+def colapsar_pstats(stats: pstats.Stats, minimo: float = 1e-5, profundidade: int = 64) -> Counter:
+    """
+    {"a;b;c": microssegundos} a partir do grafo caller -> callee do cProfile.
+    O tempo de cada aresta é repartido pelos filhos na proporção do cumtime
+    (o cProfile não guarda a pilha inteira, então é uma aproximação).
+    """
+    dados = stats.stats
+    filhos: Dict[tuple, Dict[tuple, float]] = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in dados.items():
+        for caller, aresta in callers.items():
+            filhos.setdefault(caller, {})[func] = aresta[3]
+
+    out: Counter = Counter()
+
+    def visitar(func, peso, pilha, nomes):
+        _cc, _nc, tt, ct, _callers = dados[func]
+        fracao = peso / ct if ct else 0.0
+        nomes = nomes + [_rotulo(func[0], func[2])]
+        chave = ";".join(nomes)
+        proprio = int(tt * fracao * 1e6)
+        if proprio:
+            out[chave] += proprio
+        if len(nomes) >= profundidade:
+            return
+        pilha = pilha | {func}
+        for filho, ct_aresta in filhos.get(func, {}).items():
+            t = ct_aresta * fracao
+            if filho in pilha or filho not in dados or t < minimo:
+                continue
+            visitar(filho, t, pilha, nomes)
+
+    for func, (_cc, _nc, _tt, ct, callers) in dados.items():
+        if not callers:
+            visitar(func, ct, frozenset(), [])
+    return out
+
+
+def texto_colapsado(pilhas: Counter) -> str:
+    return "".join(f"{pilha} {n}\n" for pilha, n in pilhas.most_common())
+
+
+# ======================================================
+# ARMAZENAMENTO
+# ======================================================
+def _dir() -> str:
+    return current_app.config["PROFILER_DIR"]
+
+
+def caminho(perfil_id: str, extensao: str) -> Optional[str]:
+    """
+    Arquivo de um perfil (None se o id é inválido ou o arquivo não existe).
+    """
+    if not _RE_ID.match(perfil_id or ""):
+        return None
+    path = os.path.join(_dir(), f"{perfil_id}.{extensao}")
+    return path if os.path.isfile(path) else None
+
+
+def listar(limite: Optional[int] = None) -> List[Dict]:
+    """
+    Resumos dos perfis, mais recentes primeiro.
+    """
+    try:
+        nomes = sorted((f for f in os.listdir(_dir()) if f.endswith(".json")), reverse=True)
+    except OSError:
+        return []
+    out = []
+    for f in nomes[:limite]:
+        try:
+            with open(os.path.join(_dir(), f), encoding="utf-8") as fp:
+                out.append(json.load(fp))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def carregar(perfil_id: str) -> Optional[Dict]:
+    path = caminho(perfil_id, "json")
+    if path is None:
+        return None
+    with open(path, encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def relatorio_pstats(perfil_id: str, ordem: str = "cumulative", linhas: int = 40) -> str:
+    path = caminho(perfil_id, "prof")
+    if path is None:
+        return ""
+    buf = io.StringIO()
+    pstats.Stats(path, stream=buf).sort_stats(ordem).print_stats(linhas)
+    return buf.getvalue()
+
+
+def pilhas_colapsadas(perfil_id: str) -> Optional[str]:
+    """
+    Do amostrador, se houver; senão derivadas do pstats.
+    """
+    path = caminho(perfil_id, "stacks")
+    if path is not None:
+        with open(path, encoding="utf-8") as fp:
+            return fp.read()
+    path = caminho(perfil_id, "prof")
+    if path is None:
+        return None
+    return texto_colapsado(colapsar_pstats(pstats.Stats(path)))
+
+
+def apagar_todos() -> int:
+    n = 0
+    for p in listar():
+        for ext in ("json", "prof", "stacks"):
+            path = caminho(p["id"], ext)
+            if path:
+                os.remove(path)
+        n += 1
+    return n
+
+
+def _podar(manter: int):
+    for p in listar()[manter:]:
+        for ext in ("json", "prof", "stacks"):
+            path = caminho(p["id"], ext)
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# ======================================================
+# SQL
+# ======================================================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not _ativos or "_perfil" not in g:
+        return
+    conn.info.setdefault("_perfil_sql", []).append((statement, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    pilha = conn.info.get("_perfil_sql")
+    if not pilha or "_perfil" not in g:
+        return
+    sql, t0 = pilha.pop()
+    g._perfil["sql"].append({"sql": sql, "ms": round((time.perf_counter() - t0) * 1000, 2)})
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("_perfil_sql"):
+        conn.info["_perfil_sql"].pop()
+
+
+# ======================================================
+# REQUISIÇÕES
+# ======================================================
+def _modo_pedido() -> Optional[str]:
+    valor = request.args.get(PARAMETRO) or request.headers.get(HEADER)
+    if not valor:
+        return None
+    modo = MODOS.get(valor.strip().lower())
+    # para quem não é admin o parâmetro é ignorado (nada de perfil anônimo)
+    return modo if modo and session.get("is_admin") else None
+
+
+def _before_request():
+    modo = _modo_pedido()
+    if modo is None:
+        return
+
+    global _ativos
+    with _lock:
+        _ativos += 1
+    perfil = {"modo": modo, "sql": [], "t0": time.perf_counter(), "criado_em": datetime.now()}
+    if modo == "amostra":
+        perfil["amostrador"] = Amostrador(threading.get_ident(), current_app.config["PROFILER_SAMPLE_INTERVAL"])
+        perfil["amostrador"].start()
+    else:
+        perfil["cprofile"] = cProfile.Profile()
+        perfil["cprofile"].enable()
+    g._perfil = perfil
+
+
+def _finalizar(status: int) -> Optional[str]:
+    perfil = g.pop("_perfil", None)
+    if perfil is None:
+        return None
+
+    global _ativos
+    duracao = time.perf_counter() - perfil["t0"]
+    prof = perfil.get("cprofile")
+    pilhas = None
+    if prof is not None:
+        prof.disable()
+    else:
+        pilhas = perfil["amostrador"].parar()
+    with _lock:
+        _ativos -= 1
+
+    perfil_id = f"{perfil['criado_em']:%Y%m%d%H%M%S}-{secrets.token_hex(3)}"
+    diretorio = _dir()
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        if prof is not None:
+            prof.dump_stats(os.path.join(diretorio, f"{perfil_id}.prof"))
+        else:
+            with open(os.path.join(diretorio, f"{perfil_id}.stacks"), "w", encoding="utf-8") as fp:
+                fp.write(texto_colapsado(pilhas))
+
+        resumo = {
+            "id": perfil_id,
+            "criado_em": perfil["criado_em"].isoformat(timespec="seconds"),
+            "metodo": request.method,
+            "caminho": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status": status,
+            "modo": perfil["modo"],
+            "duracao_ms": round(duracao * 1000, 1),
+            "sql_total": len(perfil["sql"]),
+            "sql_ms": round(sum(s["ms"] for s in perfil["sql"]), 1),
+            "amostras": sum(pilhas.values()) if pilhas is not None else None,
+            "sql": perfil["sql"],
+        }
+        with open(os.path.join(diretorio, f"{perfil_id}.json"), "w", encoding="utf-8") as fp:
+            json.dump(resumo, fp, ensure_ascii=False)
+        _podar(current_app.config["PROFILER_KEEP"])
+    except OSError as e:
+        current_app.logger.warning(f"[PROFILER] não foi possível gravar o perfil: {e}")
+        return None
+    return perfil_id
+
+
+def _after_request(response):
+    perfil_id = _finalizar(response.status_code)
+    if perfil_id:
+        response.headers[HEADER] = perfil_id
+        # perfil não vai para cache HTTP nem compartilhado
+        response.headers["Cache-Control"] = "private, no-store"
+    return response
+
+
+def _teardown_request(exc):
+    # só sobra _perfil aqui se a view levantou exceção (after_request não rodou)
+    if exc is not None:
+        _finalizar(500)
+
+
+_listeners_installed = False
+
+
+def init_app(app):
+    app.config.setdefault("PROFILER", (os.environ.get("PROFILER") or "on").strip().lower())
+    app.config.setdefault("PROFILER_DIR", os.environ.get("PROFILER_DIR") or os.path.join(app.instance_path, "perfis"))
+    app.config.setdefault("PROFILER_KEEP", int(os.environ.get("PROFILER_KEEP", 50)))
+    app.config.setdefault("PROFILER_SAMPLE_INTERVAL", float(os.environ.get("PROFILER_SAMPLE_INTERVAL", 0.005)))
+
+    if app.config["PROFILER"] in ("", "0", "off", "false"):
+        return
+
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _listeners_installed = True
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
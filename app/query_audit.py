@@ -0,0 +1,186 @@
+# app/query_audit.py
+"""
+Auditoria de SQL por requisição (desenvolvimento e testes; desligada em produção).
+
+Liga com SQL_AUDIT=log (só avisa) ou SQL_AUDIT=raise (a requisição vira 500).
+Para cada requisição:
+  - conta os comandos SQL e tira a "impressão digital" de cada um
+    (mesmo SQL com parâmetros diferentes = mesma impressão);
+  - marca como N+1 provável o SELECT repetido SQL_AUDIT_REPEAT_THRESHOLD
+    vezes ou mais, com a linha do código do app que disparou;
+  - confere o orçamento da rota: @query_budget(n) na view ou
+    SQL_QUERY_BUDGETS = {"main.hospitais": 3} na config (a config vence).
+
+Respostas auditadas ganham os headers X-SQL-Queries e X-SQL-Repeats.
+As violações também ficam em `violations` (usado por tests/pytest_sql.py).
+"""
+import os
+import re
+import sysconfig
+import threading
+import traceback
+from collections import Counter
+from typing import Dict, List, Optional
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+_LIB_DIRS = tuple({os.path.abspath(p) for k, p in sysconfig.get_paths().items() if k in ("stdlib", "platstdlib", "purelib", "platlib")})
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries: int):
+    """
+    Orçamento de comandos SQL da rota. Vai ABAIXO do @bp.route (e dos outros decorators).
+    """
+    def deco(fn):
+        fn._query_budget = max_queries
+        return fn
+    return deco
+
+
+# ======================================================
+# IMPRESSÃO DIGITAL
+# ======================================================
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.I)
+_RE_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normaliza o SQL: literais viram ?, listas do IN viram (...), espaços colapsam.
+    """
+    s = _RE_STRING.sub("?", statement)
+    s = _RE_NUMBER.sub("?", s)
+    s = _RE_IN_LIST.sub("IN (...)", s)
+    return _RE_SPACES.sub(" ", s).strip()
+
+
+def _origem() -> str:
+    """
+    Linha do código que disparou o SQL: a primeira do app (fora deste módulo);
+    se não houver, a primeira fora das bibliotecas (ex.: o próprio teste).
+    """
+    fora_libs = None
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        path = os.path.abspath(frame.filename)
+        if path == _THIS_FILE:
+            continue
+        if path.startswith(APP_DIR):
+            return f"{os.path.relpath(path, os.path.dirname(APP_DIR))}:{frame.lineno} ({frame.name})"
+        if fora_libs is None and not path.startswith(_LIB_DIRS):
+            fora_libs = f"{path}:{frame.lineno} ({frame.name})"
+    return fora_libs or "?"
+
+
+# ======================================================
+# COLETA
+# ======================================================
+_lock = threading.Lock()
+violations: List[Dict] = []
+
+
+def pop_violations() -> List[Dict]:
+    with _lock:
+        out = list(violations)
+        violations.clear()
+    return out
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or "_sql_audit" not in g:
+        return
+    audit = g._sql_audit
+    audit["total"] += 1
+    # N+1 é leitura repetida; INSERT/UPDATE em laço aparece no total (orçamento)
+    if statement.lstrip()[:6].upper() != "SELECT":
+        return
+    fp = fingerprint(statement)
+    audit["fingerprints"][fp] += 1
+    # a origem só é guardada na 2ª ocorrência (a pilha custa caro)
+    if audit["fingerprints"][fp] == 2:
+        audit["origens"][fp] = _origem()
+
+
+def _budget_for(endpoint: Optional[str]) -> Optional[int]:
+    if not endpoint:
+        return None
+    budgets = current_app.config.get("SQL_QUERY_BUDGETS") or {}
+    if endpoint in budgets:
+        return budgets[endpoint]
+    view = current_app.view_functions.get(endpoint)
+    return getattr(view, "_query_budget", None)
+
+
+def _before_request():
+    g._sql_audit = {"total": 0, "fingerprints": Counter(), "origens": {}}
+
+
+def _after_request(response):
+    audit = g.pop("_sql_audit", None)
+    if audit is None:
+        return response
+
+    limite = current_app.config["SQL_AUDIT_REPEAT_THRESHOLD"]
+    repetidos = [
+        {"sql": fp, "vezes": n, "origem": audit["origens"].get(fp, "?")}
+        for fp, n in audit["fingerprints"].most_common()
+        if n >= limite
+    ]
+    budget = _budget_for(request.endpoint)
+
+    response.headers["X-SQL-Queries"] = str(audit["total"])
+    response.headers["X-SQL-Repeats"] = str(len(repetidos))
+
+    problemas = []
+    if budget is not None and audit["total"] > budget:
+        problemas.append(f"{audit['total']} comandos SQL (orçamento: {budget})")
+    for r in repetidos:
+        problemas.append(f"N+1 provável: {r['vezes']}x em {r['origem']}: {r['sql'][:200]}")
+    if not problemas:
+        return response
+
+    v = {
+        "endpoint": request.endpoint,
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "total": audit["total"],
+        "budget": budget,
+        "repetidos": repetidos,
+        "problemas": problemas,
+    }
+    with _lock:
+        violations.append(v)
+
+    msg = f"[SQL_AUDIT] {request.method} {v['path']} ({request.endpoint}): " + " | ".join(problemas)
+    if current_app.config["SQL_AUDIT"] == "raise":
+        raise QueryBudgetExceeded(msg)
+    current_app.logger.warning(msg)
+    return response
+
+
+_listener_installed = False
+
+
+def init_app(app):
+    app.config.setdefault("SQL_AUDIT", (os.environ.get("SQL_AUDIT") or "").strip().lower())
+    app.config.setdefault("SQL_AUDIT_REPEAT_THRESHOLD", int(os.environ.get("SQL_AUDIT_REPEAT_THRESHOLD", 3)))
+    app.config.setdefault("SQL_QUERY_BUDGETS", {})
+
+    if app.config["SQL_AUDIT"] in ("", "0", "off", "false"):
+        return  # produção: nenhum listener, custo zero
+
+    global _listener_installed
+    if not _listener_installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        _listener_installed = True
+    app.before_request(_before_request)
+    app.after_request(_after_request)
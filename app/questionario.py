@@ -0,0 +1,227 @@
+# app/questionario.py
+"""
+Registro das perguntas do questionário (dadoshospitais.xlsx -> DadosHospital).
+
+As respostas ficam num documento JSON (JSONB no Postgres) em
+dados_hospitais.respostas:
+    {"_v": 1, "especialidade": "...", "leitos": "...", ...}
+Pergunta nova = uma linha em PERGUNTAS. Não precisa de coluna nova, de ALTER
+no fix_schema_dados, de mapeamento no import nem de campo à mão no formulário:
+tudo isso sai daqui.
+
+"_v" é a versão do documento. Renomear uma chave = nova chave com a antiga em
+`antigas` e VERSAO_DOCUMENTO + 1; documentos antigos são normalizados na leitura.
+
+Cada pergunta vira uma propriedade de DadosHospital (dados.leitos), então
+templates, edição e API continuam lendo/gravando atributos. A coluna é
+carregada sob demanda (deferred): telas que usam poucas chaves buscam só
+elas (respostas_parciais), sem trazer o documento inteiro.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+VERSAO_DOCUMENTO = 1
+CHAVE_VERSAO = "_v"
+
+
+class Pergunta(NamedTuple):
+    chave: str
+    rotulo: str                      # formulário / tela de conflito
+    curto: str                       # PDF
+    cabecalhos: Tuple[str, ...] = ()  # cabeçalhos aceitos no Excel (a chave também vale)
+    largura: int = 6                 # colunas do grid (12 = linha inteira)
+    linhas: int = 0                  # 0 = input; >0 = textarea com essa altura
+    secao: int = 1                   # muda de seção = separador no formulário
+    antigas: Tuple[str, ...] = ()    # chaves anteriores (renomeações)
+
+    @property
+    def candidatos(self) -> List[str]:
+        return list(self.cabecalhos) + [self.chave]
+
+
+PERGUNTAS: Tuple[Pergunta, ...] = (
+    Pergunta("especialidade", "Especialidade", "Especialidade",
+             ("Qual a especialidade do hospital?",)),
+    Pergunta("leitos", "Leitos", "Leitos", ("Quantos leitos?",), largura=3),
+    Pergunta("leitos_uti", "Leitos UTI", "Leitos UTI", ("Quantos leitos de UTI?",), largura=3),
+    Pergunta("fatores_decisorios", "Fatores decisórios", "Fatores decisórios",
+             ("Quais fatores são decisórios para o hospital escolher um determinado produto?",), largura=12, linhas=3),
+    Pergunta("prioridades_atendimento", "Prioridades de atendimento", "Prioridades (excelência)",
+             ("Quais as prioridas do hospital para um atendimento nutricional de excelencia?",), largura=12, linhas=3),
+    Pergunta("certificacao", "Certificação", "Certificação",
+             ("O hospital tem certificação ONA, CANADIAN, Joint Comission,...)?",)),
+    Pergunta("emtn", "EMTN", "EMTN", ("O hospital tem EMTN?",)),
+    Pergunta("emtn_membros", "Membros EMTN", "EMTN (membros)",
+             ("Se sim, quais os membro (nomes e especialidade)?",), largura=12, linhas=3),
+
+    Pergunta("comissao_feridas", "Tem comissão de feridas?", "Comissão de feridas",
+             ("Tem comissão de feridas?",), secao=2),
+    Pergunta("comissao_feridas_membros", "Quem faz parte? (comissão feridas)", "Comissão de feridas (membros)",
+             ("Se sim, quem faz parte?",), secao=2),
+    Pergunta("nutricao_enteral_dia", "Nutrição enteral por dia", "Nutrição enteral/dia",
+             ("Tem quantas nutrição enteral por dia?",), secao=2),
+    Pergunta("pacientes_tno_dia", "Pacientes em TNO por dia", "Pacientes em TNO/dia",
+             ("Tem quantos pacientes em TNO por dia?",), secao=2),
+    Pergunta("altas_orientadas", "Altas orientadas (semana/mês)", "Altas orientadas",
+             ("Quantas altas orientadas por semana ou por mês?",), secao=2),
+    Pergunta("quem_orienta_alta", "Quem orienta a alta?", "Quem orienta alta",
+             ("Quem faz esta orientação de alta?",), secao=2),
+    Pergunta("protocolo_evolucao_dieta", "Existe protocolo de evolução de dieta?", "Protocolo evolução dieta",
+             ("Existe um protocolo de evolução de dieta?",), secao=2),
+    # Atenção: existe um "Qual?" genérico na planilha (logo depois do protocolo de evolução)
+    Pergunta("protocolo_evolucao_dieta_qual", "Qual? (protocolo evolução)", "Qual (evolução dieta)",
+             ("Qual?",), secao=2),
+    Pergunta("protocolo_lesao_pressao", "Protocolo para suplementação (lesão por pressão/feridas)?",
+             "Protocolo lesão/feridas",
+             ("Existe um protocolo para suplementação de pacientes com lesão por pressão ou feridas?",),
+             largura=12, linhas=2, secao=2),
+    Pergunta("maior_desafio", "Maior desafio na terapia nutricional", "Maior desafio",
+             ("Qual o maior desafio na terapia nutricional do paciente internando no hospital?",),
+             largura=12, linhas=2, secao=2),
+    Pergunta("dieta_padrao", "Dieta padrão utilizada", "Dieta padrão",
+             ("Qual a dieta padrão utilizada no hospital?",), largura=12, linhas=2, secao=2),
+    Pergunta("bomba_infusao_modelo", "Bomba de infusão (modelo)", "Bomba de infusão (modelo)",
+             ("Em relação à bomba de infusão: () é própria; () atrelada à compra de dieta; () comodato; () outro",),
+             largura=12, linhas=2, secao=2),
+    Pergunta("fornecedor", "Fornecedor", "Fornecedor", ("Qual fornecedor?",), secao=2),
+    Pergunta("convenio_empresas", "Convênio com empresas?", "Convênio com empresas",
+             ("Tem convenio com empresas?",), secao=2),
+    Pergunta("convenio_empresas_modelo_pagamento", "Qual(is) e modelo de pagamento (NF / Brasíndice / DG etc.)",
+             "Convênio / modelo pagamento",
+             ("Qual(is) e qual Modelo de pagamento (NF, brasindice com de 100%,DG)?",),
+             largura=12, linhas=2, secao=2),
+    Pergunta("reembolso", "Reembolso?", "Reembolso", ("Tem reembolso?",), secao=2),
+    Pergunta("modelo_compras", "Modelo de compras", "Modelo de compras",
+             ("Qual modelo de compras do hospital? ()bionexo; () Contrato; () Apoio; () Cotação direta "
+              "(na forma de caixa de itens)",), secao=2),
+    Pergunta("contrato_tipo", "Se contrato: anual ou semestral?", "Contrato (anual/semestral)",
+             ("Se contrato, é anual ou semestral?",), secao=2),
+    Pergunta("nova_etapa_negociacao", "Nova etapa de negociação", "Nova etapa de negociação",
+             ("Quando será a nova etapa de negociação?",), secao=2),
+)
+
+CHAVES: Tuple[str, ...] = tuple(p.chave for p in PERGUNTAS)
+POR_CHAVE: Dict[str, Pergunta] = {p.chave: p for p in PERGUNTAS}
+_RENOMEADAS: Dict[str, str] = {a: p.chave for p in PERGUNTAS for a in p.antigas}
+
+
+# ======================================================
+# DOCUMENTO
+# ======================================================
+def documento_vazio() -> Dict[str, str]:
+    return {CHAVE_VERSAO: VERSAO_DOCUMENTO}
+
+
+def normalizar(doc: Optional[dict]) -> dict:
+    """
+    Documento na versão atual (chaves renomeadas trazidas para o nome novo).
+    Não altera o original.
+    """
+    doc = dict(doc or {})
+    if doc.get(CHAVE_VERSAO) == VERSAO_DOCUMENTO:
+        return doc
+    for antiga, nova in _RENOMEADAS.items():
+        if antiga in doc:
+            valor = doc.pop(antiga)
+            doc.setdefault(nova, valor)
+    doc[CHAVE_VERSAO] = VERSAO_DOCUMENTO
+    return doc
+
+
+def _propriedade(chave: str):
+    def ler(self) -> str:
+        doc = self.respostas or {}
+        if chave not in doc and doc.get(CHAVE_VERSAO) != VERSAO_DOCUMENTO:
+            doc = normalizar(doc)
+        return doc.get(chave) or ""
+
+    def gravar(self, valor):
+        valor = "" if valor is None else str(valor)
+        atual = self.respostas or {}
+        if (atual.get(chave) or "") == valor and atual.get(CHAVE_VERSAO) == VERSAO_DOCUMENTO:
+            return  # sem mudança: não suja a linha (nem sobe a versao)
+        # documento novo a cada gravação: o ORM só percebe a mudança do JSON por atribuição
+        doc = normalizar(atual)
+        doc[chave] = valor
+        self.respostas = doc
+
+    return property(ler, gravar, doc=POR_CHAVE[chave].rotulo)
+
+
+def instalar_propriedades(model):
+    """
+    dados.<chave> para cada pergunta (lê/grava em model.respostas).
+    """
+    for chave in CHAVES:
+        setattr(model, chave, _propriedade(chave))
+
+
+# ======================================================
+# CONSULTAS (sem carregar o documento inteiro)
+# ======================================================
+class Respostas(dict):
+    """
+    Algumas respostas de um hospital, com acesso por atributo como o model (dados.leitos).
+    """
+
+    def __getattr__(self, nome):
+        if nome in POR_CHAVE:
+            return self.get(nome) or ""
+        raise AttributeError(nome)
+
+
+def coluna(chave: str):
+    """
+    Expressão SQL com o texto da resposta (->> no Postgres, json_extract no SQLite).
+    """
+    from app.models import DadosHospital
+
+    return DadosHospital.respostas[chave].as_string()
+
+
+def respostas_parciais(hospital_id: int, chaves: Sequence[str]) -> Optional[Respostas]:
+    """
+    Só as chaves pedidas, extraídas no banco (None se o hospital não tem dados).
+    """
+    from app import db
+    from app.models import DadosHospital
+
+    row = (
+        db.session.query(DadosHospital.id, *[coluna(c) for c in chaves])
+        .filter(DadosHospital.hospital_id == hospital_id)
+        .first()
+    )
+    if row is None:
+        return None
+    return Respostas({c: (v or "") for c, v in zip(chaves, row[1:])})
+
+
+def filtro_resposta(chave: str, valor: str):
+    """
+    WHERE para "resposta == valor". No Postgres vira respostas @> {"chave": "valor"},
+    que usa o índice GIN (ix_dados_respostas_gin).
+    """
+    from app import db
+    from app.models import DadosHospital
+
+    if db.engine.dialect.name == "postgresql":
+        return DadosHospital.respostas.contains({chave: valor})
+    return coluna(chave) == valor
+
+
+def respostas_do_excel(row, pick) -> Dict[str, str]:
+    """
+    {chave: valor} de uma linha do dadoshospitais (pick = routes._pick).
+    """
+    return {p.chave: (pick(row, p.candidatos) or "").strip() for p in PERGUNTAS}
+
+
+def secoes() -> Iterable[Tuple[int, List[Pergunta]]]:
+    """
+    Perguntas agrupadas por seção, na ordem do registro (para o formulário).
+    """
+    grupos: List[Tuple[int, List[Pergunta]]] = []
+    for p in PERGUNTAS:
+        if not grupos or grupos[-1][0] != p.secao:
+            grupos.append((p.secao, []))
+        grupos[-1][1].append(p)
+    return grupos
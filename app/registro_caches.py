@@ -0,0 +1,300 @@
+# app/registro_caches.py
+"""
+Registro central dos caches em memória do processo (um por worker).
+
+Cada cache se registra com nome, orçamento de memória e política:
+  lru -> quando passa do orçamento sai a entrada usada há mais tempo;
+  ttl -> cada entrada vale `ttl` segundos; passando do orçamento sai a mais antiga.
+O tamanho de cada entrada é estimado uma vez, na gravação (tamanho_aproximado).
+
+Acima dos orçamentos há o teto do worker (CACHE_MEMORIA_TETO_MB): se a soma
+dos caches passar dele, sai a entrada usada há mais tempo entre TODOS os caches.
+
+Caches registrados hoje:
+  dados_excel   tabela compacta do dadoshospitais (routes)
+  catalogo      pacote JSON/gzip do catálogo (catalogo.py)
+  equivalencia  índice de nutrientes (equivalencia.py)
+  paginas       backend "lru" do cache de páginas/consultas (cache.py)
+
+Orçamentos podem ser trocados na config: CACHE_ORCAMENTOS_MB = {"paginas": 128}.
+Admin: /admin/caches (estatísticas, limpar um ou todos — só no worker que atendeu).
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+MB = 1024 * 1024
+POLITICAS = ("lru", "ttl")
+
+_MISSING = object()
+_SEM_RECURSAO = (str, bytes, bytearray, int, float, bool, complex, type(None), type, ModuleType, FunctionType)
+
+
+def tamanho_aproximado(obj: Any, limite_objetos: int = 2_000_000) -> int:
+    """
+    Bytes retidos por `obj` (sys.getsizeof recursivo, cada objeto contado uma vez).
+    Segue dicts, sequências, conjuntos, __dict__ e __slots__; arrays do NumPy
+    contam o buffer (getsizeof já inclui). Objetos do ORM: o estado do SQLAlchemy
+    (_sa_instance_state) fica de fora, senão a conta puxa a sessão inteira.
+    """
+    vistos = set()
+    total = 0
+    pilha = [obj]
+    while pilha and len(vistos) < limite_objetos:
+        o = pilha.pop()
+        if id(o) in vistos:
+            continue
+        vistos.add(id(o))
+        try:
+            total += sys.getsizeof(o)
+        except TypeError:
+            continue
+        if isinstance(o, _SEM_RECURSAO):
+            continue
+        if isinstance(o, dict):
+            pilha.extend(o.keys())
+            pilha.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            pilha.extend(o)
+        else:
+            d = getattr(o, "__dict__", None)
+            if isinstance(d, dict):
+                pilha.append({k: v for k, v in d.items() if not k.startswith("_sa_")})
+            for cls in type(o).__mro__:
+                for nome in getattr(cls, "__slots__", ()):
+                    v = getattr(o, nome, _MISSING)
+                    if v is not _MISSING:
+                        pilha.append(v)
+    return total
+
+
+class _Entrada:
+    __slots__ = ("valor", "bytes", "expira", "acesso")
+
+    def __init__(self, valor, tamanho: int, expira: float):
+        self.valor = valor
+        self.bytes = tamanho
+        self.expira = expira
+        self.acesso = time.monotonic()
+
+
+# ======================================================
+# CACHE
+# ======================================================
+class CacheMemoria:
+    """
+    Chave -> valor com orçamento em bytes, política lru/ttl e contadores.
+    """
+
+    def __init__(self, nome: str, orcamento_bytes: int, politica: str = "lru", ttl: float = 0,
+                 max_entradas: Optional[int] = None, descricao: str = "", registro: "RegistroCaches" = None):
+        if politica not in POLITICAS:
+            raise ValueError(f"política inválida: {politica}")
+        self.nome = nome
+        self.orcamento_bytes = orcamento_bytes
+        self.politica = politica
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.descricao = descricao
+        self.registro = registro
+        self._dados: "OrderedDict[Any, _Entrada]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.despejos = 0
+        self.expirados = 0
+        self.recusados = 0  # entradas maiores que o orçamento inteiro
+
+    # ---------- leitura/escrita ----------
+    def get(self, chave, default=None):
+        with self._lock:
+            e = self._dados.get(chave)
+            if e is not None and e.expira and e.expira < time.monotonic():
+                self._remover(chave)
+                self.expirados += 1
+                e = None
+            if e is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            e.acesso = time.monotonic()
+            if self.politica == "lru":
+                self._dados.move_to_end(chave)
+            return e.valor
+
+    def set(self, chave, valor, tamanho: Optional[int] = None, ttl: Optional[float] = None):
+        tamanho = tamanho_aproximado(valor) if tamanho is None else tamanho
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if chave in self._dados:
+                self._remover(chave)
+            if tamanho > self.orcamento_bytes:
+                self.recusados += 1
+                return
+            self._dados[chave] = _Entrada(valor, tamanho, time.monotonic() + ttl if ttl else 0)
+            self.bytes += tamanho
+            while self._dados and (
+                self.bytes > self.orcamento_bytes
+                or (self.max_entradas is not None and len(self._dados) > self.max_entradas)
+            ):
+                self.despejar_mais_antiga()
+        # fora do lock do cache: o teto global olha todos os caches
+        if self.registro is not None:
+            self.registro.aplicar_teto()
+
+    def get_or_set(self, chave, calcular: Callable[[], Any], tamanho: Optional[Callable[[Any], int]] = None):
+        valor = self.get(chave, _MISSING)
+        if valor is _MISSING:
+            valor = calcular()
+            self.set(chave, valor, tamanho(valor) if tamanho else None)
+        return valor
+
+    def delete(self, chave):
+        with self._lock:
+            if chave in self._dados:
+                self._remover(chave)
+
+    def clear(self) -> int:
+        with self._lock:
+            n = len(self._dados)
+            self._dados.clear()
+            self.bytes = 0
+            return n
+
+    # ---------- despejo ----------
+    def _remover(self, chave):
+        e = self._dados.pop(chave)
+        self.bytes -= e.bytes
+
+    def despejar_mais_antiga(self) -> bool:
+        """
+        lru: a usada há mais tempo; ttl: a gravada há mais tempo (expira primeiro).
+        """
+        with self._lock:
+            if not self._dados:
+                return False
+            _chave, e = self._dados.popitem(last=False)
+            self.bytes -= e.bytes
+            self.despejos += 1
+            return True
+
+    def acesso_mais_antigo(self) -> Optional[float]:
+        with self._lock:
+            if not self._dados:
+                return None
+            return next(iter(self._dados.values())).acesso
+
+    # ---------- estatísticas ----------
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    def __contains__(self, chave) -> bool:
+        return chave in self._dados
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "nome": self.nome,
+                "descricao": self.descricao,
+                "politica": self.politica,
+                "ttl": self.ttl,
+                "entradas": len(self._dados),
+                "max_entradas": self.max_entradas,
+                "bytes": self.bytes,
+                "orcamento_bytes": self.orcamento_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "taxa_acerto": round(self.hits / consultas, 3) if consultas else None,
+                "despejos": self.despejos,
+                "expirados": self.expirados,
+                "recusados": self.recusados,
+            }
+
+
+# ======================================================
+# REGISTRO
+# ======================================================
+class RegistroCaches:
+    def __init__(self, teto_bytes: int = 256 * MB):
+        self.teto_bytes = teto_bytes
+        self.despejos_teto = 0
+        self.orcamentos_mb: Dict[str, float] = {}  # CACHE_ORCAMENTOS_MB (vence o padrão do código)
+        self._caches: Dict[str, CacheMemoria] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, orcamento_mb: float, politica: str = "lru", ttl: float = 0,
+                  max_entradas: Optional[int] = None, descricao: str = "") -> CacheMemoria:
+        """
+        Cria (ou devolve, se já existe) o cache `nome`.
+        """
+        orcamento_mb = self.orcamentos_mb.get(nome, orcamento_mb)
+        with self._lock:
+            c = self._caches.get(nome)
+            if c is None:
+                c = self._caches[nome] = CacheMemoria(
+                    nome, int(orcamento_mb * MB), politica, ttl, max_entradas, descricao, registro=self
+                )
+            return c
+
+    def get(self, nome: str) -> Optional[CacheMemoria]:
+        return self._caches.get(nome)
+
+    def caches(self) -> List[CacheMemoria]:
+        return [self._caches[n] for n in sorted(self._caches)]
+
+    def total_bytes(self) -> int:
+        return sum(c.bytes for c in self._caches.values())
+
+    def aplicar_teto(self):
+        """
+        Enquanto a soma passa do teto, despeja a entrada usada há mais tempo entre todos os caches.
+        """
+        if self.total_bytes() <= self.teto_bytes:
+            return
+        with self._lock:
+            while self.total_bytes() > self.teto_bytes:
+                candidatos = [(c.acesso_mais_antigo(), c) for c in self._caches.values()]
+                candidatos = [(t, c) for t, c in candidatos if t is not None]
+                if not candidatos:
+                    break
+                _t, c = min(candidatos, key=lambda tc: tc[0])
+                if c.despejar_mais_antiga():
+                    self.despejos_teto += 1
+
+    def limpar(self, nome: Optional[str] = None) -> int:
+        """
+        Esvazia um cache (ou todos). Devolve quantas entradas saíram.
+        """
+        alvo = [self._caches[nome]] if nome else list(self._caches.values())
+        return sum(c.clear() for c in alvo)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "teto_bytes": self.teto_bytes,
+            "total_bytes": self.total_bytes(),
+            "despejos_teto": self.despejos_teto,
+            "caches": [c.estatisticas() for c in self.caches()],
+        }
+
+
+registro = RegistroCaches()
+
+
+def init_app(app):
+    app.config.setdefault("CACHE_MEMORIA_TETO_MB", float(os.environ.get("CACHE_MEMORIA_TETO_MB", 256)))
+    app.config.setdefault("CACHE_ORCAMENTOS_MB", {})
+
+    registro.teto_bytes = int(app.config["CACHE_MEMORIA_TETO_MB"] * MB)
+    # caches já registrados (import do módulo) recebem o orçamento agora; os outros, ao registrar
+    registro.orcamentos_mb.update(app.config["CACHE_ORCAMENTOS_MB"])
+    for nome, mb in registro.orcamentos_mb.items():
+        c = registro.get(nome)
+        if c is not None:
+            c.orcamento_bytes = int(mb * MB)
@@ -0,0 +1,159 @@
+# app/replica.py
+"""
+Réplica de leitura (opcional).
+
+Com DATABASE_REPLICA_URL definido, o bind "replica" recebe as leituras das
+requisições GET/HEAD (listas, relatórios, catálogo, API). Escritas ficam
+sempre no primário:
+  - INSERT/UPDATE/DELETE e tudo que acontece durante um flush -> primário;
+  - depois da primeira escrita, o resto da requisição também lê do primário
+    (a transação precisa enxergar o que acabou de gravar);
+  - depois de um POST, a sessão do usuário fica "grudada" no primário por
+    REPLICA_STICKY_SECONDS (o redirect pós-POST não mostra dado velho se a
+    réplica estiver atrasada).
+
+Cache e ETag: as versões de data_versions são lidas pela mesma sessão, então
+uma página montada com dados da réplica leva as versões da réplica (ver
+app/cache.py). Réplica atrasada -> versões velhas -> quando ela alcança o
+primário, a entrada não vale mais. Ao passar para o primário no meio da
+requisição, as versões já lidas da réplica são descartadas.
+
+Views podem ajustar a regra com os decoradores (abaixo do @bp.route):
+  @somente_leitura   POST que só lê (ex.: exportar CSV): pode ir para a réplica
+                     e não gruda a sessão no primário
+  @primario          GET que precisa do dado mais recente (ou que grava algo)
+
+Teste local com dois arquivos SQLite:
+    DATABASE_URL=sqlite:////tmp/primario.db
+    DATABASE_REPLICA_URL=sqlite:////tmp/replica.db
+    flask --app manage copiar-replica     # "replica" = cópia do primário agora
+"""
+import time
+
+import click
+from flask import current_app, request, session as flask_session
+from flask.cli import with_appcontext
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = "replica"
+
+# chave na sessão do Flask: até quando (epoch) ler do primário
+_PRIMARIO_ATE = "_primario_ate"
+
+_METODOS_LEITURA = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingSession(Session):
+    """
+    Sessão do Flask-SQLAlchemy que manda SELECTs para a réplica quando
+    session.info["usar_replica"] está ligado e a requisição ainda não escreveu.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get("usar_replica") and not self.info.get("_escreveu"):
+            if self._flushing or clause is None or not getattr(clause, "is_select", False):
+                # escrita (ou session.connection() para escrever): daqui em diante, primário
+                _ir_para_primario(self)
+            else:
+                engine = self._db.engines.get(REPLICA_BIND)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _ir_para_primario(session):
+    from app.data_versions import esquecer_versoes  # replica.py carrega antes do db existir
+
+    session.info["_escreveu"] = True
+    # versões lidas da réplica não descrevem o que o primário vai devolver
+    esquecer_versoes(session)
+
+
+def na_replica(session) -> bool:
+    return bool(session.info.get("usar_replica")) and not session.info.get("_escreveu")
+
+
+# ======================================================
+# DECORADORES
+# ======================================================
+def somente_leitura(view):
+    view._somente_leitura = True
+    return view
+
+
+def primario(view):
+    view._so_primario = True
+    return view
+
+
+# ======================================================
+# HOOKS
+# ======================================================
+def _view():
+    return current_app.view_functions.get(request.endpoint) if request.endpoint else None
+
+
+def _do_orm_execute(state):
+    # DML em massa: marca antes dos listeners que fazem SELECT prévio (cache/changes)
+    if state.is_insert or state.is_update or state.is_delete:
+        _ir_para_primario(state.session)
+    return None
+
+
+def init_app(app):
+    from sqlalchemy import event
+
+    from app import db
+
+    app.config.setdefault("REPLICA_STICKY_SECONDS", 10)
+    app.cli.add_command(copiar_replica_cmd)
+    if not app.config.get("SQLALCHEMY_BINDS", {}).get(REPLICA_BIND):
+        return
+
+    # insert=True e registrado depois de cache/changes: roda antes deles
+    event.listen(db.session, "do_orm_execute", _do_orm_execute, insert=True)
+
+    @app.before_request
+    def _rotear_leitura():
+        view = _view()
+        if getattr(view, "_so_primario", False):
+            return
+        if request.method not in _METODOS_LEITURA and not getattr(view, "_somente_leitura", False):
+            return
+        if flask_session.get(_PRIMARIO_ATE, 0) > time.time():
+            return
+        db.session.info["usar_replica"] = True
+
+    @app.after_request
+    def _grudar_no_primario(response):
+        if request.method not in _METODOS_LEITURA and not getattr(_view(), "_somente_leitura", False):
+            flask_session[_PRIMARIO_ATE] = time.time() + app.config["REPLICA_STICKY_SECONDS"]
+        elif _PRIMARIO_ATE in flask_session and flask_session[_PRIMARIO_ATE] <= time.time():
+            flask_session.pop(_PRIMARIO_ATE)
+        response.headers["X-DB-Route"] = "replica" if na_replica(db.session) else "primary"
+        return response
+
+
+# ======================================================
+# CLI
+# ======================================================
+@click.command("copiar-replica")
+@with_appcontext
+def copiar_replica_cmd():
+    """Copia o banco primário para a réplica (só SQLite: simula a replicação em dev)."""
+    from app import db
+
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is None:
+        raise click.ClickException("DATABASE_REPLICA_URL não configurado.")
+    if db.engine.dialect.name != "sqlite" or replica.dialect.name != "sqlite":
+        raise click.ClickException("copiar-replica só funciona com primário e réplica em SQLite.")
+
+    origem = db.engine.raw_connection()
+    destino = replica.raw_connection()
+    try:
+        origem.driver_connection.backup(destino.driver_connection)
+    finally:
+        destino.close()
+        origem.close()
+    click.echo(f"réplica atualizada: {replica.url.database}")
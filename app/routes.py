@@ -5,25 +5,15 @@ import traceback
 import os
 from datetime import datetime
 from flask import jsonify
-# cache simples pra não ler o Excel toda hora
-_DADOS_EXCEL_CACHE = {"mtime": None, "rows": None}
-
-def _load_dados_excel_cached(data_dir="data"):
+def _load_dados_excel_cached(data_dir="data") -> "TabelaDados":
     """
-    Carrega dadoshospitais.xlsx com cache por mtime.
+    Carrega dadoshospitais (.xlsx/.csv/.tsv) com cache por (arquivo, mtime).
+    Formato compacto (app/dados_compactos.py); só a versão atual fica no cache.
     """
-    path = os.path.join(data_dir, "dadoshospitais.xlsx")
-    try:
-        mtime = os.path.getmtime(path)
-    except Exception:
-        return []
-
-    if _DADOS_EXCEL_CACHE["mtime"] != mtime or _DADOS_EXCEL_CACHE["rows"] is None:
-        rows = load_dados_hospitais_from_excel(data_dir)  # seu loader já existe
-        _DADOS_EXCEL_CACHE["rows"] = rows
-        _DADOS_EXCEL_CACHE["mtime"] = mtime
-
-    return _DADOS_EXCEL_CACHE["rows"] or []
+    versao = versao_fonte(data_dir, "dadoshospitais")
+    if versao is None:
+        return tabela_vazia()
+    return _CACHE_DADOS.get_or_set((data_dir, versao), lambda: load_dados_hospitais_compacto(data_dir))
 
 
 def _pick(row: dict, candidates: list[str]) -> str:
@@ -33,6 +23,10 @@ def _pick(row: dict, candidates: list[str]) -> str:
     if not row:
         return ""
 
+    # linha do cache compacto: o esquema já tem o mapa sem caixa
+    if isinstance(row, LinhaDados):
+        return row.primeiro(candidates)
+
     # mapa case-insensitive
     upper_map = {str(k).strip().upper(): k for k in row.keys()}
     for c in candidates:
@@ -46,136 +40,129 @@ def _pick(row: dict, candidates: list[str]) -> str:
 
 def _populate_dados_from_excel(dados_obj, excel_row: dict):
     """
-    Mapeia o Excel dadoshospitais.xlsx (cabeçalho que você mandou) -> DadosHospital.
+    Mapeia o Excel dadoshospitais.xlsx -> DadosHospital pelas perguntas de app/questionario.py.
     Só preenche se o campo do banco estiver vazio, pra não sobrescrever edições.
     """
     if not excel_row:
         return dados_obj
 
-    def set_if_empty(field_name: str, value: str):
-        if not hasattr(dados_obj, field_name):
-            return
-        current = getattr(dados_obj, field_name, None)
-        if current is None or str(current).strip() == "":
-            setattr(dados_obj, field_name, (value or "").strip())
-
-    # Campos principais que você já usa na tela
-    set_if_empty("especialidade", _pick(excel_row, ["Qual a especialidade do hospital?", "especialidade"]))
-    set_if_empty("leitos", _pick(excel_row, ["Quantos leitos?", "leitos"]))
-    set_if_empty("leitos_uti", _pick(excel_row, ["Quantos leitos de UTI?", "leitos_uti"]))
-
-    set_if_empty("fatores_decisorios", _pick(excel_row, [
-        "Quais fatores são decisórios para o hospital escolher um determinado produto?",
-        "fatores_decisorios"
-    ]))
-
-    set_if_empty("prioridades_atendimento", _pick(excel_row, [
-        "Quais as prioridas do hospital para um atendimento nutricional de excelencia?",
-        "prioridades_atendimento"
-    ]))
-
-    set_if_empty("certificacao", _pick(excel_row, [
-        "O hospital tem certificação ONA, CANADIAN, Joint Comission,...)?",
-        "certificacao"
-    ]))
-
-    set_if_empty("emtn", _pick(excel_row, ["O hospital tem EMTN?", "emtn"]))
-    set_if_empty("emtn_membros", _pick(excel_row, ["Se sim, quais os membro (nomes e especialidade)?", "emtn_membros"]))
-
-    # Campos adicionais (do seu Excel)
-    set_if_empty("comissao_feridas", _pick(excel_row, ["Tem comissão de feridas?"]))
-    set_if_empty("comissao_feridas_membros", _pick(excel_row, ["Se sim, quem faz parte?"]))
-
-    set_if_empty("nutricao_enteral_dia", _pick(excel_row, ["Tem quantas nutrição enteral por dia?"]))
-    set_if_empty("pacientes_tno_dia", _pick(excel_row, ["Tem quantos pacientes em TNO por dia?"]))
-
-    set_if_empty("altas_orientadas", _pick(excel_row, ["Quantas altas orientadas por semana ou por mês?"]))
-    set_if_empty("quem_orienta_alta", _pick(excel_row, ["Quem faz esta orientação de alta?"]))
-
-    set_if_empty("protocolo_evolucao_dieta", _pick(excel_row, ["Existe um protocolo de evolução de dieta?"]))
-
-    # Atenção: existe um "Qual?" genérico na planilha (logo depois do protocolo de evolução)
-    set_if_empty("protocolo_evolucao_dieta_qual", _pick(excel_row, ["Qual?"]))
-
-    set_if_empty("protocolo_lesao_pressao", _pick(excel_row, [
-        "Existe um protocolo para suplementação de pacientes com lesão por pressão ou feridas?"
-    ]))
-
-    set_if_empty("maior_desafio", _pick(excel_row, [
-        "Qual o maior desafio na terapia nutricional do paciente internando no hospital?"
-    ]))
-
-    set_if_empty("dieta_padrao", _pick(excel_row, ["Qual a dieta padrão utilizada no hospital?"]))
-
-    set_if_empty("bomba_infusao_modelo", _pick(excel_row, [
-        "Em relação à bomba de infusão: () é própria; () atrelada à compra de dieta; () comodato; () outro"
-    ]))
-
-    set_if_empty("fornecedor", _pick(excel_row, ["Qual fornecedor?"]))
-
-    set_if_empty("convenio_empresas", _pick(excel_row, ["Tem convenio com empresas?"]))
-
-    set_if_empty("convenio_empresas_modelo_pagamento", _pick(excel_row, [
-        "Qual(is) e qual Modelo de pagamento (NF, brasindice com de 100%,DG)?"
-    ]))
-
-    set_if_empty("reembolso", _pick(excel_row, ["Tem reembolso?"]))
-
-    set_if_empty("modelo_compras", _pick(excel_row, [
-        "Qual modelo de compras do hospital? ()bionexo; () Contrato; () Apoio; () Cotação direta (na forma de caixa de itens)"
-    ]))
-
-    set_if_empty("contrato_tipo", _pick(excel_row, ["Se contrato, é anual ou semestral?"]))
-    set_if_empty("nova_etapa_negociacao", _pick(excel_row, ["Quando será a nova etapa de negociação?"]))
+    for p in PERGUNTAS:
+        if getattr(dados_obj, p.chave):
+            continue
+        valor = (_pick(excel_row, p.candidatos) or "").strip()
+        if valor:
+            setattr(dados_obj, p.chave, valor)
 
     return dados_obj
 
 
 
-def _find_dados_row_for_hospital(hospital_id: int, data_dir="data") -> dict | None:
-    rows = _load_dados_excel_cached(data_dir)
-    for r in rows:
-        if (r.get("id_hospital") or 0) == hospital_id:
-            return r
-    return None
+def _find_dados_row_for_hospital(hospital_id: int, data_dir="data") -> "LinhaDados | None":
+    return _load_dados_excel_cached(data_dir).get(hospital_id)
 
 
 from flask import (
     Blueprint, render_template, request,
-    redirect, url_for, flash, Response
+    redirect, url_for, flash, Response, session
 )
 
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import inspect, text
+from sqlalchemy import inspect, insert, text
+from sqlalchemy.orm import joinedload, undefer
+from sqlalchemy.orm.exc import StaleDataError
 
 from config import Config
-from app import db
-from app.models import Hospital, Contato, DadosHospital, ProdutoHospital, AppMeta
-from app.auth import admin_required
-from app.pdf_report import build_hospital_report_pdf
+from app import db, lifecycle, metrics, profiler
+from app.models import Hospital, Contato, DadosHospital, ProdutoHospital, AppMeta, Marca, Produto
+from app.auth import admin_or_token_required, admin_required
+from app.cache import cache, hospital_tags
+from app.catalogo import get_bundle
+from app.dados_compactos import LinhaDados, TabelaDados, tabela_vazia
+from app.edicao import (
+    CAMPOS_DADOS, CAMPOS_HOSPITAL_INFO, ROTULOS,
+    alteracoes, aplicar_valores, base_form, mesclar, valores_form, valores_obj, versao_form,
+)
+from app.catalogo_db import IndiceCatalogo, ranking_produtos, resolver_produto_id, sincronizar_catalogo
+from app.entidades import (
+    LIMIAR_PADRAO, mesclar_hospitais, possiveis_duplicados,
+    propor_contatos_orfaos, propor_duplicados, vincular_contatos,
+)
+from app.http_cache import conditional
+from app.lote import validar_lote_contatos, validar_lote_produtos
+from app.query_audit import query_budget
+from app.questionario import PERGUNTAS, normalizar, respostas_do_excel, respostas_parciais, secoes
+from app.territorios import UFS, faixa_cep, hospitais_da_cidade, resumo_cidades, resumo_ufs
+from app.replica import primario, somente_leitura
+from app.registro_caches import registro
+
+# cache simples pra não ler o Excel toda hora
+_CACHE_DADOS = registro.registrar(
+    "dados_excel", orcamento_mb=64, max_entradas=1, descricao="dadoshospitais (tabela compacta)"
+)
 
 from app.excel_loader import (
     load_hospitais_from_excel,
     load_contatos_from_excel,
     load_dados_hospitais_from_excel,
+    load_dados_hospitais_compacto,
     load_produtos_hospitais_from_excel,
 
     # ✅ catálogo por abas do data/produtos.xlsx
-    load_marcas_from_produtos_excel,
     load_produtos_by_marca_from_produtos_excel,
+    versao_fonte,
 )
 
 
 bp = Blueprint("main", __name__)
 
-DATA_DIR = "data"
+DATA_DIR = Config.DATA_DIR
 META_KEY_EXCEL_IMPORTED = "excel_import_done"
 
+# arquivos/tabelas de que cada página depende (para ETag); sem extensão = .xlsx, .csv ou .tsv
+CATALOGO_XLSX = os.path.join(DATA_DIR, "produtos")
+DADOS_XLSX = os.path.join(DATA_DIR, "dadoshospitais")
+TODAS_TABELAS = ("hospitais", "contatos", "dados_hospitais", "produtos_hospitais", "produtos")
+
 
 def _norm(s: str) -> str:
     return (s or "").strip().upper()
 
 
+def _lista_hospitais() -> list[dict]:
+    """
+    Lista (id, nome, cidade, UF) ordenada por nome — cacheada até mudar a tabela hospitais.
+    """
+    def consultar():
+        rows = (
+            db.session.query(Hospital.id, Hospital.nome_hospital, Hospital.cidade, Hospital.estado)
+            .order_by(Hospital.nome_hospital.asc())
+            .all()
+        )
+        return [
+            {"id": r.id, "nome_hospital": r.nome_hospital, "cidade": r.cidade, "estado": r.estado}
+            for r in rows
+        ]
+
+    return cache.get_or_set("query:hospitais:lista", consultar, tags=["table:hospitais"])
+
+
+def _ranking_produtos() -> list[dict]:
+    """
+    Produtos do catálogo mais usados pelos hospitais — cacheado até mudar produtos_hospitais/produtos.
+    """
+    return cache.get_or_set("query:produtos:ranking", ranking_produtos, tags=["table:produtos_hospitais", "table:produtos"])
+
+
+def _render_cached(key: str, tags, template: str, **context) -> str:
+    """
+    Renderiza com cache. Se há mensagens flash pendentes, a página é única: não usa cache.
+    """
+    if session.get("_flashes"):
+        return render_template(template, **context)
+    key = f"page:{key}:admin={bool(session.get('is_admin'))}"
+    return cache.get_or_set(key, lambda: render_template(template, **context), tags=tags)
+
+
 # ======================================================
 # HOME
 # ======================================================
@@ -189,6 +176,18 @@ def ping():
     return "OK"
 
 
+@bp.route("/ready")
+def ready():
+    """
+    Readiness: 503 enquanto o worker aquece (só sem preload; ver app/lifecycle.py).
+    """
+    ok, estado = lifecycle.readiness()
+    resp = jsonify(estado)
+    resp.status_code = 200 if ok else 503
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
 # ======================================================
 # ADMIN
 # ======================================================
@@ -198,13 +197,21 @@ def admin_panel():
     return render_template("admin.html")
 
 
+@bp.route("/metrics", methods=["GET"])
+@admin_or_token_required("METRICS_TOKEN")
+def metrics_endpoint():
+    return Response(metrics.render_all(), mimetype="text/plain", content_type=metrics.CONTENT_TYPE,
+                    headers={"Cache-Control": "no-store"})
+
+
 # ======================================================
 # HOSPITAIS
 # ======================================================
 @bp.route("/hospitais")
+@conditional(tables=["hospitais"])
+@query_budget(3)
 def hospitais():
-    hospitais_db = Hospital.query.order_by(Hospital.nome_hospital.asc()).all()
-    return render_template("hospitais.html", hospitais=hospitais_db)
+    return _render_cached("hospitais", ["table:hospitais"], "hospitais.html", hospitais=_lista_hospitais())
 
 
 @bp.route("/hospitais/novo", methods=["GET", "POST"])
@@ -220,6 +227,12 @@ def novo_hospital():
             flash("Informe o nome do hospital.", "error")
             return redirect(url_for("main.novo_hospital"))
 
+        # mesmo nome normalizado já cadastrado: mostra e pede confirmação
+        if not request.form.get("confirmar_duplicado"):
+            duplicados = possiveis_duplicados(nome)
+            if duplicados:
+                return render_template("hospital_form.html", form=request.form, duplicados=duplicados), 409
+
         h = Hospital(
             nome_hospital=nome,
             endereco=(request.form.get("endereco") or "").strip(),
@@ -244,37 +257,72 @@ def novo_hospital():
             flash(f"Erro ao salvar hospital: {e}", "error")
             return redirect(url_for("main.novo_hospital"))
 
-    return render_template("hospital_form.html")
+    return render_template("hospital_form.html", form={}, duplicados=[])
+
+
+def _salvar_edicao(obj, campos, titulo: str, voltar: str, msg_ok: str):
+    """
+    POST dos formulários de edição: UPDATE só das colunas alteradas, sem commit
+    se nada mudou, e merge/tela de conflito se outro usuário salvou antes (app/edicao.py).
+    """
+    meus = valores_form(request.form, campos)
+    atuais = valores_obj(obj, campos)
+    versao = versao_form(request.form)
+
+    if versao is not None and versao != obj.versao:
+        novos, conflitos = mesclar(base_form(request.form, campos), meus, atuais)
+        if conflitos:
+            return render_template(
+                "conflito_edicao.html",
+                titulo=titulo,
+                action=request.path,
+                voltar=voltar,
+                versao=obj.versao,
+                base=atuais,
+                conflitos=conflitos,
+                mantidos=novos,
+                rotulos=ROTULOS,
+            ), 409
+    else:
+        novos = alteracoes(atuais, meus)
+
+    if not novos:
+        flash("Nenhuma alteração para salvar.", "info")
+        return redirect(voltar)
+
+    aplicar_valores(obj, novos)
+    try:
+        db.session.commit()
+        flash(msg_ok, "success")
+    except StaleDataError:
+        # outro commit entre a leitura e o UPDATE ... WHERE versao = <lida>
+        db.session.rollback()
+        flash("Outro usuário salvou este registro agora mesmo. Confira os dados e salve de novo.", "warning")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao salvar: {e}", "error")
+
+    return redirect(voltar)
 
 
 @bp.route("/hospitais/<int:hospital_id>/info", methods=["GET", "POST"])
+@conditional(tables=["hospitais"])
+@query_budget(6)
 def hospital_info(hospital_id):
     hospital = Hospital.query.get_or_404(hospital_id)
 
     if request.method == "POST":
-        nome = (request.form.get("nome_hospital") or "").strip()
-        if not nome:
+        voltar = url_for("main.hospital_info", hospital_id=hospital_id)
+        # a tela de conflito pode não mandar o nome (só os campos em disputa)
+        if "nome_hospital" in request.form and not (request.form.get("nome_hospital") or "").strip():
             flash("Nome do hospital é obrigatório.", "error")
-            return redirect(url_for("main.hospital_info", hospital_id=hospital_id))
-
-        hospital.nome_hospital = nome
-        hospital.endereco = (request.form.get("endereco") or "").strip()
-        hospital.numero = (request.form.get("numero") or "").strip()
-        hospital.complemento = (request.form.get("complemento") or "").strip()
-        hospital.cep = (request.form.get("cep") or "").strip()
-        hospital.cidade = (request.form.get("cidade") or "").strip()
-        hospital.estado = (request.form.get("estado") or "").strip()
-
-        try:
-            db.session.commit()
-            flash("Informações do hospital atualizadas.", "success")
-        except Exception as e:
-            db.session.rollback()
-            flash(f"Erro ao salvar: {e}", "error")
+            return redirect(voltar)
 
-        return redirect(url_for("main.hospital_info", hospital_id=hospital_id))
+        return _salvar_edicao(hospital, CAMPOS_HOSPITAL_INFO, "Informações do hospital", voltar,
+                              "Informações do hospital atualizadas.")
 
-    return render_template("hospital_info.html", hospital=hospital)
+    return render_template("hospital_info.html", hospital=hospital,
+                           base=valores_obj(hospital, CAMPOS_HOSPITAL_INFO))
 
 
 @bp.route("/hospitais/<int:hospital_id>/excluir", methods=["POST"])
@@ -302,6 +350,8 @@ def excluir_hospital(hospital_id):
 # CONTATOS
 # ======================================================
 @bp.route("/hospitais/<int:hospital_id>/contatos", methods=["GET", "POST"])
+@conditional(tables=["hospitais", "contatos"])
+@query_budget(6)
 def contatos(hospital_id):
     hospital = Hospital.query.get_or_404(hospital_id)
 
@@ -326,18 +376,61 @@ def contatos(hospital_id):
         flash("Contato salvo com sucesso.", "success")
         return redirect(url_for("main.contatos", hospital_id=hospital_id))
 
-    contatos_db = Contato.query.filter_by(hospital_id=hospital_id).order_by(Contato.id.desc()).all()
-    return render_template("contatos.html", hospital=hospital, contatos=contatos_db)
+    return _render_contatos_page(hospital)
+
+
+def _render_contatos_page(hospital, **extra):
+    contatos_db = Contato.query.filter_by(hospital_id=hospital.id).order_by(Contato.id.desc()).all()
+    return render_template("contatos.html", hospital=hospital, contatos=contatos_db, **extra)
+
+
+@bp.route("/hospitais/<int:hospital_id>/contatos/lote", methods=["POST"])
+@query_budget(8)
+def contatos_lote(hospital_id):
+    """
+    Vários contatos colados do Excel (nome, cargo, telefone por linha) em UMA transação.
+    """
+    hospital = Hospital.query.get_or_404(hospital_id)
+    texto = request.form.get("colar") or ""
+
+    linhas, erros = validar_lote_contatos(texto)
+    if erros:
+        return _render_contatos_page(hospital, lote_erros=erros, lote_texto=texto), 422
+
+    try:
+        # um único INSERT com executemany
+        db.session.execute(insert(Contato), [
+            {
+                "hospital_id": hospital_id,
+                "hospital_nome": hospital.nome_hospital,
+                "nome_contato": r["nome_contato"],
+                "cargo": r["cargo"],
+                "telefone": r["telefone"],
+            }
+            for r in linhas
+        ])
+        db.session.commit()
+        flash(f"{len(linhas)} contato(s) salvos.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao salvar contatos: {e}", "error")
+
+    return redirect(url_for("main.contatos", hospital_id=hospital_id))
 
 
 # ======================================================
 # DADOS DO HOSPITAL
 # ======================================================
 @bp.route("/hospitais/<int:hospital_id>/dados", methods=["GET", "POST"])
+@conditional(tables=["hospitais", "dados_hospitais"], files=[DADOS_XLSX])
+@query_budget(12)
+# o GET cria/completa a linha (Excel) e grava: na réplica atrasada daria IntegrityError/StaleDataError
+@primario
 def dados_hospital(hospital_id):
     hospital = Hospital.query.get_or_404(hospital_id)
 
-    dados = DadosHospital.query.filter_by(hospital_id=hospital_id).first()
+    # a tela mostra/edita todas as perguntas: o documento vem na mesma consulta
+    dados = DadosHospital.query.options(undefer(DadosHospital.respostas)).filter_by(hospital_id=hospital_id).first()
     created_now = False
 
 
@@ -351,7 +444,7 @@ def dados_hospital(hospital_id):
     # ✅ NO GET: tenta completar com dados do Excel (se ainda estiver vazio no banco)
     if request.method == "GET":
         try:
-            excel_row = _find_dados_row_for_hospital(hospital_id, data_dir="data")
+            excel_row = _find_dados_row_for_hospital(hospital_id, data_dir=DATA_DIR)
             if excel_row:
                 _populate_dados_from_excel(dados, excel_row)
                 db.session.commit()
@@ -360,45 +453,12 @@ def dados_hospital(hospital_id):
             # não trava a página — só avisa
             flash(f"Não consegui carregar dados do Excel para este hospital: {e}", "warning")
 
-        return render_template("dados_hospitais.html", hospital=hospital, dados=dados)
-
-    # ✅ NO POST: salva o que o usuário editou
-    try:
-        dados.especialidade = (request.form.get("especialidade") or "").strip()
-        dados.leitos = (request.form.get("leitos") or "").strip()
-        dados.leitos_uti = (request.form.get("leitos_uti") or "").strip()
-        dados.fatores_decisorios = (request.form.get("fatores_decisorios") or "").strip()
-        dados.prioridades_atendimento = (request.form.get("prioridades_atendimento") or "").strip()
-        dados.certificacao = (request.form.get("certificacao") or "").strip()
-        dados.emtn = (request.form.get("emtn") or "").strip()
-        dados.emtn_membros = (request.form.get("emtn_membros") or "").strip()
-        dados.comissao_feridas = (request.form.get("comissao_feridas") or "").strip()
-        dados.comissao_feridas_membros = (request.form.get("comissao_feridas_membros") or "").strip()
-        dados.nutricao_enteral_dia = (request.form.get("nutricao_enteral_dia") or "").strip()
-        dados.pacientes_tno_dia = (request.form.get("pacientes_tno_dia") or "").strip()
-        dados.altas_orientadas = (request.form.get("altas_orientadas") or "").strip()
-        dados.quem_orienta_alta = (request.form.get("quem_orienta_alta") or "").strip()
-        dados.protocolo_evolucao_dieta = (request.form.get("protocolo_evolucao_dieta") or "").strip()
-        dados.protocolo_evolucao_dieta_qual = (request.form.get("protocolo_evolucao_dieta_qual") or "").strip()
-        dados.protocolo_lesao_pressao = (request.form.get("protocolo_lesao_pressao") or "").strip()
-        dados.maior_desafio = (request.form.get("maior_desafio") or "").strip()
-        dados.dieta_padrao = (request.form.get("dieta_padrao") or "").strip()
-        dados.bomba_infusao_modelo = (request.form.get("bomba_infusao_modelo") or "").strip()
-        dados.fornecedor = (request.form.get("fornecedor") or "").strip()
-        dados.convenio_empresas = (request.form.get("convenio_empresas") or "").strip()
-        dados.convenio_empresas_modelo_pagamento = (request.form.get("convenio_empresas_modelo_pagamento") or "").strip()
-        dados.reembolso = (request.form.get("reembolso") or "").strip()
-        dados.modelo_compras = (request.form.get("modelo_compras") or "").strip()
-        dados.contrato_tipo = (request.form.get("contrato_tipo") or "").strip()
-        dados.nova_etapa_negociacao = (request.form.get("nova_etapa_negociacao") or "").strip()
-
-        db.session.commit()
-        flash("Dados atualizados.", "success")
-    except Exception as e:
-        db.session.rollback()
-        flash(f"Erro ao salvar dados: {e}", "error")
+        return render_template("dados_hospitais.html", hospital=hospital, dados=dados, secoes=secoes(),
+                               base=valores_obj(dados, CAMPOS_DADOS))
 
-    return redirect(url_for("main.dados_hospital", hospital_id=hospital_id))
+    # ✅ NO POST: salva só o que o usuário mudou
+    return _salvar_edicao(dados, CAMPOS_DADOS, "Dados do hospital",
+                          url_for("main.dados_hospital", hospital_id=hospital_id), "Dados atualizados.")
 
 
 
@@ -406,7 +466,47 @@ def dados_hospital(hospital_id):
 # ======================================================
 # PRODUTOS
 # ======================================================
+def _salvar_produto_do_form(hospital) -> bool:
+    """
+    Grava UM produto vindo do formulário (marca_planilha, produto, quantidade).
+    """
+    try:
+        produto_nome = (request.form.get("produto") or "").strip()
+        marca = (request.form.get("marca_planilha") or "").strip()
+
+        if not produto_nome:
+            flash("Selecione um produto.", "error")
+            return False
+
+        qtd_raw = (request.form.get("quantidade") or "").strip()
+        try:
+            quantidade = int(float(qtd_raw)) if qtd_raw else 0
+        except:
+            quantidade = 0
+
+        p = ProdutoHospital(
+            hospital_id=hospital.id,
+            nome_hospital=hospital.nome_hospital,
+            marca_planilha=marca,
+            produto=produto_nome,
+            produto_id=resolver_produto_id(marca, produto_nome),
+            quantidade=quantidade,
+        )
+        db.session.add(p)
+        db.session.commit()
+
+        flash("Produto salvo.", "success")
+        return True
+
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao salvar produto: {e}", "error")
+        return False
+
+
 @bp.route("/hospitais/<int:hospital_id>/produtos", methods=["GET", "POST"])
+@conditional(tables=["hospitais", "produtos_hospitais"], files=[CATALOGO_XLSX])
+@query_budget(7)
 def produtos_hospital(hospital_id):
     hospital = Hospital.query.get_or_404(hospital_id)
 
@@ -414,60 +514,101 @@ def produtos_hospital(hospital_id):
     # POST (salvar produto)
     # =======================
     if request.method == "POST":
-        try:
-            produto_nome = (request.form.get("produto") or "").strip()
-            marca = (request.form.get("marca_planilha") or "").strip()
-
-            if not produto_nome:
-                flash("Selecione um produto.", "error")
-                return redirect(url_for("main.produtos_hospital", hospital_id=hospital_id))
-
-            qtd_raw = (request.form.get("quantidade") or "").strip()
-            try:
-                quantidade = int(float(qtd_raw)) if qtd_raw else 0
-            except:
-                quantidade = 0
-
-            p = ProdutoHospital(
-                hospital_id=hospital_id,
-                nome_hospital=hospital.nome_hospital,
-                marca_planilha=marca,
-                produto=produto_nome,
-                quantidade=quantidade,
-            )
-            db.session.add(p)
-            db.session.commit()
-
-            flash("Produto salvo.", "success")
-
-        except Exception as e:
-            db.session.rollback()
-            flash(f"Erro ao salvar produto: {e}", "error")
-
+        _salvar_produto_do_form(hospital)
         return redirect(url_for("main.produtos_hospital", hospital_id=hospital_id))
 
     # =======================
     # GET (tela)
     # =======================
+    return _render_produtos_page(hospital)
+
+
+def _render_produtos_page(hospital, **extra):
     produtos_db = (
         ProdutoHospital.query
-        .filter_by(hospital_id=hospital_id)
+        .filter_by(hospital_id=hospital.id)
         .order_by(ProdutoHospital.id.desc())
         .all()
     )
 
-    # ✅ marcas = abas do data/produtos.xlsx
-    marcas = load_marcas_from_produtos_excel("data")
+    # ✅ marcas = abas do data/produtos.xlsx; o catálogo inteiro vem num pacote versionado
+    catalogo = get_bundle(DATA_DIR)
 
     return render_template(
         "produtos_hospitais.html",
         hospital=hospital,
         produtos=produtos_db,
-        marcas_catalogo=marcas
+        marcas_catalogo=catalogo.marcas,
+        catalogo_url=url_for("api.catalogo_bundle", version=catalogo.version),
+        **extra
     )
 
 
+@bp.route("/hospitais/<int:hospital_id>/produtos/lote", methods=["POST"])
+@query_budget(9)
+def produtos_hospital_lote(hospital_id):
+    """
+    Grade com vários produtos (marca, produto, quantidade) gravada em UMA transação.
+    """
+    hospital = Hospital.query.get_or_404(hospital_id)
+    catalogo = get_bundle(DATA_DIR)
+
+    marcas = request.form.getlist("lote_marca")
+    produtos = request.form.getlist("lote_produto")
+    quantidades = request.form.getlist("lote_quantidade")
+
+    linhas, erros = validar_lote_produtos(marcas, produtos, quantidades, catalogo.nomes_por_marca)
+    if erros:
+        lote_form = [
+            {"marca": m, "produto": p, "quantidade": q}
+            for m, p, q in zip(marcas, produtos, quantidades)
+        ]
+        return _render_produtos_page(hospital, lote_erros=erros, lote_form=lote_form), 422
+
+    try:
+        indice = IndiceCatalogo()
+        # um único INSERT com executemany
+        db.session.execute(insert(ProdutoHospital), [
+            {
+                "hospital_id": hospital_id,
+                "nome_hospital": hospital.nome_hospital,
+                "marca_planilha": r["marca_planilha"],
+                "produto": r["produto"],
+                "produto_id": indice.resolver(r["marca_planilha"], r["produto"]),
+                "quantidade": r["quantidade"],
+            }
+            for r in linhas
+        ])
+        db.session.commit()
+        flash(f"{len(linhas)} produto(s) salvos.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao salvar produtos: {e}", "error")
+
+    return redirect(url_for("main.produtos_hospital", hospital_id=hospital_id))
+
+
+@bp.route("/hospitais/<int:hospital_id>/produtos/editar", methods=["GET", "POST"])
+@conditional(tables=["hospitais", "produtos_hospitais"])
+@query_budget(6)
+def editar_produtos_hospital(hospital_id):
+    hospital = Hospital.query.get_or_404(hospital_id)
+
+    if request.method == "POST":
+        _salvar_produto_do_form(hospital)
+        return redirect(url_for("main.editar_produtos_hospital", hospital_id=hospital_id))
+
+    produtos_db = (
+        ProdutoHospital.query
+        .filter_by(hospital_id=hospital_id)
+        .order_by(ProdutoHospital.id.desc())
+        .all()
+    )
+    return render_template("produtos_hospitais_edit.html", hospital=hospital, produtos=produtos_db)
+
+
 @bp.route("/hospitais/<int:hospital_id>/produtos/<int:produto_id>/excluir", methods=["POST"])
+@query_budget(6)
 def excluir_produto(hospital_id, produto_id):
     p = ProdutoHospital.query.get_or_404(produto_id)
     if p.hospital_id != hospital_id:
@@ -487,6 +628,7 @@ def excluir_produto(hospital_id, produto_id):
 
 
 @bp.route("/hospitais/<int:hospital_id>/contatos/<int:contato_id>/excluir", methods=["POST"])
+@query_budget(6)
 def excluir_contato(hospital_id, contato_id):
     c = Contato.query.get_or_404(contato_id)
     if c.hospital_id != hospital_id:
@@ -508,30 +650,94 @@ def excluir_contato(hospital_id, contato_id):
 # ======================================================
 # RELATÓRIOS (TELA + PDF + CSV)
 # ======================================================
+def _produtos_com_catalogo(hospital_id: int):
+    """
+    Produtos do hospital já com o item do catálogo (nutrientes) num LEFT JOIN.
+    """
+    return (
+        ProdutoHospital.query
+        .options(joinedload(ProdutoHospital.produto_catalogo))
+        .filter_by(hospital_id=hospital_id)
+        .order_by(ProdutoHospital.id.asc())
+        .all()
+    )
+
+
+# respostas mostradas no resumo da tela de relatórios (o resto fica no PDF)
+RELATORIO_CHAVES = ("especialidade", "leitos", "leitos_uti", "fatores_decisorios", "prioridades_atendimento")
+
+
 @bp.route("/hospitais/<int:hospital_id>/relatorios", methods=["GET"])
+@conditional(tables=TODAS_TABELAS)
+@query_budget(6)
 def relatorios(hospital_id):
-    hospital = Hospital.query.get_or_404(hospital_id)
-    contatos_db = Contato.query.filter_by(hospital_id=hospital_id).all()
-    dados = DadosHospital.query.filter_by(hospital_id=hospital_id).first()
-    produtos_db = ProdutoHospital.query.filter_by(hospital_id=hospital_id).all()
+    def render():
+        hospital = Hospital.query.get_or_404(hospital_id)
+        contatos_db = Contato.query.filter_by(hospital_id=hospital_id).all()
+        dados = respostas_parciais(hospital_id, RELATORIO_CHAVES)
+        produtos_db = _produtos_com_catalogo(hospital_id)
+
+        return render_template(
+            "relatorios.html",
+            hospital=hospital,
+            contatos=contatos_db,
+            dados=dados,
+            produtos=produtos_db
+        )
 
-    return render_template(
-        "relatorios.html",
-        hospital=hospital,
-        contatos=contatos_db,
-        dados=dados,
-        produtos=produtos_db
+    # a tela de relatório não mostra flash nem botões de admin: uma entrada por hospital
+    return cache.get_or_set(f"page:relatorios:{hospital_id}", render, tags=hospital_tags(hospital_id) + ["table:produtos"])
+
+
+# colunas de nutrientes mostradas lado a lado na tela de oportunidades
+COLUNAS_OPORTUNIDADES = [("kcal", "Kcal"), ("ptn", "PTN (g)"), ("lip", "LIP (g)"), ("fibras", "Fibras (g)"), ("sodio", "Sódio (mg)")]
+
+
+@bp.route("/hospitais/<int:hospital_id>/oportunidades", methods=["GET"])
+@conditional(tables=["hospitais", "produtos_hospitais", "produtos"])
+@query_budget(6)
+def oportunidades(hospital_id):
+    """
+    Produtos de concorrentes do hospital x equivalentes mais próximos da marca própria.
+    """
+    def render():
+        # numpy só carrega quando alguém pede equivalentes
+        from app.equivalencia import oportunidades_hospital
+
+        hospital = Hospital.query.get_or_404(hospital_id)
+        return render_template(
+            "oportunidades.html",
+            hospital=hospital,
+            marca_propria=Config.MARCA_PROPRIA,
+            oportunidades=oportunidades_hospital(hospital_id, Config.MARCA_PROPRIA),
+            colunas=COLUNAS_OPORTUNIDADES,
+        )
+
+    return cache.get_or_set(
+        f"page:oportunidades:{hospital_id}", render, tags=hospital_tags(hospital_id) + ["table:produtos"]
     )
 
 
 @bp.route("/hospitais/<int:hospital_id>/relatorios/pdf")
+@conditional(tables=TODAS_TABELAS, per_user=False)
+@query_budget(6)
 def relatorio_pdf(hospital_id):
-    hospital = Hospital.query.get_or_404(hospital_id)
-    contatos_db = Contato.query.filter_by(hospital_id=hospital_id).all()
-    dados = DadosHospital.query.filter_by(hospital_id=hospital_id).first()
-    produtos_db = ProdutoHospital.query.filter_by(hospital_id=hospital_id).all()
+    def gerar():
+        # reportlab só carrega quando alguém pede um PDF
+        from app.pdf_report import build_hospital_report_pdf
+
+        hospital = Hospital.query.get_or_404(hospital_id)
+        contatos_db = Contato.query.filter_by(hospital_id=hospital_id).all()
+        dados = (
+            DadosHospital.query.options(undefer(DadosHospital.respostas))
+            .filter_by(hospital_id=hospital_id)
+            .first()
+        )
+        produtos_db = _produtos_com_catalogo(hospital_id)
+        with metrics.PDF_RENDER.time():
+            return build_hospital_report_pdf(hospital, contatos_db, dados, produtos_db)
 
-    pdf_bytes = build_hospital_report_pdf(hospital, contatos_db, dados, produtos_db)
+    pdf_bytes = cache.get_or_set(f"pdf:hospital:{hospital_id}", gerar, tags=hospital_tags(hospital_id) + ["table:produtos"])
 
     return Response(
         pdf_bytes,
@@ -541,18 +747,27 @@ def relatorio_pdf(hospital_id):
 
 
 @bp.route("/relatorios")
+@conditional(tables=["hospitais", "produtos_hospitais", "produtos"])
+@query_budget(3)
 def relatorios_geral():
-    hospitais_db = Hospital.query.order_by(Hospital.nome_hospital.asc()).all()
-    return render_template("relatorios_geral.html", hospitais=hospitais_db)
+    return _render_cached(
+        "relatorios_geral",
+        ["table:hospitais", "table:produtos_hospitais", "table:produtos"],
+        "relatorios_geral.html",
+        hospitais=_lista_hospitais(),
+        ranking=_ranking_produtos(),
+    )
 
 
 @bp.route("/relatorios/csv", methods=["POST"])
+@query_budget(5)
+@somente_leitura
 def relatorio_csv():
     hospital_id = int(request.form.get("hospital_id") or 0)
     hospital = Hospital.query.get_or_404(hospital_id)
 
     contatos_db = Contato.query.filter_by(hospital_id=hospital_id).all()
-    dados = DadosHospital.query.filter_by(hospital_id=hospital_id).first()
+    dados = respostas_parciais(hospital_id, ("especialidade", "leitos", "leitos_uti"))
     produtos_db = ProdutoHospital.query.filter_by(hospital_id=hospital_id).all()
 
     out = io.StringIO()
@@ -585,6 +800,43 @@ def relatorio_csv():
     )
 
 
+# ======================================================
+# TERRITÓRIOS (UF -> cidade -> hospital)
+# ======================================================
+@bp.route("/territorios")
+@bp.route("/territorios/<uf>")
+@bp.route("/territorios/<uf>/<cidade>")
+@conditional(tables=["hospitais", "produtos_hospitais"])
+@query_budget(3)
+def territorios(uf=None, cidade=None):
+    cep = (request.args.get("cep") or "").strip()
+    faixa = faixa_cep(cep)
+    # cacheado por nível + faixa de CEP até mudar hospitais/produtos
+    tags = ["table:hospitais", "table:produtos_hospitais"]
+    sufixo = "-".join(faixa) if faixa else "*"
+
+    if uf is None:
+        linhas = cache.get_or_set(f"query:territorios:{sufixo}", lambda: resumo_ufs(faixa), tags=tags)
+    elif cidade is None:
+        uf = uf.upper()
+        linhas = cache.get_or_set(f"query:territorios:{sufixo}:{uf}", lambda: resumo_cidades(uf, faixa), tags=tags)
+    else:
+        uf, cidade = uf.upper(), cidade.upper()
+        linhas = cache.get_or_set(
+            f"query:territorios:{sufixo}:{uf}:{cidade}", lambda: hospitais_da_cidade(uf, cidade, faixa), tags=tags
+        )
+
+    return render_template(
+        "territorios.html",
+        uf=uf,
+        uf_nome=UFS.get(uf or "", ""),
+        cidade=cidade,
+        cep=cep,
+        faixa=faixa,
+        linhas=linhas,
+    )
+
+
 # ======================================================
 # IMPORTAÇÃO EXCEL (UMA VEZ) - COMPLETA
 # ======================================================
@@ -610,13 +862,17 @@ def importar_excel_uma_vez():
         importados = 0
         atualizados = 0
 
+        # uma consulta para todos (em vez de Hospital.query.get por linha)
+        ids_excel = {r.get("id_hospital") for r in hospitais_rows if r.get("id_hospital")}
+        por_id = {h.id: h for h in Hospital.query.filter(Hospital.id.in_(ids_excel)).all()} if ids_excel else {}
+
         for r in hospitais_rows:
             hid = r.get("id_hospital")
             nome = (r.get("nome_hospital") or "").strip()
             if not hid or not nome:
                 continue
 
-            h = Hospital.query.get(hid)
+            h = por_id.get(hid)
             if not h:
                 h = Hospital(
                     id=hid,
@@ -629,6 +885,7 @@ def importar_excel_uma_vez():
                     estado=r.get("estado") or "",
                 )
                 db.session.add(h)
+                por_id[hid] = h
                 importados += 1
             else:
                 h.nome_hospital = nome
@@ -676,6 +933,9 @@ def importar_excel_uma_vez():
         dados_new = 0
         dados_upd = 0
         dados_skip = 0
+        dados_por_hospital = {
+            d.hospital_id: d for d in DadosHospital.query.options(undefer(DadosHospital.respostas)).all()
+        }
 
         for r in dados_rows:
             hid = r.get("id_hospital")
@@ -683,26 +943,23 @@ def importar_excel_uma_vez():
                 dados_skip += 1
                 continue
 
-            d = DadosHospital.query.filter_by(hospital_id=hid).first()
+            d = dados_por_hospital.get(hid)
             if not d:
                 d = DadosHospital(hospital_id=hid)
                 db.session.add(d)
+                dados_por_hospital[hid] = d
                 dados_new += 1
             else:
                 dados_upd += 1
 
-            d.especialidade = r.get("especialidade") or r.get("Qual a especialidade do hospital?") or ""
-            d.leitos = r.get("leitos") or r.get("Quantos leitos?") or ""
-            d.leitos_uti = r.get("leitos_uti") or r.get("Quantos leitos de UTI?") or ""
-            d.fatores_decisorios = r.get("fatores_decisorios") or ""
-            d.prioridades_atendimento = r.get("prioridades_atendimento") or ""
-            d.certificacao = r.get("certificacao") or ""
-            d.emtn = r.get("emtn") or ""
-            d.emtn_membros = r.get("emtn_membros") or ""
+            # todas as perguntas do registro (app/questionario.py), num documento só
+            d.respostas = {**normalizar(d.respostas), **respostas_do_excel(r, _pick)}
 
         db.session.commit()
 
-        # 4) PRODUTOS
+        # 4) PRODUTOS (catálogo primeiro: cada linha já entra com produto_id)
+        sincronizar_catalogo(DATA_DIR)
+        indice = IndiceCatalogo()
         prod_ok = 0
         prod_skip = 0
 
@@ -726,6 +983,7 @@ def importar_excel_uma_vez():
                 nome_hospital=r.get("nome_hospital") or "",
                 marca_planilha=r.get("marca_planilha") or "",
                 produto=produto_nome,
+                produto_id=indice.resolver(r.get("marca_planilha"), produto_nome),
                 quantidade=qtd,
             )
             db.session.add(p)
@@ -757,6 +1015,168 @@ def importar_excel_uma_vez():
         return redirect(url_for("main.admin_panel"))
 
 
+# ======================================================
+# CATÁLOGO (produtos.xlsx -> tabelas marcas/produtos)
+# ======================================================
+@bp.route("/admin/sincronizar_catalogo", methods=["POST"])
+@admin_required
+def sincronizar_catalogo_admin():
+    try:
+        r = sincronizar_catalogo(DATA_DIR)
+        flash(
+            f"Catálogo sincronizado ✅ {r['marcas']} marcas, {r['produtos']} produtos | "
+            f"produtos de hospitais ligados +{r['vinculados']} / sem correspondência {r['sem_vinculo']}.",
+            "success"
+        )
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao sincronizar catálogo: {e}", "error")
+    return redirect(url_for("main.admin_panel"))
+
+
+# ======================================================
+# RESOLUÇÃO DE ENTIDADES (contatos órfãos / hospitais duplicados)
+# ======================================================
+def _limiar_do_form(valor) -> float:
+    try:
+        return min(1.0, max(0.3, float(valor)))
+    except (TypeError, ValueError):
+        return LIMIAR_PADRAO
+
+
+@bp.route("/admin/entidades", methods=["GET"])
+@admin_required
+@primario
+def admin_entidades():
+    limiar = _limiar_do_form(request.args.get("limiar"))
+    # só leitura: nome_normalizado vazio é calculado em memória (Registro); quem grava é
+    # a migration e o `flask resolver-entidades`
+    return render_template(
+        "admin_entidades.html",
+        limiar=limiar,
+        contatos=propor_contatos_orfaos(limiar),
+        grupos=propor_duplicados(limiar),
+    )
+
+
+@bp.route("/admin/entidades/contatos", methods=["POST"])
+@admin_required
+def admin_entidades_contatos():
+    pares = []
+    for v in request.form.getlist("par"):
+        try:
+            cid, hid = (int(x) for x in v.split(":", 1))
+        except ValueError:
+            continue
+        pares.append((cid, hid))
+    try:
+        n = vincular_contatos(pares)
+        flash(f"{n} contato(s) ligados ao hospital.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao ligar contatos: {e}", "error")
+    return redirect(url_for("main.admin_entidades", limiar=request.form.get("limiar")))
+
+
+@bp.route("/admin/entidades/mesclar", methods=["POST"])
+@admin_required
+def admin_entidades_mesclar():
+    # "principal:dup" marcados; agrupa por principal
+    por_principal = {}
+    for v in request.form.getlist("mesclar"):
+        try:
+            principal, dup = (int(x) for x in v.split(":", 1))
+        except ValueError:
+            continue
+        por_principal.setdefault(principal, []).append(dup)
+    try:
+        n = sum(mesclar_hospitais(principal, dups) for principal, dups in por_principal.items())
+        flash(f"{n} hospital(is) duplicado(s) mesclados.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Erro ao mesclar hospitais: {e}", "error")
+    return redirect(url_for("main.admin_entidades", limiar=request.form.get("limiar")))
+
+
+# ======================================================
+# PERFIS DE REQUISIÇÃO (?_perfil=1 -> app/profiler.py)
+# ======================================================
+@bp.route("/admin/perfis", methods=["GET"])
+@admin_required
+def admin_perfis():
+    return render_template("admin_perfis.html", perfis=profiler.listar(), parametro=profiler.PARAMETRO)
+
+
+@bp.route("/admin/perfis/<perfil_id>", methods=["GET"])
+@admin_required
+def admin_perfil(perfil_id):
+    perfil = profiler.carregar(perfil_id)
+    if perfil is None:
+        flash("Perfil não encontrado (pode ter sido descartado).", "warning")
+        return redirect(url_for("main.admin_perfis"))
+    ordem = request.args.get("ordem") if request.args.get("ordem") in ("cumulative", "tottime", "ncalls") else "cumulative"
+    return render_template(
+        "admin_perfil.html",
+        perfil=perfil,
+        ordem=ordem,
+        relatorio=profiler.relatorio_pstats(perfil_id, ordem),
+        tem_pstats=profiler.caminho(perfil_id, "prof") is not None,
+    )
+
+
+@bp.route("/admin/perfis/<perfil_id>/pstats", methods=["GET"])
+@admin_required
+def admin_perfil_pstats(perfil_id):
+    path = profiler.caminho(perfil_id, "prof")
+    if path is None:
+        flash("Perfil sem pstats (gerado pelo amostrador).", "warning")
+        return redirect(url_for("main.admin_perfis"))
+    with open(path, "rb") as f:
+        data = f.read()
+    return Response(data, mimetype="application/octet-stream",
+                    headers={"Content-Disposition": f"attachment; filename=perfil_{perfil_id}.prof"})
+
+
+@bp.route("/admin/perfis/<perfil_id>/pilhas", methods=["GET"])
+@admin_required
+def admin_perfil_pilhas(perfil_id):
+    texto = profiler.pilhas_colapsadas(perfil_id)
+    if texto is None:
+        flash("Perfil não encontrado (pode ter sido descartado).", "warning")
+        return redirect(url_for("main.admin_perfis"))
+    return Response(texto, mimetype="text/plain",
+                    headers={"Content-Disposition": f"attachment; filename=perfil_{perfil_id}.folded"})
+
+
+@bp.route("/admin/perfis/limpar", methods=["POST"])
+@admin_required
+def admin_perfis_limpar():
+    n = profiler.apagar_todos()
+    flash(f"{n} perfil(is) apagado(s).", "success")
+    return redirect(url_for("main.admin_perfis"))
+
+
+# ======================================================
+# CACHES EM MEMÓRIA (app/registro_caches.py)
+# ======================================================
+@bp.route("/admin/caches", methods=["GET"])
+@admin_required
+def admin_caches():
+    return render_template("admin_caches.html", info=registro.estatisticas())
+
+
+@bp.route("/admin/caches/limpar", methods=["POST"])
+@admin_required
+def admin_caches_limpar():
+    nome = (request.form.get("nome") or "").strip() or None
+    if nome and registro.get(nome) is None:
+        flash(f"Cache desconhecido: {nome}", "error")
+        return redirect(url_for("main.admin_caches"))
+    n = registro.limpar(nome)
+    flash(f"{n} entrada(s) removida(s) de {nome or 'todos os caches'} (worker {os.getpid()}).", "success")
+    return redirect(url_for("main.admin_caches"))
+
+
 # ======================================================
 # RESET COMPLETO DO BANCO (SOMENTE ADMIN)
 # ======================================================
@@ -784,6 +1204,8 @@ def reset_db():
         AppMeta.query.delete()
         Contato.query.delete()
         ProdutoHospital.query.delete()
+        Produto.query.delete()
+        Marca.query.delete()
         DadosHospital.query.delete()
         Hospital.query.delete()
         db.session.commit()
@@ -805,25 +1227,12 @@ def fix_schema_dados():
     try:
         # adiciona colunas caso não existam (Postgres)
         stmts = [
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS comissao_feridas TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS comissao_feridas_membros TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS nutricao_enteral_dia TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS pacientes_tno_dia TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS altas_orientadas TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS quem_orienta_alta TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS protocolo_evolucao_dieta TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS protocolo_evolucao_dieta_qual TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS protocolo_lesao_pressao TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS maior_desafio TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS dieta_padrao TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS bomba_infusao_modelo TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS fornecedor TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS convenio_empresas TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS convenio_empresas_modelo_pagamento TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS reembolso TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS modelo_compras TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS contrato_tipo TEXT DEFAULT '';",
-            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS nova_etapa_negociacao TEXT DEFAULT '';",
+            # perguntas do questionário ficam no documento JSONB (app/questionario.py);
+            # bancos com as colunas antigas: rodar a migration (flask db upgrade) que copia os valores
+            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS respostas JSONB NOT NULL DEFAULT '{}';",
+            "CREATE INDEX IF NOT EXISTS ix_dados_respostas_gin ON dados_hospitais USING GIN (respostas);",
+            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;",
+            "ALTER TABLE dados_hospitais ADD COLUMN IF NOT EXISTS versao INTEGER NOT NULL DEFAULT 1;",
         ]
         for s in stmts:
             db.session.execute(text(s))
@@ -840,12 +1249,13 @@ from flask import jsonify
 
 
 @bp.route("/api/catalogo_produtos", methods=["GET"], endpoint="api_catalogo_produtos_v2")
+@conditional(files=[CATALOGO_XLSX], max_age=300, public=True, per_user=False)
 def api_catalogo_produtos():
     marca = (request.args.get("marca") or "").strip()
     if not marca:
         return jsonify({"marca": "", "produtos": []})
 
-    produtos = load_produtos_by_marca_from_produtos_excel(marca, "data")
+    produtos = load_produtos_by_marca_from_produtos_excel(marca, DATA_DIR)
     return jsonify({"marca": marca, "produtos": produtos})
 
 
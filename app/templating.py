@@ -0,0 +1,53 @@
+# app/templating.py
+"""
+Cache de bytecode do Jinja em disco.
+
+Sem ele, cada worker recompila (parse + geração de código Python) todos os
+templates na primeira vez que renderiza cada um. Com o cache, a compilação
+vira a leitura de um arquivo .cache (invalidado sozinho quando o .html muda).
+
+Para já subir com tudo compilado (ex.: no build do Render):
+    flask --app manage compilar-templates
+"""
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from jinja2 import FileSystemBytecodeCache
+
+
+def init_app(app):
+    app.config.setdefault(
+        "JINJA_CACHE_DIR",
+        os.environ.get("JINJA_CACHE_DIR") or os.path.join(app.instance_path, "jinja_cache"),
+    )
+
+    directory = app.config["JINJA_CACHE_DIR"]
+    if directory:
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            # disco somente leitura: segue sem cache (só fica mais lento no 1º render)
+            directory = None
+    if directory:
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+    app.cli.add_command(compilar_templates)
+
+
+@click.command("compilar-templates")
+@with_appcontext
+def compilar_templates():
+    """Compila todos os templates e grava o bytecode no cache."""
+    env = current_app.jinja_env
+    if env.bytecode_cache is None:
+        click.echo("JINJA_CACHE_DIR desativado; nada a fazer.")
+        return
+
+    inicio = time.perf_counter()
+    nomes = env.list_templates(filter_func=lambda n: n.endswith(".html"))
+    for nome in nomes:
+        env.get_template(nome)
+    click.echo(f"{len(nomes)} templates compilados em {time.perf_counter() - inicio:.2f}s -> {current_app.config['JINJA_CACHE_DIR']}")
@@ -0,0 +1,206 @@
+# app/territorios.py
+"""
+Territórios de venda: UF -> cidade -> hospital (+ faixas de CEP).
+
+Hospital.estado / cidade / cep são texto livre ("São Paulo", "sp", "SAO PAULO ",
+"01310-100"). As chaves normalizadas ficam gravadas e indexadas no próprio
+hospital (preenchidas nos eventos do mapper, como o nome_normalizado):
+  uf_key       sigla canônica ("SP"), também a partir do nome do estado
+  cidade_key   cidade sem acento, maiúscula, espaços colapsados
+  cep_prefixo  5 primeiros dígitos do CEP (faixa = BETWEEN no índice)
+
+As agregações são um GROUP BY por nível sobre o índice (uf_key, cidade_key),
+com os totais de produtos já somados por hospital numa subconsulta.
+
+Para preencher linhas antigas:
+    flask --app manage preencher-territorios
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, func, select, update
+
+from app import db
+from app.catalogo_db import chave_cidade, chave_nome, prefixo_cep
+from app.models import Hospital, ProdutoHospital
+
+UFS = {
+    "AC": "ACRE", "AL": "ALAGOAS", "AP": "AMAPA", "AM": "AMAZONAS", "BA": "BAHIA",
+    "CE": "CEARA", "DF": "DISTRITO FEDERAL", "ES": "ESPIRITO SANTO", "GO": "GOIAS",
+    "MA": "MARANHAO", "MT": "MATO GROSSO", "MS": "MATO GROSSO DO SUL", "MG": "MINAS GERAIS",
+    "PA": "PARA", "PB": "PARAIBA", "PR": "PARANA", "PE": "PERNAMBUCO", "PI": "PIAUI",
+    "RJ": "RIO DE JANEIRO", "RN": "RIO GRANDE DO NORTE", "RS": "RIO GRANDE DO SUL",
+    "RO": "RONDONIA", "RR": "RORAIMA", "SC": "SANTA CATARINA", "SP": "SAO PAULO",
+    "SE": "SERGIPE", "TO": "TOCANTINS",
+}
+_UF_POR_NOME = {nome: sigla for sigla, nome in UFS.items()}
+
+# sem UF/cidade reconhecível: agrupa como "?" (não some do total)
+SEM_CHAVE = "?"
+
+_RE_NAO_DIGITO = re.compile(r"\D")
+_RE_PONTUACAO = re.compile(r"[^\w ]")
+
+_listeners_installed = False
+
+
+# ======================================================
+# NORMALIZAÇÃO
+# ======================================================
+def uf_canonica(estado) -> str:
+    """
+    "sp" / "S.P." / "São Paulo" -> "SP"; não reconhecida -> "?"
+    """
+    s = chave_nome(_RE_PONTUACAO.sub("", str(estado or "")))
+    if s in UFS:
+        return s
+    return _UF_POR_NOME.get(s, SEM_CHAVE)
+
+
+def cidade_chave(cidade) -> str:
+    """
+    catalogo_db.chave_cidade; sem cidade -> "?"
+    """
+    return chave_cidade(cidade) or SEM_CHAVE
+
+
+def faixa_cep(valor: str) -> Optional[Tuple[str, str]]:
+    """
+    Filtro de CEP da tela: "01" -> 01000..01999; "01000-05999" -> 01000..05999.
+    """
+    partes = [_RE_NAO_DIGITO.sub("", p) for p in (valor or "").split("-", 1)]
+    if not partes[0]:
+        return None
+    inicio = partes[0][:5]
+    fim = (partes[1] if len(partes) > 1 and partes[1] else partes[0])[:5]
+    return inicio.ljust(5, "0"), fim.ljust(5, "9")
+
+
+def _preencher_chaves(mapper, connection, target):
+    target.uf_key = uf_canonica(target.estado)
+    target.cidade_key = cidade_chave(target.cidade)
+    target.cep_prefixo = prefixo_cep(target.cep)
+
+
+def preencher_territorios() -> int:
+    """
+    Completa as chaves de linhas gravadas antes das colunas existirem. Faz commit.
+    """
+    pendentes = (
+        db.session.query(Hospital.id, Hospital.estado, Hospital.cidade, Hospital.cep, Hospital.versao)
+        .filter(Hospital.uf_key.is_(None))
+        .all()
+    )
+    if pendentes:
+        db.session.execute(update(Hospital), [
+            {
+                "id": hid, "versao": versao,
+                "uf_key": uf_canonica(estado), "cidade_key": cidade_chave(cidade), "cep_prefixo": prefixo_cep(cep),
+            }
+            for hid, estado, cidade, cep, versao in pendentes
+        ])
+        db.session.commit()
+    return len(pendentes)
+
+
+# ======================================================
+# AGREGAÇÕES
+# ======================================================
+def _totais_produtos():
+    # uma linha por hospital: itens e quantidade somados antes do JOIN
+    return (
+        select(
+            ProdutoHospital.hospital_id.label("hospital_id"),
+            func.count(ProdutoHospital.id).label("itens"),
+            func.coalesce(func.sum(ProdutoHospital.quantidade), 0).label("quantidade"),
+        )
+        .group_by(ProdutoHospital.hospital_id)
+        .subquery()
+    )
+
+
+def _filtro_cep(q, faixa: Optional[Tuple[str, str]]):
+    if faixa:
+        q = q.where(Hospital.cep_prefixo.between(*faixa))
+    return q
+
+
+def resumo_ufs(faixa: Optional[Tuple[str, str]] = None) -> List[Dict]:
+    prod = _totais_produtos()
+    q = (
+        select(
+            Hospital.uf_key,
+            func.count(Hospital.id),
+            func.coalesce(func.sum(prod.c.itens), 0),
+            func.coalesce(func.sum(prod.c.quantidade), 0),
+        )
+        .outerjoin(prod, prod.c.hospital_id == Hospital.id)
+        .group_by(Hospital.uf_key)
+        .order_by(Hospital.uf_key)
+    )
+    rows = db.session.execute(_filtro_cep(q, faixa)).all()
+    return [
+        {"uf": uf or SEM_CHAVE, "nome": UFS.get(uf, ""), "hospitais": n, "itens": int(itens), "quantidade": int(qtd)}
+        for uf, n, itens, qtd in rows
+    ]
+
+
+def resumo_cidades(uf: str, faixa: Optional[Tuple[str, str]] = None) -> List[Dict]:
+    prod = _totais_produtos()
+    q = (
+        select(
+            Hospital.cidade_key,
+            func.min(Hospital.cidade),
+            func.count(Hospital.id),
+            func.coalesce(func.sum(prod.c.itens), 0),
+            func.coalesce(func.sum(prod.c.quantidade), 0),
+        )
+        .outerjoin(prod, prod.c.hospital_id == Hospital.id)
+        .where(Hospital.uf_key == uf)
+        .group_by(Hospital.cidade_key)
+        .order_by(Hospital.cidade_key)
+    )
+    rows = db.session.execute(_filtro_cep(q, faixa)).all()
+    return [
+        {"chave": chave or SEM_CHAVE, "cidade": nome or chave, "hospitais": n, "itens": int(itens), "quantidade": int(qtd)}
+        for chave, nome, n, itens, qtd in rows
+    ]
+
+
+def hospitais_da_cidade(uf: str, cidade: str, faixa: Optional[Tuple[str, str]] = None) -> List[Dict]:
+    prod = _totais_produtos()
+    q = (
+        select(
+            Hospital.id,
+            Hospital.nome_hospital,
+            Hospital.cep,
+            func.coalesce(prod.c.itens, 0),
+            func.coalesce(prod.c.quantidade, 0),
+        )
+        .outerjoin(prod, prod.c.hospital_id == Hospital.id)
+        .where(Hospital.uf_key == uf, Hospital.cidade_key == cidade)
+        .order_by(Hospital.nome_hospital)
+    )
+    rows = db.session.execute(_filtro_cep(q, faixa)).all()
+    return [
+        {"id": hid, "nome_hospital": nome, "cep": cep or "", "itens": int(itens), "quantidade": int(qtd)}
+        for hid, nome, cep, itens, qtd in rows
+    ]
+
+
+def init_app(app):
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Hospital, "before_insert", _preencher_chaves)
+        event.listen(Hospital, "before_update", _preencher_chaves)
+        _listeners_installed = True
+    app.cli.add_command(preencher_territorios_cmd)
+
+
+@click.command("preencher-territorios")
+@with_appcontext
+def preencher_territorios_cmd():
+    """Calcula uf_key/cidade_key/cep_prefixo dos hospitais que ainda não têm."""
+    click.echo(f"{preencher_territorios()} hospital(is) atualizados")
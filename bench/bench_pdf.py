@@ -0,0 +1,97 @@
+# bench/bench_pdf.py
+"""
+Benchmark do relatório em PDF (app/pdf_report.py).
+
+Uso (na raiz do projeto):
+    python -m bench.bench_pdf --contatos 30 --produtos 60 --segundos 5
+
+Mostra relatórios/s, páginas/s e bytes por relatório.
+Não precisa de banco: usa objetos sintéticos com os mesmos atributos dos models.
+"""
+import argparse
+import json
+import random
+import time
+from types import SimpleNamespace
+
+from app.pdf_report import DADOS_PDF_FIELDS, NUTRIENTES_PDF_COLS, build_hospital_report
+
+PALAVRAS = (
+    "paciente nutrição enteral protocolo hospital dieta suplementação equipe "
+    "multiprofissional terapia avaliação fornecedor contrato licitação UTI leitos "
+    "oncologia pediatria cirurgia feridas lesão pressão comissão alta orientação"
+).split()
+
+
+def _texto(rnd: random.Random, n_palavras: int) -> str:
+    return " ".join(rnd.choice(PALAVRAS) for _ in range(n_palavras))
+
+
+def montar_hospital(rnd: random.Random, n_contatos: int, n_produtos: int, palavras_por_campo: int):
+    hospital = SimpleNamespace(
+        id=1, nome_hospital="Hospital Sintético de Benchmark", endereco="Av. Brasil",
+        numero="1000", complemento="Bloco B", cep="30100-000", cidade="Belo Horizonte", estado="MG",
+    )
+    contatos = [
+        SimpleNamespace(nome_contato=f"Contato {i} {_texto(rnd, 2)}", cargo=_texto(rnd, 3), telefone="(31) 99999-0000")
+        for i in range(n_contatos)
+    ]
+    dados = SimpleNamespace(**{attr: _texto(rnd, rnd.randint(1, palavras_por_campo)) for _, attr in DADOS_PDF_FIELDS})
+    produtos = []
+    for i in range(n_produtos):
+        p = SimpleNamespace(
+            marca_planilha=rnd.choice(["PRODIET", "NESTLÉ", "DANONE", "FRESENIUS"]),
+            produto=f"Produto {i} {_texto(rnd, 3)}", quantidade=rnd.randint(1, 500),
+            embalagem="1000 ml", referencia=f"REF{i:05d}",
+        )
+        for _, attr in NUTRIENTES_PDF_COLS:
+            setattr(p, attr, f"{rnd.uniform(0, 300):.1f}")
+        produtos.append(p)
+    return hospital, contatos, dados, produtos
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--contatos", type=int, default=20)
+    ap.add_argument("--produtos", type=int, default=40)
+    ap.add_argument("--palavras", type=int, default=80, help="máximo de palavras por campo de dados")
+    ap.add_argument("--segundos", type=float, default=3.0)
+    ap.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = ap.parse_args()
+
+    rnd = random.Random(42)
+    entrada = montar_hospital(rnd, args.contatos, args.produtos, args.palavras)
+
+    # aquece caches (stringWidth, fontes do reportlab)
+    build_hospital_report(*entrada)
+
+    relatorios = paginas = total_bytes = 0
+    inicio = time.perf_counter()
+    while True:
+        doc = build_hospital_report(*entrada)
+        relatorios += 1
+        paginas += doc.pages
+        total_bytes += len(doc.pdf_bytes)
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= args.segundos:
+            break
+
+    resultado = {
+        "relatorios": relatorios,
+        "segundos": round(decorrido, 3),
+        "relatorios_por_s": round(relatorios / decorrido, 2),
+        "paginas_por_relatorio": paginas // relatorios,
+        "paginas_por_s": round(paginas / decorrido, 2),
+        "bytes_por_relatorio": total_bytes // relatorios,
+        "ms_por_relatorio": round(1000 * decorrido / relatorios, 2),
+    }
+
+    if args.json:
+        print(json.dumps(resultado))
+    else:
+        for k, v in resultado.items():
+            print(f"{k:>22}: {v}")
+
+
+if __name__ == "__main__":
+    main()
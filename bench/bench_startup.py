@@ -0,0 +1,176 @@
+# bench/bench_startup.py
+"""
+Benchmark de partida a frio (cold start) do app.
+
+Cada repetição roda num processo Python NOVO (como um worker do gunicorn ou
+um `flask ...` na linha de comando) e mede:
+  - import do pacote app
+  - create_app()
+  - primeira resposta de cada rota (test client)
+  - RSS do processo (atual e pico)
+  - quais módulos pesados (pandas, reportlab, ...) acabaram carregados
+
+Uso (na raiz do projeto):
+    python -m bench.bench_startup --repeticoes 5 --rotas /ping /hospitais
+    python -m bench.bench_startup --limite-ms 1500 --proibir pandas,reportlab   # falha (exit 1) se regredir
+
+Sem DATABASE_URL usa um SQLite temporário.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODULOS_PESADOS = ("pandas", "numpy", "openpyxl", "reportlab", "alembic")
+
+
+def _rss_kb() -> int:
+    # RSS atual (Linux); fora do Linux cai no pico do getrusage
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return _rss_pico_kb()
+
+
+def _rss_pico_kb() -> int:
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+
+# ======================================================
+# PROCESSO FILHO (uma partida a frio)
+# ======================================================
+def medir_partida(rotas, modulos=MODULOS_PESADOS):
+    t0 = time.perf_counter()
+    rss_inicial = _rss_kb()
+
+    from app import create_app, db
+    t_import = time.perf_counter()
+
+    app = create_app()
+    t_app = time.perf_counter()
+    rss_app = _rss_kb()
+
+    # tabelas para as rotas que consultam o banco (fora da medição)
+    with app.app_context():
+        db.create_all()
+    t_banco = time.perf_counter()
+
+    client = app.test_client()
+    respostas = {}
+    for rota in rotas:
+        t = time.perf_counter()
+        r = client.get(rota)
+        respostas[rota] = {"status": r.status_code, "ms": round(1000 * (time.perf_counter() - t), 2)}
+
+    t_fim = time.perf_counter()
+    return {
+        "import_ms": round(1000 * (t_import - t0), 2),
+        "create_app_ms": round(1000 * (t_app - t_import), 2),
+        "primeira_resposta_ms": round(1000 * ((t_fim - t_banco) + (t_app - t0)), 2),
+        "rotas": respostas,
+        "rss_inicial_kb": rss_inicial,
+        "rss_app_kb": rss_app,
+        "rss_final_kb": _rss_kb(),
+        "rss_pico_kb": _rss_pico_kb(),
+        "modulos_pesados": [m for m in modulos if m in sys.modules],
+    }
+
+
+# ======================================================
+# PROCESSO PAI
+# ======================================================
+def _rodar_filho(rotas, proibir, env):
+    cmd = [sys.executable, "-m", "bench.bench_startup", "--filho", "--proibir", proibir, "--rotas", *rotas]
+    t = time.perf_counter()
+    out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=False)
+    parede_ms = round(1000 * (time.perf_counter() - t), 2)
+    if out.returncode != 0:
+        raise SystemExit(f"processo filho falhou:\n{out.stderr}")
+    r = json.loads(out.stdout.strip().splitlines()[-1])
+    r["processo_ms"] = parede_ms  # inclui a partida do próprio interpretador
+    return r
+
+
+def _resumo(amostras, chave):
+    valores = [a[chave] for a in amostras]
+    return {
+        "mediana": round(statistics.median(valores), 2),
+        "min": round(min(valores), 2),
+        "max": round(max(valores), 2),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rotas", nargs="+", default=["/ping"])
+    ap.add_argument("--repeticoes", type=int, default=5)
+    ap.add_argument("--limite-ms", type=float, default=None, help="falha se a mediana de primeira_resposta_ms passar disso")
+    ap.add_argument("--limite-rss-mb", type=float, default=None, help="falha se a mediana do RSS final passar disso")
+    ap.add_argument("--proibir", default="", help="módulos que NÃO podem ser carregados (ex.: pandas,reportlab)")
+    ap.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    ap.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    proibidos = [m.strip() for m in args.proibir.split(",") if m.strip()]
+
+    if args.filho:
+        modulos = tuple(dict.fromkeys([*MODULOS_PESADOS, *proibidos]))
+        print(json.dumps(medir_partida(args.rotas, modulos)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        env.setdefault("JINJA_CACHE_DIR", os.path.join(tmp, "jinja"))
+        env.setdefault("CACHE_BACKEND", "null")
+
+        # 1ª partida aquece o bytecode do Jinja e o cache de .pyc; não entra na conta
+        _rodar_filho(args.rotas, args.proibir, env)
+        amostras = [_rodar_filho(args.rotas, args.proibir, env) for _ in range(args.repeticoes)]
+
+    ultima = amostras[-1]
+    resultado = {
+        "repeticoes": args.repeticoes,
+        "rotas": {rota: r["status"] for rota, r in ultima["rotas"].items()},
+        "processo_ms": _resumo(amostras, "processo_ms"),
+        "import_ms": _resumo(amostras, "import_ms"),
+        "create_app_ms": _resumo(amostras, "create_app_ms"),
+        "primeira_resposta_ms": _resumo(amostras, "primeira_resposta_ms"),
+        "rss_app_mb": round(statistics.median(a["rss_app_kb"] for a in amostras) / 1024, 1),
+        "rss_final_mb": round(statistics.median(a["rss_final_kb"] for a in amostras) / 1024, 1),
+        "rss_pico_mb": round(statistics.median(a["rss_pico_kb"] for a in amostras) / 1024, 1),
+        "modulos_pesados": ultima["modulos_pesados"],
+    }
+
+    if args.json:
+        print(json.dumps(resultado))
+    else:
+        for k, v in resultado.items():
+            print(f"{k:>22}: {v}")
+
+    # ---------------- limites (para pegar regressão) ----------------
+    falhas = []
+    if args.limite_ms is not None and resultado["primeira_resposta_ms"]["mediana"] > args.limite_ms:
+        falhas.append(f"primeira resposta {resultado['primeira_resposta_ms']['mediana']} ms > {args.limite_ms} ms")
+    if args.limite_rss_mb is not None and resultado["rss_final_mb"] > args.limite_rss_mb:
+        falhas.append(f"RSS {resultado['rss_final_mb']} MB > {args.limite_rss_mb} MB")
+    carregados = [m for m in proibidos if m in ultima["modulos_pesados"]]
+    if carregados:
+        falhas.append(f"módulos pesados carregados na partida: {', '.join(carregados)}")
+
+    if falhas:
+        for f in falhas:
+            print(f"REGRESSÃO: {f}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# bench/gerar_dados.py
+"""
+Gera cópias em escala das planilhas de data/ (mesmos cabeçalhos, mesmas abas).
+
+Os valores são sorteados coluna a coluna a partir dos valores reais de cada
+planilha (cidades, cargos, respostas do questionário, nutrientes...), então
+o texto tem o tamanho e a cara dos dados de produção. IDs são sequenciais e
+as chaves estrangeiras (id_hospital) apontam para hospitais que existem.
+
+Uso (na raiz do projeto):
+    python -m bench.gerar_dados --hospitais 1000 --saida /tmp/dados_1k
+    python -m bench.gerar_dados --hospitais 1000000 --saida /tmp/dados_1m   # demora (openpyxl write_only)
+    python -m bench.gerar_dados --hospitais 100000 --saida /tmp/csv_100k --formato csv
+
+--formato csv escreve <nome>.csv (cp1252, separador ";", como o Excel exporta)
+e o catálogo como data/produtos/<MARCA>.csv (um arquivo por aba).
+
+Proporções (por hospital): --contatos 2, --produtos 5, --dados 0.8 (fração com questionário).
+"""
+import argparse
+import csv
+import os
+import random
+import time
+from typing import Dict, List, Sequence
+
+from openpyxl import Workbook, load_workbook
+
+ORIGEM = "data"
+
+ARQUIVOS = ("hospitais", "contatos", "dadoshospitais", "produtoshospitais", "produtos")
+
+
+# ======================================================
+# AMOSTRAS (valores reais de cada coluna)
+# ======================================================
+def _ler_abas(path: str) -> Dict[str, Dict]:
+    """
+    {aba: {"cabecalho": [...], "colunas": [[valores não vazios], ...]}}
+    """
+    wb = load_workbook(path, read_only=True)
+    out = {}
+    for ws in wb.worksheets:
+        linhas = ws.iter_rows(values_only=True)
+        cabecalho = list(next(linhas, None) or [])
+        colunas: List[List] = [[] for _ in cabecalho]
+        for row in linhas:
+            for i, v in enumerate(row[:len(cabecalho)]):
+                if v is not None and str(v).strip():
+                    colunas[i].append(v)
+        out[ws.title] = {"cabecalho": cabecalho, "colunas": colunas}
+    wb.close()
+    return out
+
+
+def _sorteador(rnd: random.Random, valores: Sequence, vazio: float):
+    """
+    Função que devolve um valor real da coluna (ou vazio, na proporção observada).
+    """
+    if not valores:
+        return lambda: None
+    valores = list(valores)
+    return lambda: None if rnd.random() < vazio else rnd.choice(valores)
+
+
+def _fracao_vazia(valores: Sequence, total: int) -> float:
+    return 1 - (len(valores) / total) if total else 0.0
+
+
+# ======================================================
+# ESCRITA
+# ======================================================
+def _escrever_csv(path: str, cabecalho: Sequence, linhas):
+    with open(path, "w", newline="", encoding="cp1252", errors="replace") as f:
+        w = csv.writer(f, delimiter=";")
+        if cabecalho:
+            w.writerow(cabecalho)
+        for row in linhas:
+            w.writerow(["" if v is None else v for v in row])
+
+
+def _escrever(base: str, abas: Dict[str, tuple], formato: str = "xlsx"):
+    """
+    abas = {nome: (cabecalho, gerador_de_linhas)}; base = caminho sem extensão.
+    CSV: uma aba -> base.csv; várias (catálogo) -> base/<aba>.csv
+    """
+    if formato == "csv":
+        if len(abas) == 1:
+            cabecalho, linhas = next(iter(abas.values()))
+            _escrever_csv(base + ".csv", cabecalho, linhas)
+            return
+        os.makedirs(base, exist_ok=True)
+        for nome, (cabecalho, linhas) in abas.items():
+            # aba vazia vira arquivo vazio (a marca continua existindo)
+            _escrever_csv(os.path.join(base, f"{nome}.csv"), cabecalho or [], linhas if cabecalho else [])
+        return
+
+    path = base + ".xlsx"
+    wb = Workbook(write_only=True)
+    for nome, (cabecalho, linhas) in abas.items():
+        ws = wb.create_sheet(title=nome)
+        if not cabecalho:
+            continue  # aba vazia também existe no original
+        ws.append(list(cabecalho))
+        for row in linhas:
+            ws.append(row)
+    wb.save(path)
+
+
+def _hospitais(rnd, amostra, n, nome_hospital):
+    cab, cols = amostra["cabecalho"], amostra["colunas"]
+    total = max(len(cols[0]), 1)
+    sorteios = [_sorteador(rnd, c, _fracao_vazia(c, total)) for c in cols]
+    for hid in range(1, n + 1):
+        row = [f() for f in sorteios]
+        row[0] = hid
+        row[1] = nome_hospital(hid)
+        yield row
+
+
+def _contatos(rnd, amostra, n_hospitais, por_hospital, nome_hospital):
+    cab, cols = amostra["cabecalho"], amostra["colunas"]
+    total = max(len(cols[0]), 1)
+    sorteios = [_sorteador(rnd, c, _fracao_vazia(c, total)) for c in cols]
+    n = int(n_hospitais * por_hospital)
+    for cid in range(1, n + 1):
+        hid = rnd.randint(1, n_hospitais)
+        row = [f() for f in sorteios]
+        row[0], row[1], row[2] = cid, hid, nome_hospital(hid)
+        row[3] = row[3] or "CONTATO"
+        yield row
+
+
+def _dados(rnd, amostra, n_hospitais, fracao):
+    cab, cols = amostra["cabecalho"], amostra["colunas"]
+    total = max(len(cols[0]), 1)
+    sorteios = [_sorteador(rnd, c, _fracao_vazia(c, total)) for c in cols]
+    for hid in range(1, n_hospitais + 1):
+        if rnd.random() >= fracao:
+            continue
+        row = [f() for f in sorteios]
+        row[0] = hid
+        yield row
+
+
+def _produtos_hospitais(rnd, cabecalho, n_hospitais, por_hospital, nome_hospital, nomes_catalogo):
+    n = int(n_hospitais * por_hospital)
+    for _ in range(n):
+        hid = rnd.randint(1, n_hospitais)
+        yield [hid, nome_hospital(hid), rnd.choice(nomes_catalogo), rnd.randint(1, 500)]
+
+
+def _catalogo(rnd, amostra, n_por_marca):
+    cab, cols = amostra["cabecalho"], amostra["colunas"]
+    if not cab:
+        return
+    base = cols[0] or ["PRODUTO"]
+    sorteios = [_sorteador(rnd, c, 0.0) for c in cols]
+    for i in range(n_por_marca):
+        row = [f() for f in sorteios]
+        # primeiras linhas = nomes reais; depois variações numeradas
+        row[0] = base[i] if i < len(base) else f"{rnd.choice(base)} V{i}"
+        yield row
+
+
+def gerar(saida: str, n_hospitais: int, contatos: float = 2.0, produtos: float = 5.0,
+          dados: float = 0.8, produtos_por_marca: int = 0, origem: str = ORIGEM, seed: int = 42,
+          formato: str = "xlsx") -> Dict[str, float]:
+    """
+    Escreve as 5 planilhas em `saida` (xlsx ou csv) e devolve o tempo (s) de cada uma.
+    """
+    rnd = random.Random(seed)
+    os.makedirs(saida, exist_ok=True)
+    tempos = {}
+
+    amostras = {nome: _ler_abas(os.path.join(origem, f"{nome}.xlsx")) for nome in ARQUIVOS}
+
+    hosp = next(iter(amostras["hospitais"].values()))
+    nomes_base = hosp["colunas"][1] or ["HOSPITAL"]
+
+    def nome_hospital(hid):
+        # nome real + id: único e igual em todas as planilhas
+        return f"{nomes_base[hid % len(nomes_base)]} {hid}"
+
+    # catálogo primeiro: os produtos dos hospitais saem dele
+    t = time.perf_counter()
+    n_marca = produtos_por_marca or max(30, n_hospitais // 20)
+    abas_catalogo = {}
+    nomes_catalogo: List[str] = []
+    for aba, amostra in amostras["produtos"].items():
+        linhas = list(_catalogo(rnd, amostra, n_marca))
+        nomes_catalogo.extend(r[0] for r in linhas)
+        abas_catalogo[aba] = (amostra["cabecalho"], linhas)
+    _escrever(os.path.join(saida, "produtos"), abas_catalogo, formato)
+    tempos["produtos"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    aba, amostra = next(iter(amostras["hospitais"].items()))
+    _escrever(os.path.join(saida, "hospitais"), {aba: (amostra["cabecalho"], _hospitais(rnd, amostra, n_hospitais, nome_hospital))}, formato)
+    tempos["hospitais"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    aba, amostra = next(iter(amostras["contatos"].items()))
+    _escrever(os.path.join(saida, "contatos"),
+              {aba: (amostra["cabecalho"], _contatos(rnd, amostra, n_hospitais, contatos, nome_hospital))}, formato)
+    tempos["contatos"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    aba, amostra = next(iter(amostras["dadoshospitais"].items()))
+    _escrever(os.path.join(saida, "dadoshospitais"), {aba: (amostra["cabecalho"], _dados(rnd, amostra, n_hospitais, dados))}, formato)
+    tempos["dadoshospitais"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    aba, amostra = next(iter(amostras["produtoshospitais"].items()))
+    _escrever(os.path.join(saida, "produtoshospitais"),
+              {aba: (amostra["cabecalho"], _produtos_hospitais(rnd, amostra["cabecalho"], n_hospitais, produtos, nome_hospital, nomes_catalogo))},
+              formato)
+    tempos["produtoshospitais"] = time.perf_counter() - t
+
+    return tempos
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--hospitais", type=int, default=1000, help="linhas em hospitais.xlsx (1k a 1M)")
+    ap.add_argument("--contatos", type=float, default=2.0, help="contatos por hospital")
+    ap.add_argument("--produtos", type=float, default=5.0, help="produtos por hospital")
+    ap.add_argument("--dados", type=float, default=0.8, help="fração dos hospitais com questionário")
+    ap.add_argument("--produtos-por-marca", type=int, default=0, help="linhas por aba do catálogo (0 = automático)")
+    ap.add_argument("--origem", default=ORIGEM, help="pasta com as planilhas reais (cabeçalhos/amostras)")
+    ap.add_argument("--saida", required=True)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--formato", choices=("xlsx", "csv"), default="xlsx")
+    args = ap.parse_args()
+
+    tempos = gerar(args.saida, args.hospitais, args.contatos, args.produtos, args.dados,
+                   args.produtos_por_marca, args.origem, args.seed, args.formato)
+    for nome, s in tempos.items():
+        path = os.path.join(args.saida, f"{nome}.{args.formato}")
+        if not os.path.exists(path):  # catálogo em CSV: pasta produtos/
+            path = os.path.join(args.saida, nome)
+        if os.path.isdir(path):
+            tamanho = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        else:
+            tamanho = os.path.getsize(path)
+        print(f"{os.path.basename(path):>24}: {s:6.2f}s  {tamanho / 1024:8.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
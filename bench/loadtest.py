@@ -0,0 +1,373 @@
+# bench/loadtest.py
+"""
+Teste de carga local: sobe o app no gunicorn (gunicorn.conf.py) contra um
+banco semeado com os dados sintéticos e roda clientes concorrentes.
+
+Cenários (sorteados por peso, cada cliente é um "representante" navegando):
+  lista       GET /hospitais
+  dados       GET /hospitais/<id>/dados
+  catalogo    GET /hospitais/<id>/produtos + pacote do catálogo (troca de marca é local)
+  add_produto POST /hospitais/<id>/produtos  (+ redirect)
+  pdf         GET /hospitais/<id>/relatorios/pdf
+
+Como o navegador, cada cliente guarda cookies e ETags (If-None-Match); use
+--sem-etag para medir sem revalidação.
+
+Uso (na raiz do projeto):
+    python -m bench.loadtest --hospitais 2000 --configs sync:2 gthread:2x4 --clientes 5 20 50 --duracao 15
+    python -m bench.loadtest --database-url postgresql://localhost/nutri_bench --configs gthread:4x8
+
+Para cada configuração de worker x nível de concorrência: req/s, erros e
+p50/p95/p99 por endpoint. O JSON vai para bench/results/loadtest-<data>-<commit>.json.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+from bench.suite import RESULTADOS, _git_commit
+
+CENARIOS = {"lista": 30, "dados": 25, "catalogo": 20, "add_produto": 10, "pdf": 15}
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    k = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+    return ordenados[k]
+
+
+# ======================================================
+# CLIENTE HTTP (keep-alive, cookies, ETag)
+# ======================================================
+class Cliente:
+    def __init__(self, host: str, port: int, usar_etag: bool = True):
+        self.host = host
+        self.port = port
+        self.usar_etag = usar_etag
+        self.conn: Optional[http.client.HTTPConnection] = None
+        self.cookies: Dict[str, str] = {}
+        self.etags: Dict[str, str] = {}
+
+    def _conectar(self):
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+    def request(self, method: str, path: str, form: Optional[Dict] = None):
+        headers = {"Accept-Encoding": "gzip"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        if self.usar_etag and method == "GET" and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        for tentativa in (1, 2):
+            if self.conn is None:
+                self._conectar()
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                resp = self.conn.getresponse()
+                resp.read()
+                break
+            except (http.client.HTTPException, ConnectionError, socket.timeout, OSError):
+                # worker sync fecha a conexão; tenta de novo numa nova
+                self.conn.close()
+                self.conn = None
+                if tentativa == 2:
+                    raise
+
+        for h, v in resp.getheaders():
+            if h.lower() == "set-cookie":
+                nome, _, resto = v.partition("=")
+                self.cookies[nome] = resto.split(";", 1)[0]
+        etag = resp.getheader("ETag")
+        if etag and method == "GET":
+            self.etags[path] = etag
+        if (resp.getheader("Connection") or "").lower() == "close":
+            self.conn.close()
+            self.conn = None
+        return resp.status, resp.getheader("Location")
+
+
+# ======================================================
+# CENÁRIOS
+# ======================================================
+class Cenarios:
+    def __init__(self, ids: List[int], produtos: List[tuple]):
+        self.ids = ids
+        self.produtos = produtos  # [(marca, produto)]
+
+    def executar(self, nome: str, cli: Cliente, rnd: random.Random, registrar):
+        hid = rnd.choice(self.ids)
+
+        def get(rotulo, path):
+            t = time.perf_counter()
+            status, loc = cli.request("GET", path)
+            registrar(rotulo, time.perf_counter() - t, status)
+            return status, loc
+
+        if nome == "lista":
+            get("GET /hospitais", "/hospitais")
+        elif nome == "dados":
+            get("GET /hospitais/<id>/dados", f"/hospitais/{hid}/dados")
+        elif nome == "catalogo":
+            get("GET /hospitais/<id>/produtos", f"/hospitais/{hid}/produtos")
+            status, loc = get("GET /api/catalogo.json", "/api/catalogo.json")
+            if status in (301, 302, 303) and loc:
+                get("GET /api/catalogo.v<ver>.json", urlsplit(loc).path)
+        elif nome == "add_produto":
+            marca, produto = rnd.choice(self.produtos)
+            t = time.perf_counter()
+            status, loc = cli.request("POST", f"/hospitais/{hid}/produtos",
+                                      {"produto_id": "", "marca_planilha": marca, "produto": produto, "quantidade": rnd.randint(1, 50)})
+            registrar("POST /hospitais/<id>/produtos", time.perf_counter() - t, status)
+            if loc:
+                get("GET /hospitais/<id>/produtos", urlsplit(loc).path)
+        elif nome == "pdf":
+            get("GET /hospitais/<id>/relatorios/pdf", f"/hospitais/{hid}/relatorios/pdf")
+
+
+def rodar_carga(host, port, cenarios: Cenarios, n_clientes: int, duracao: float, usar_etag: bool, seed: int) -> Dict:
+    lat: Dict[str, List[float]] = defaultdict(list)
+    erros: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    fim = time.perf_counter() + duracao
+    nomes, pesos = zip(*CENARIOS.items())
+
+    def registrar(rotulo, segundos, status):
+        with lock:
+            lat[rotulo].append(segundos)
+            if status >= 400:
+                erros[rotulo] += 1
+
+    def usuario(i):
+        rnd = random.Random(seed + i)
+        cli = Cliente(host, port, usar_etag)
+        while time.perf_counter() < fim:
+            cenario = rnd.choices(nomes, weights=pesos)[0]
+            try:
+                cenarios.executar(cenario, cli, rnd, registrar)
+            except Exception:
+                with lock:
+                    erros[f"{cenario} (conexão)"] += 1
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=usuario, args=(i,), daemon=True) for i in range(n_clientes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    decorrido = time.perf_counter() - inicio
+
+    por_endpoint = {}
+    total = 0
+    for rotulo, valores in sorted(lat.items()):
+        valores.sort()
+        total += len(valores)
+        por_endpoint[rotulo] = {
+            "n": len(valores),
+            "erros": erros.get(rotulo, 0),
+            "p50_ms": round(1000 * _percentil(valores, 50), 2),
+            "p95_ms": round(1000 * _percentil(valores, 95), 2),
+            "p99_ms": round(1000 * _percentil(valores, 99), 2),
+            "media_ms": round(1000 * statistics.fmean(valores), 2),
+        }
+    todos = sorted(v for vs in lat.values() for v in vs)
+    return {
+        "clientes": n_clientes,
+        "segundos": round(decorrido, 2),
+        "requisicoes": total,
+        "req_por_s": round(total / decorrido, 1) if decorrido else 0,
+        "erros": sum(erros.values()),
+        "erros_conexao": {k: v for k, v in erros.items() if k.endswith("(conexão)")},
+        "p50_ms": round(1000 * _percentil(todos, 50), 2),
+        "p95_ms": round(1000 * _percentil(todos, 95), 2),
+        "p99_ms": round(1000 * _percentil(todos, 99), 2),
+        "endpoints": por_endpoint,
+    }
+
+
+# ======================================================
+# SERVIDOR (gunicorn em subprocesso)
+# ======================================================
+def _parse_config(spec: str) -> Dict[str, str]:
+    """
+    "sync:2" -> 2 workers sync; "gthread:2x4" -> 2 workers com 4 threads.
+    """
+    classe, _, tam = spec.partition(":")
+    workers, _, threads = (tam or "2").partition("x")
+    return {"GUNICORN_WORKER_CLASS": classe, "WEB_CONCURRENCY": workers, "GUNICORN_THREADS": threads or "1"}
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def subir_gunicorn(env: Dict[str, str], port: int, log_path: str, timeout: float = 120) -> subprocess.Popen:
+    env = dict(env, PORT=str(port))
+    log = open(log_path, "ab")
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+                            env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    # /ready cai num worker qualquer: exige várias respostas 200 seguidas
+    workers = int(env.get("WEB_CONCURRENCY", "2"))
+    seguidas = 0
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn saiu (código {proc.returncode}); veja {log_path}")
+        try:
+            c = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            c.request("GET", "/ready")
+            ok = c.getresponse().status == 200
+            c.close()
+        except OSError:
+            ok = False
+        seguidas = seguidas + 1 if ok else 0
+        if seguidas >= 3 * workers:
+            return proc
+        time.sleep(0.1 if ok else 0.3)
+    parar(proc)
+    raise RuntimeError(f"gunicorn não ficou pronto em {timeout}s; veja {log_path}")
+
+
+def parar(proc: subprocess.Popen):
+    if proc.poll() is None:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# ======================================================
+# SEMENTE
+# ======================================================
+def semear(env: Dict[str, str]):
+    """
+    Banco do zero + importação das planilhas (no próprio processo).
+    Devolve (ids dos hospitais, [(marca, produto)]).
+    """
+    os.environ.update(env)
+    from app import create_app, db
+    from app.catalogo import get_bundle
+    from app.models import Hospital
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    client = app.test_client()
+    client.post("/admin/login", data={"username": "admin", "password": env["ADMIN_PASS"]})
+    r = client.post("/admin/importar_excel_uma_vez")
+    if r.status_code != 302:
+        raise RuntimeError(f"importação falhou: HTTP {r.status_code}")
+    with app.app_context():
+        ids = [i for (i,) in Hospital.query.with_entities(Hospital.id).all()]
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    bundle = get_bundle(env["DATA_DIR"])
+    produtos = [(m["marca"], p["produto"]) for m in bundle.data for p in m["produtos"]]
+    if not ids or not produtos:
+        raise RuntimeError("semente vazia (sem hospitais ou sem catálogo)")
+    return ids, produtos
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dados", help="pasta com as planilhas (se omitido, gera em pasta temporária)")
+    ap.add_argument("--hospitais", type=int, default=1000, help="escala do conjunto gerado")
+    ap.add_argument("--database-url", default=None, help="padrão: SQLite temporário (Postgres: postgresql://...)")
+    ap.add_argument("--configs", nargs="+", default=["sync:2", "gthread:2x4"], help="classe:workers[xthreads]")
+    ap.add_argument("--clientes", nargs="+", type=int, default=[5, 20])
+    ap.add_argument("--duracao", type=float, default=15.0, help="segundos por rodada")
+    ap.add_argument("--sem-etag", action="store_true")
+    ap.add_argument("--cache", default="lru", help="CACHE_BACKEND do app (lru, filesystem, null)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--saida", default=None)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.dados
+        if not data_dir:
+            from bench.gerar_dados import gerar
+
+            data_dir = os.path.join(tmp, "dados")
+            print(f"gerando {args.hospitais} hospitais em {data_dir} ...")
+            gerar(data_dir, args.hospitais)
+
+        env = dict(os.environ)
+        env.update({
+            "DATA_DIR": data_dir,
+            "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(tmp, 'carga.db')}",
+            "CACHE_BACKEND": args.cache,
+            "CACHE_DIR": os.path.join(tmp, "cache"),
+            "JINJA_CACHE_DIR": os.path.join(tmp, "jinja"),
+            "ADMIN_PASS": env.get("ADMIN_PASS") or "carga",
+            "GUNICORN_PRELOAD": "1",
+            "GUNICORN_WARMUP": "1",
+        })
+
+        print("semeando o banco ...")
+        ids, produtos = semear(env)
+        print(f"{len(ids)} hospitais, {len(produtos)} produtos no catálogo")
+
+        rodadas = []
+        for spec in args.configs:
+            cfg = _parse_config(spec)
+            port = _porta_livre()
+            log_path = os.path.join(tmp, f"gunicorn-{spec.replace(':', '_')}.log")
+            print(f"\n== {spec} (porta {port}) ==")
+            proc = subir_gunicorn(dict(env, **cfg), port, log_path)
+            try:
+                for n in args.clientes:
+                    r = rodar_carga("127.0.0.1", port, Cenarios(ids, produtos), n, args.duracao, not args.sem_etag, args.seed)
+                    r["config"] = spec
+                    rodadas.append(r)
+                    print(f"{n:>4} clientes: {r['req_por_s']:8.1f} req/s  p50 {r['p50_ms']:8.1f}  "
+                          f"p95 {r['p95_ms']:8.1f}  p99 {r['p99_ms']:8.1f} ms  erros {r['erros']}")
+                    for rotulo, e in r["endpoints"].items():
+                        print(f"      {rotulo:<34} n={e['n']:<6} p50 {e['p50_ms']:8.1f}  p95 {e['p95_ms']:8.1f}  "
+                              f"p99 {e['p99_ms']:8.1f} ms  erros {e['erros']}")
+            finally:
+                parar(proc)
+
+    resultado = {
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "banco": "sqlite" if not args.database_url else urlsplit(args.database_url).scheme,
+        "escala": {"dados": args.dados, "hospitais": None if args.dados else args.hospitais},
+        "cenarios": CENARIOS,
+        "etag": not args.sem_etag,
+        "duracao": args.duracao,
+        "rodadas": rodadas,
+    }
+    saida = args.saida
+    if not saida:
+        os.makedirs(RESULTADOS, exist_ok=True)
+        saida = os.path.join(RESULTADOS, f"loadtest-{datetime.now():%Y%m%d-%H%M%S}-{resultado['commit']}.json")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nresultado: {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# bench/memoria_dados.py
+"""
+Memória do cache do dadoshospitais.xlsx por worker: lista de dicts (formato
+antigo) x tabela compacta (app/dados_compactos.py).
+
+Mede com tracemalloc só o que fica retido depois da carga (o DataFrame do
+pandas já foi liberado) e confere se as duas versões têm os mesmos valores.
+
+Uso (na raiz do projeto):
+    python -m bench.memoria_dados --dados /tmp/dados_10k
+    python -m bench.memoria_dados --hospitais 5000 --workers 4
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from typing import Callable, Tuple
+
+
+def retido(fn: Callable[[], object]) -> Tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        obj = fn()
+        gc.collect()
+        depois = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return obj, depois - antes
+
+
+def conferir(linhas, tabela) -> int:
+    """
+    Mesmos valores nas duas versões (primeira linha de cada hospital). Devolve quantas conferiu.
+    """
+    vistos = set()
+    for r in linhas:
+        hid = r["id_hospital"]
+        if hid in vistos:
+            continue
+        vistos.add(hid)
+        if dict(tabela.get(hid)) != r:
+            raise SystemExit(f"diferença no hospital {hid}")
+    if len(vistos) != len(tabela):
+        raise SystemExit(f"{len(vistos)} hospitais na lista x {len(tabela)} na tabela")
+    return len(vistos)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dados", help="pasta com as planilhas (se omitido, gera em pasta temporária)")
+    ap.add_argument("--hospitais", type=int, default=2000, help="escala do conjunto gerado")
+    ap.add_argument("--workers", type=int, default=1, help="multiplica o total (uma cópia por worker)")
+    args = ap.parse_args()
+
+    from app.excel_loader import load_dados_hospitais_compacto, load_dados_hospitais_from_excel
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.dados
+        if not data_dir:
+            from bench.gerar_dados import gerar
+
+            data_dir = os.path.join(tmp, "dados")
+            print(f"gerando {args.hospitais} hospitais em {data_dir} ...")
+            gerar(data_dir, args.hospitais)
+
+        # importa o pandas antes de medir (senão entra na conta da primeira carga)
+        load_dados_hospitais_from_excel(data_dir)
+
+        linhas, bytes_dicts = retido(lambda: load_dados_hospitais_from_excel(data_dir))
+        tabela, bytes_compacto = retido(lambda: load_dados_hospitais_compacto(data_dir))
+
+    n = conferir(linhas, tabela)
+    if not n:
+        print("planilha sem linhas com id_hospital")
+        return 1
+
+    colunas = len(tabela.esquema.nomes)
+    print(f"{len(linhas)} linhas ({n} hospitais), {colunas} colunas, {args.workers} worker(s)")
+    for nome, total in (("lista de dicts", bytes_dicts), ("tabela compacta", bytes_compacto)):
+        print(
+            f"{nome:>16}: {total * args.workers / 1024 / 1024:8.2f} MiB"
+            f"  ({total / len(linhas):8.0f} bytes/linha)"
+        )
+    print(f"{'redução':>16}: {100 * (1 - bytes_compacto / bytes_dicts):.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# bench/suite.py
+"""
+Suíte de micro-benchmarks sobre um conjunto de dados em escala (SQLite).
+
+Casos:
+  loader:*         cada função de app/excel_loader.py
+  importacao       POST /admin/importar_excel_uma_vez num banco vazio
+  pagina:*         listas (/hospitais, /relatorios, /api/hospitais)
+  relatorio:*      pacote de um hospital (página, API batch), PDF e CSV
+
+O cache de páginas fica desligado (CACHE_BACKEND=null) para medir o trabalho
+de verdade. O resultado vai para bench/results/<data>-<commit>.json; use
+--comparar <arquivo.json> para ver a diferença contra uma rodada anterior.
+
+Uso (na raiz do projeto):
+    python -m bench.suite --hospitais 1000
+    python -m bench.suite --dados /tmp/dados_10k --repeticoes 10 --so loader: pagina:
+    python -m bench.suite --comparar bench/results/20261019-101500-ab12cd3.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "sem-git"
+
+
+def medir(fn: Callable[[], object], repeticoes: int, aquecimento: int = 1) -> Dict:
+    for _ in range(aquecimento):
+        fn()
+    tempos: List[float] = []
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        fn()
+        tempos.append(1000 * (time.perf_counter() - t))
+    tempos.sort()
+    p95 = tempos[min(len(tempos) - 1, int(round(0.95 * (len(tempos) - 1))))]
+    return {
+        "n": len(tempos),
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "p95_ms": round(p95, 3),
+        "min_ms": round(tempos[0], 3),
+        "max_ms": round(tempos[-1], 3),
+    }
+
+
+# ======================================================
+# CASOS
+# ======================================================
+def casos_loaders(data_dir: str):
+    from app import excel_loader as xl
+
+    return {
+        "loader:hospitais": lambda: xl.load_hospitais_from_excel(data_dir),
+        "loader:contatos": lambda: xl.load_contatos_from_excel(data_dir),
+        "loader:dados_hospitais": lambda: xl.load_dados_hospitais_from_excel(data_dir),
+        "loader:produtos_hospitais": lambda: xl.load_produtos_hospitais_from_excel(data_dir),
+        "loader:marcas": lambda: xl.load_marcas_from_produtos_excel(data_dir),
+        "loader:catalogo_completo": lambda: xl.load_catalogo_completo_from_produtos_excel(data_dir),
+    }
+
+
+def _ok(resp, esperado=200):
+    if resp.status_code != esperado:
+        raise RuntimeError(f"{resp.request.path}: HTTP {resp.status_code}")
+    return resp
+
+
+def preparar_app(tmp: str):
+    from app import create_app, db
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    client = app.test_client()
+    _ok(client.post("/admin/login", data={"username": "admin", "password": os.environ["ADMIN_PASS"]}), 302)
+    return app, client
+
+
+def caso_importacao(app, client):
+    from app import db
+
+    def importar():
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        _ok(client.post("/admin/importar_excel_uma_vez"), 302)
+    return importar
+
+
+def casos_paginas(app, client):
+    from app.models import Hospital
+
+    with app.app_context():
+        ids = [i for (i,) in Hospital.query.with_entities(Hospital.id).order_by(Hospital.id).limit(100).all()]
+    if not ids:
+        raise RuntimeError("banco vazio: a importação falhou?")
+    hid = ids[len(ids) // 2]
+    ids_csv = ",".join(map(str, ids))
+
+    def api_todas_paginas():
+        after = 0
+        while after is not None:
+            r = _ok(client.get(f"/api/hospitais?limit=500&after={after}&fields=id,nome_hospital,cidade,estado"))
+            after = r.get_json()["next_after"]
+
+    return {
+        "pagina:hospitais": lambda: _ok(client.get("/hospitais")),
+        "pagina:relatorios_geral": lambda: _ok(client.get("/relatorios")),
+        "pagina:api_hospitais_todas": api_todas_paginas,
+        "relatorio:pagina": lambda: _ok(client.get(f"/hospitais/{hid}/relatorios")),
+        "relatorio:api_batch_100": lambda: _ok(client.get(f"/api/hospitais/batch?ids={ids_csv}")),
+        "relatorio:pdf": lambda: _ok(client.get(f"/hospitais/{hid}/relatorios/pdf")),
+        "relatorio:csv": lambda: _ok(client.post("/relatorios/csv", data={"hospital_id": hid})),
+    }
+
+
+# ======================================================
+# COMPARAÇÃO
+# ======================================================
+def comparar(atual: Dict, anterior: Dict):
+    print(f"\ncomparando com {anterior.get('commit')} ({anterior.get('quando')}):")
+    for nome, r in atual["casos"].items():
+        antes = anterior.get("casos", {}).get(nome)
+        if not antes:
+            print(f"{nome:>30}: (novo)")
+            continue
+        delta = (r["mediana_ms"] / antes["mediana_ms"] - 1) * 100 if antes["mediana_ms"] else 0.0
+        print(f"{nome:>30}: {antes['mediana_ms']:10.2f} -> {r['mediana_ms']:10.2f} ms  ({delta:+.1f}%)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dados", help="pasta com as planilhas (se omitido, gera em pasta temporária)")
+    ap.add_argument("--hospitais", type=int, default=1000, help="escala do conjunto gerado")
+    ap.add_argument("--repeticoes", type=int, default=5)
+    ap.add_argument("--repeticoes-importacao", type=int, default=1)
+    ap.add_argument("--so", nargs="*", default=None, help="prefixos dos casos (ex.: loader: pagina:)")
+    ap.add_argument("--saida", default=None, help="arquivo JSON (padrão: bench/results/<data>-<commit>.json)")
+    ap.add_argument("--comparar", default=None, help="JSON de uma rodada anterior")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.dados
+        if not data_dir:
+            from bench.gerar_dados import gerar
+
+            data_dir = os.path.join(tmp, "dados")
+            print(f"gerando {args.hospitais} hospitais em {data_dir} ...")
+            gerar(data_dir, args.hospitais)
+
+        # antes de importar o app: o Config lê o ambiente no import
+        os.environ["DATA_DIR"] = data_dir
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["CACHE_BACKEND"] = "null"
+        os.environ["JINJA_CACHE_DIR"] = os.path.join(tmp, "jinja")
+        os.environ.setdefault("ADMIN_PASS", "bench")
+
+        def quer(nome):
+            return not args.so or any(nome.startswith(p) for p in args.so)
+
+        casos: Dict[str, Dict] = {}
+
+        for nome, fn in casos_loaders(data_dir).items():
+            if quer(nome):
+                casos[nome] = medir(fn, args.repeticoes)
+                print(f"{nome:>30}: {casos[nome]['mediana_ms']:10.2f} ms")
+
+        app, client = preparar_app(tmp)
+        importar = caso_importacao(app, client)
+        if quer("importacao"):
+            casos["importacao"] = medir(importar, args.repeticoes_importacao, aquecimento=0)
+            print(f"{'importacao':>30}: {casos['importacao']['mediana_ms']:10.2f} ms")
+        else:
+            importar()
+
+        for nome, fn in casos_paginas(app, client).items():
+            if quer(nome):
+                casos[nome] = medir(fn, args.repeticoes)
+                print(f"{nome:>30}: {casos[nome]['mediana_ms']:10.2f} ms")
+
+    resultado = {
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "escala": {"dados": args.dados, "hospitais": None if args.dados else args.hospitais},
+        "repeticoes": args.repeticoes,
+        "casos": casos,
+    }
+
+    saida = args.saida
+    if not saida:
+        os.makedirs(RESULTADOS, exist_ok=True)
+        saida = os.path.join(RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}-{resultado['commit']}.json")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nresultado: {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(resultado, json.load(f))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,4 +6,14 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev")
+    # pasta das planilhas (o benchmark aponta para uma cópia em escala)
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    # réplica de leitura opcional (GET/relatórios); escrita sempre no primário
+    SQLALCHEMY_BINDS = (
+        {"replica": os.environ["DATABASE_REPLICA_URL"]} if os.environ.get("DATABASE_REPLICA_URL") else {}
+    )
+    # depois de um POST, quanto tempo o usuário lê só do primário
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "10"))
+    # marca "nossa" nas oportunidades de troca (equivalentes por nutrientes)
+    MARCA_PROPRIA = os.environ.get("MARCA_PROPRIA", "PRODIET")
 
@@ -0,0 +1,78 @@
+# gunicorn.conf.py
+"""
+Configuração do gunicorn (lida automaticamente: `gunicorn manage:app`).
+
+Variáveis de ambiente:
+  PORT                  porta (o Render define)                      [8000]
+  WEB_CONCURRENCY       número de workers                            [2]
+  GUNICORN_WORKER_CLASS sync | gthread                               [sync]
+  GUNICORN_THREADS      threads por worker (só gthread)              [4]
+  GUNICORN_TIMEOUT      segundos até matar um worker travado         [60]
+  GUNICORN_PRELOAD      1 = cria o app no master e faz fork          [1]
+  GUNICORN_WARMUP       1 = aquece os caches                         [1]
+                        (com preload: no master, antes do fork; sem preload:
+                        em cada worker, numa thread, depois que ele sobe)
+
+Health checks: /ping (vivo) e /ready (503 enquanto o worker aquece; com
+preload isso já acabou antes do fork).
+"""
+import os
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, "1" if default else "0").strip().lower() in ("1", "true", "yes", "sim")
+
+
+wsgi_app = "manage:app"
+bind = f"0.0.0.0:{_env_int('PORT', 8000)}"
+
+workers = _env_int("WEB_CONCURRENCY", 2)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync").strip().lower()
+if worker_class not in ("sync", "gthread"):
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS inválido: {worker_class!r} (use sync ou gthread)")
+threads = _env_int("GUNICORN_THREADS", 4) if worker_class == "gthread" else 1
+
+timeout = _env_int("GUNICORN_TIMEOUT", 60)
+graceful_timeout = 30
+keepalive = 5
+
+# app criado uma vez no master; workers compartilham a memória (copy-on-write)
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    # master, depois do preload e antes de criar os workers: aquece uma vez para todos
+    if not (preload_app and _env_bool("GUNICORN_WARMUP", True)):
+        return
+    from app import lifecycle
+
+    lifecycle.warm_up_master(server.app.wsgi())
+    ok, estado = lifecycle.readiness()
+    server.log.info("caches aquecidos no master: %s %s", estado["status"], estado["etapas"])
+
+
+def post_fork(server, worker):
+    from app import lifecycle
+
+    lifecycle.reset_connections(worker.app.wsgi())
+    server.log.info("worker %s: pool do banco resetado", worker.pid)
+
+
+def post_worker_init(worker):
+    # sem preload não houve aquecimento no master: cada worker aquece o próprio app
+    if preload_app or not _env_bool("GUNICORN_WARMUP", True):
+        return
+    from app import lifecycle
+
+    lifecycle.warm_up_worker(worker.app.wsgi())
+    worker.log.info("worker %s: aquecendo os caches (/ready 503 até terminar)", worker.pid)
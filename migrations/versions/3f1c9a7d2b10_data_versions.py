@@ -0,0 +1,36 @@
+"""data_versions (contadores de alteração por tabela)
+
+Revision ID: 3f1c9a7d2b10
+Revises: aac4aef99965
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b10'
+down_revision = 'aac4aef99965'
+branch_labels = None
+depends_on = None
+
+TABELAS = ("hospitais", "contatos", "dados_hospitais", "produtos_hospitais")
+
+
+def upgrade():
+    data_versions = op.create_table(
+        'data_versions',
+        sa.Column('table_name', sa.String(length=80), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+    now = datetime.utcnow()
+    op.bulk_insert(data_versions, [{'table_name': t, 'version': 0, 'updated_at': now} for t in TABELAS])
+
+
+def downgrade():
+    op.drop_table('data_versions')
@@ -0,0 +1,61 @@
+"""catálogo de produtos no banco (marcas, produtos) + produtos_hospitais.produto_id
+
+Revision ID: 5b2e8c41d7a3
+Revises: 3f1c9a7d2b10
+Create Date: 2026-10-19 12:00:00.000000
+
+Depois do upgrade, popular o catálogo e ligar as linhas existentes:
+    flask --app manage sincronizar-catalogo
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8c41d7a3'
+down_revision = '3f1c9a7d2b10'
+branch_labels = None
+depends_on = None
+
+NUTRIENTES = ('kcal', 'ptn', 'lip', 'fibras', 'sodio', 'ferro', 'potassio', 'vit_b12', 'gordura_saturada')
+
+
+def upgrade():
+    op.create_table(
+        'marcas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nome', sa.String(length=50), nullable=False),
+        sa.Column('chave', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('chave'),
+    )
+    op.create_table(
+        'produtos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('marca_id', sa.Integer(), nullable=False),
+        sa.Column('nome', sa.String(length=255), nullable=False),
+        sa.Column('chave', sa.String(length=255), nullable=False),
+        sa.Column('embalagem', sa.String(length=120), nullable=True),
+        sa.Column('referencia', sa.String(length=120), nullable=True),
+        *[sa.Column(c, sa.String(length=50), nullable=True) for c in NUTRIENTES],
+        sa.ForeignKeyConstraint(['marca_id'], ['marcas.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('marca_id', 'chave', name='uq_produtos_marca_chave'),
+    )
+
+    with op.batch_alter_table('produtos_hospitais') as batch_op:
+        batch_op.add_column(sa.Column('produto_id', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_produtos_hospitais_produto_id', ['produto_id'])
+        batch_op.create_foreign_key(
+            'fk_produtos_hospitais_produto_id', 'produtos', ['produto_id'], ['id'], ondelete='SET NULL'
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('produtos_hospitais') as batch_op:
+        batch_op.drop_constraint('fk_produtos_hospitais_produto_id', type_='foreignkey')
+        batch_op.drop_index('ix_produtos_hospitais_produto_id')
+        batch_op.drop_column('produto_id')
+
+    op.drop_table('produtos')
+    op.drop_table('marcas')
@@ -0,0 +1,95 @@
+"""dados_hospitais.respostas (questionário num documento JSON/JSONB)
+
+Revision ID: 7c5d2a9e4f61
+Revises: e42d8b6c1a97
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7c5d2a9e4f61'
+down_revision = 'e42d8b6c1a97'
+branch_labels = None
+depends_on = None
+
+# colunas que existiam nesta revisão (lista fixa: o registro do app pode crescer depois)
+PERGUNTAS = (
+    'especialidade', 'leitos', 'leitos_uti', 'fatores_decisorios', 'prioridades_atendimento',
+    'certificacao', 'emtn', 'emtn_membros', 'comissao_feridas', 'comissao_feridas_membros',
+    'nutricao_enteral_dia', 'pacientes_tno_dia', 'altas_orientadas', 'quem_orienta_alta',
+    'protocolo_evolucao_dieta', 'protocolo_evolucao_dieta_qual', 'protocolo_lesao_pressao',
+    'maior_desafio', 'dieta_padrao', 'bomba_infusao_modelo', 'fornecedor', 'convenio_empresas',
+    'convenio_empresas_modelo_pagamento', 'reembolso', 'modelo_compras', 'contrato_tipo',
+    'nova_etapa_negociacao',
+)
+VERSAO_DOCUMENTO = 1
+
+
+def _colunas_existentes(conn):
+    # parte das colunas só existe em bancos que passaram pelo fix_schema_dados
+    cols = {c['name'] for c in sa.inspect(conn).get_columns('dados_hospitais')}
+    return [c for c in PERGUNTAS if c in cols]
+
+
+def upgrade():
+    conn = op.get_bind()
+    existentes = _colunas_existentes(conn)
+
+    with op.batch_alter_table('dados_hospitais') as batch_op:
+        batch_op.add_column(sa.Column(
+            'respostas', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'),
+            nullable=False, server_default='{}',
+        ))
+
+    if existentes:
+        rows = conn.execute(sa.text(f"SELECT id, {', '.join(existentes)} FROM dados_hospitais")).fetchall()
+        if rows:
+            conn.execute(
+                sa.text("UPDATE dados_hospitais SET respostas = :doc WHERE id = :id"),
+                [
+                    {
+                        "id": r[0],
+                        "doc": json.dumps(
+                            {"_v": VERSAO_DOCUMENTO, **{c: v for c, v in zip(existentes, r[1:]) if v}},
+                            ensure_ascii=False,
+                        ),
+                    }
+                    for r in rows
+                ],
+            )
+
+    if conn.dialect.name == 'postgresql':
+        op.create_index('ix_dados_respostas_gin', 'dados_hospitais', ['respostas'], postgresql_using='gin')
+
+    with op.batch_alter_table('dados_hospitais') as batch_op:
+        for c in existentes:
+            batch_op.drop_column(c)
+
+
+def downgrade():
+    conn = op.get_bind()
+
+    with op.batch_alter_table('dados_hospitais') as batch_op:
+        for c in PERGUNTAS:
+            batch_op.add_column(sa.Column(c, sa.Text(), nullable=True))
+
+    rows = conn.execute(sa.text("SELECT id, respostas FROM dados_hospitais")).fetchall()
+    if rows:
+        sets = ', '.join(f"{c} = :{c}" for c in PERGUNTAS)
+        docs = [(r[0], r[1] if isinstance(r[1], dict) else json.loads(r[1] or '{}')) for r in rows]
+        conn.execute(
+            sa.text(f"UPDATE dados_hospitais SET {sets} WHERE id = :id"),
+            [{"id": i, **{c: doc.get(c) or '' for c in PERGUNTAS}} for i, doc in docs],
+        )
+
+    if conn.dialect.name == 'postgresql':
+        op.drop_index('ix_dados_respostas_gin', table_name='dados_hospitais')
+
+    with op.batch_alter_table('dados_hospitais') as batch_op:
+        batch_op.drop_column('respostas')
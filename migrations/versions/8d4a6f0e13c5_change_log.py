@@ -0,0 +1,62 @@
+"""feed de alterações (change_log) + updated_at
+
+Revision ID: 8d4a6f0e13c5
+Revises: 5b2e8c41d7a3
+Create Date: 2026-10-19 13:00:00.000000
+
+Os registros que já existem entram no change_log como "I": um consumidor
+novo começa de since=0 e recebe a carga completa pelo próprio feed.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4a6f0e13c5'
+down_revision = '5b2e8c41d7a3'
+branch_labels = None
+depends_on = None
+
+# tabela -> coluna com o id do hospital
+TABELAS = {
+    'hospitais': 'id',
+    'contatos': 'hospital_id',
+    'dados_hospitais': 'hospital_id',
+    'produtos_hospitais': 'hospital_id',
+}
+
+
+def upgrade():
+    op.create_table(
+        'change_log',
+        sa.Column('seq', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('table_name', sa.String(length=80), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('hospital_id', sa.Integer(), nullable=True),
+        sa.Column('op', sa.String(length=1), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+    )
+
+    for tabela in TABELAS:
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    now = datetime.utcnow()
+    for tabela, col_hospital in TABELAS.items():
+        op.execute(sa.text(f"UPDATE {tabela} SET updated_at = :now").bindparams(now=now))
+        op.execute(
+            sa.text(
+                f"INSERT INTO change_log (table_name, row_id, hospital_id, op, changed_at) "
+                f"SELECT '{tabela}', id, {col_hospital}, 'I', :now FROM {tabela} ORDER BY id"
+            ).bindparams(now=now)
+        )
+
+
+def downgrade():
+    for tabela in TABELAS:
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.drop_column('updated_at')
+    op.drop_table('change_log')
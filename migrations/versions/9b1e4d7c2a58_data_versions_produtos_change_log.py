@@ -0,0 +1,42 @@
+"""data_versions: contadores de produtos e change_log
+
+Revision ID: 9b1e4d7c2a58
+Revises: 7c5d2a9e4f61
+Create Date: 2026-10-19 20:00:00.000000
+
+A 3f1c9a7d2b10 semeou só as 4 tabelas de hospital; o app também incrementa
+"produtos" (catálogo) e "change_log". Sem a linha o primeiro incremento a cria
+(upsert), mas até lá as páginas que dependem delas não têm versão.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1e4d7c2a58'
+down_revision = '7c5d2a9e4f61'
+branch_labels = None
+depends_on = None
+
+TABELAS = ("produtos", "change_log")
+
+
+def upgrade():
+    # só as que faltam: o upsert do app pode já ter criado a linha
+    conn = op.get_bind()
+    now = datetime.utcnow()
+    for t in TABELAS:
+        conn.execute(
+            sa.text(
+                "INSERT INTO data_versions (table_name, version, updated_at) "
+                "SELECT :t, 0, :now WHERE NOT EXISTS (SELECT 1 FROM data_versions WHERE table_name = :t)"
+            ),
+            {"t": t, "now": now},
+        )
+
+
+def downgrade():
+    # as linhas ficam: apagar zeraria o contador e uma ETag antiga voltaria a valer
+    pass
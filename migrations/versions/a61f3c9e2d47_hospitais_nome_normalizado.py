@@ -0,0 +1,78 @@
+"""hospitais.nome_normalizado (índice para duplicados / resolução de entidades)
+
+Revision ID: a61f3c9e2d47
+Revises: 8d4a6f0e13c5
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a61f3c9e2d47'
+down_revision = '8d4a6f0e13c5'
+branch_labels = None
+depends_on = None
+
+# cópia congelada de app.entidades.normalizar_nome (e catalogo_db.chave_nome) nesta revisão:
+# mudanças futuras no app não alteram o que esta migration grava
+_PALAVRAS_VAZIAS = {"DE", "DA", "DO", "DAS", "DOS", "E"}
+_ABREVIACOES = {
+    "H": "HOSPITAL",
+    "HOSP": "HOSPITAL",
+    "HOSPT": "HOSPITAL",
+    "STA": "SANTA",
+    "STO": "SANTO",
+    "SRA": "SENHORA",
+    "N": "NOSSA",
+    "NS": "NOSSA SENHORA",
+    "S": "SAO",
+    "UNIV": "UNIVERSITARIO",
+    "MUN": "MUNICIPAL",
+    "REG": "REGIONAL",
+    "INST": "INSTITUTO",
+    "FUND": "FUNDACAO",
+    "GER": "GERAL",
+}
+_RE_ESPACOS = re.compile(r"\s+")
+_RE_NAO_ALFANUM = re.compile(r"[^A-Z0-9]+")
+
+
+def _chave_nome(valor):
+    s = unicodedata.normalize("NFKD", str(valor or ""))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return _RE_ESPACOS.sub(" ", s).strip().upper()
+
+
+def normalizar_nome(nome):
+    s = _RE_NAO_ALFANUM.sub(" ", _chave_nome(nome))
+    palavras = []
+    for p in s.split():
+        p = _ABREVIACOES.get(p, p)
+        palavras.extend(w for w in p.split() if w not in _PALAVRAS_VAZIAS)
+    return " ".join(palavras)
+
+
+def upgrade():
+    with op.batch_alter_table('hospitais') as batch_op:
+        batch_op.add_column(sa.Column('nome_normalizado', sa.String(length=255), nullable=True))
+        batch_op.create_index('ix_hospitais_nome_normalizado', ['nome_normalizado'])
+
+    # linhas que ficarem NULL: `flask resolver-entidades` completa
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, nome_hospital FROM hospitais")).fetchall()
+    if rows:
+        conn.execute(
+            sa.text("UPDATE hospitais SET nome_normalizado = :n WHERE id = :id"),
+            [{"id": r[0], "n": normalizar_nome(r[1])} for r in rows],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('hospitais') as batch_op:
+        batch_op.drop_index('ix_hospitais_nome_normalizado')
+        batch_op.drop_column('nome_normalizado')
@@ -0,0 +1,28 @@
+"""hospitais.versao / dados_hospitais.versao (concorrência otimista nos formulários)
+
+Revision ID: c3b7e91a5f08
+Revises: a61f3c9e2d47
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3b7e91a5f08'
+down_revision = 'a61f3c9e2d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for tabela in ('hospitais', 'dados_hospitais'):
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.add_column(sa.Column('versao', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for tabela in ('dados_hospitais', 'hospitais'):
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.drop_column('versao')
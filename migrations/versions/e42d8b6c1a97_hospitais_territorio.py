@@ -0,0 +1,88 @@
+"""hospitais.uf_key / cidade_key / cep_prefixo (explorador de territórios)
+
+Revision ID: e42d8b6c1a97
+Revises: c3b7e91a5f08
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e42d8b6c1a97'
+down_revision = 'c3b7e91a5f08'
+branch_labels = None
+depends_on = None
+
+# cópia congelada da normalização de app.territorios (e catalogo_db.chave_nome) nesta revisão:
+# mudanças futuras no app não alteram o que esta migration grava
+UFS = {
+    "AC": "ACRE", "AL": "ALAGOAS", "AP": "AMAPA", "AM": "AMAZONAS", "BA": "BAHIA",
+    "CE": "CEARA", "DF": "DISTRITO FEDERAL", "ES": "ESPIRITO SANTO", "GO": "GOIAS",
+    "MA": "MARANHAO", "MT": "MATO GROSSO", "MS": "MATO GROSSO DO SUL", "MG": "MINAS GERAIS",
+    "PA": "PARA", "PB": "PARAIBA", "PR": "PARANA", "PE": "PERNAMBUCO", "PI": "PIAUI",
+    "RJ": "RIO DE JANEIRO", "RN": "RIO GRANDE DO NORTE", "RS": "RIO GRANDE DO SUL",
+    "RO": "RONDONIA", "RR": "RORAIMA", "SC": "SANTA CATARINA", "SP": "SAO PAULO",
+    "SE": "SERGIPE", "TO": "TOCANTINS",
+}
+_UF_POR_NOME = {nome: sigla for sigla, nome in UFS.items()}
+SEM_CHAVE = "?"
+
+_RE_ESPACOS = re.compile(r"\s+")
+_RE_NAO_DIGITO = re.compile(r"\D")
+_RE_PONTUACAO = re.compile(r"[^\w ]")
+
+
+def _chave_nome(valor):
+    s = unicodedata.normalize("NFKD", str(valor or ""))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return _RE_ESPACOS.sub(" ", s).strip().upper()
+
+
+def uf_canonica(estado):
+    s = _chave_nome(_RE_PONTUACAO.sub("", str(estado or "")))
+    if s in UFS:
+        return s
+    return _UF_POR_NOME.get(s, SEM_CHAVE)
+
+
+def cidade_chave(cidade):
+    return _chave_nome(_RE_PONTUACAO.sub("", str(cidade or ""))) or SEM_CHAVE
+
+
+def cep_prefixo(cep):
+    digitos = _RE_NAO_DIGITO.sub("", str(cep or ""))
+    return digitos[:5] if len(digitos) >= 5 else None
+
+
+def upgrade():
+    with op.batch_alter_table('hospitais') as batch_op:
+        batch_op.add_column(sa.Column('uf_key', sa.String(length=2), nullable=True))
+        batch_op.add_column(sa.Column('cidade_key', sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column('cep_prefixo', sa.String(length=5), nullable=True))
+        batch_op.create_index('ix_hospitais_territorio', ['uf_key', 'cidade_key'])
+        batch_op.create_index('ix_hospitais_cep_prefixo', ['cep_prefixo'])
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, estado, cidade, cep FROM hospitais")).fetchall()
+    if rows:
+        conn.execute(
+            sa.text("UPDATE hospitais SET uf_key = :uf, cidade_key = :cidade, cep_prefixo = :cep WHERE id = :id"),
+            [
+                {"id": r[0], "uf": uf_canonica(r[1]), "cidade": cidade_chave(r[2]), "cep": cep_prefixo(r[3])}
+                for r in rows
+            ],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('hospitais') as batch_op:
+        batch_op.drop_index('ix_hospitais_cep_prefixo')
+        batch_op.drop_index('ix_hospitais_territorio')
+        batch_op.drop_column('cep_prefixo')
+        batch_op.drop_column('cidade_key')
+        batch_op.drop_column('uf_key')
@@ -0,0 +1,91 @@
+# tests/conftest.py
+"""
+App de teste: SQLite temporário + planilhas sintéticas (bench/gerar_dados.py)
+importadas pela rota do admin, com a auditoria de SQL ligada (tests/pytest_sql.py).
+
+Rodar na raiz do projeto:
+    python -m pytest -q
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+pytest_plugins = ["tests.pytest_sql"]
+
+# Config lê o ambiente no import: tudo aqui precisa vir antes do primeiro `import app`
+_TMP = tempfile.mkdtemp(prefix="nutri_testes_")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_TMP, "testes.db")
+os.environ["DATA_DIR"] = os.path.join(_TMP, "dados")
+# "null": sem cache de páginas/consultas, cada requisição roda (e conta) todo o seu SQL
+os.environ["CACHE_BACKEND"] = "null"
+os.environ["SQL_AUDIT"] = "log"
+os.environ.pop("DATABASE_REPLICA_URL", None)
+
+N_HOSPITAIS = 12
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TMP, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from bench.gerar_dados import gerar
+
+    gerar(os.environ["DATA_DIR"], N_HOSPITAIS, contatos=3, produtos=4, dados=1.0, produtos_por_marca=8)
+
+    from app import create_app, db
+    from app import query_audit
+
+    from app.cache import NullBackend, cache
+
+    app = create_app()
+    app.config["TESTING"] = True
+    # backend desconhecido cai no lru sem avisar: aqui tem que ser o null
+    assert isinstance(cache.backend, NullBackend)
+    with app.app_context():
+        db.create_all()
+
+    c = app.test_client()
+    with c.session_transaction() as s:
+        s["is_admin"] = True
+    r = c.post("/admin/importar_excel_uma_vez")
+    assert r.status_code == 302, r.data[:500]
+
+    # a importação não é o que está sendo medido
+    query_audit.pop_violations()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    c = app.test_client()
+    with c.session_transaction() as s:
+        s["is_admin"] = True
+    return c
+
+
+@pytest.fixture
+def ids(app):
+    """
+    Um hospital com contatos e produtos, e um produto do catálogo.
+    """
+    from app import db
+    from app.models import Contato, Hospital, Marca, Produto, ProdutoHospital
+
+    with app.app_context():
+        produto = Produto.query.order_by(Produto.id).first()
+        h = Hospital.query.join(Contato).join(ProdutoHospital).order_by(Hospital.id).first()
+        assert h is not None
+        return {
+            "hospital": h.id,
+            "contato": Contato.query.filter_by(hospital_id=h.id).order_by(Contato.id).first().id,
+            "produto_hospital": ProdutoHospital.query.filter_by(hospital_id=h.id).order_by(ProdutoHospital.id).first().id,
+            "produto": produto.id,
+            "produto_nome": produto.nome,
+            "marca": db.session.get(Marca, produto.marca_id).nome,
+            "uf": h.uf_key,
+            "cidade": h.cidade_key,
+        }
@@ -0,0 +1,36 @@
+# tests/pytest_sql.py
+"""
+Plugin do pytest: o teste falha se alguma requisição feita por ele estourar o
+orçamento de SQL da rota ou tiver N+1 provável (ver app/query_audit.py).
+
+Carregado pelo tests/conftest.py (pytest_plugins); fica fora do pacote `app`
+porque só serve aos testes.
+
+Para liberar um teste específico:
+    @pytest.mark.sem_auditoria_sql
+"""
+import os
+
+import pytest
+
+from app import query_audit
+
+
+def pytest_configure(config):
+    # precisa estar no ambiente ANTES do create_app das fixtures
+    os.environ.setdefault("SQL_AUDIT", "log")
+    config.addinivalue_line("markers", "sem_auditoria_sql: não falha o teste por orçamento de SQL / N+1")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    query_audit.pop_violations()
+    result = yield
+    encontradas = query_audit.pop_violations()
+    if encontradas and item.get_closest_marker("sem_auditoria_sql") is None:
+        linhas = []
+        for v in encontradas:
+            linhas.append(f"{v['method']} {v['path']} ({v['endpoint']})")
+            linhas.extend(f"    - {p}" for p in v["problemas"])
+        pytest.fail("Auditoria de SQL:\n" + "\n".join(linhas), pytrace=False)
+    return result
@@ -0,0 +1,37 @@
+# tests/test_entidades.py
+"""
+Grupos de duplicados: a nota de cada membro é contra o principal do grupo.
+"""
+from app.entidades import IndiceBlocagem, Registro, propor_duplicados, similaridade
+
+# A~B e B~C acima do limiar, A~C abaixo: C só entra no grupo de A através de B
+A = Registro(1, "HOSPITAL SAO LUCAS DA PROVIDENCIA")
+B = Registro(2, "HOSPITAL SAO LUCAS DA PROVIDENCIA CENTRAL")
+C = Registro(3, "HOSPITAL SAO LUCAS PROVIDENCIA CENTRAL NORTE")
+LIMIAR = 0.7
+
+
+def test_cadeia_de_exemplo():
+    assert similaridade(A, B) >= LIMIAR
+    assert similaridade(B, C) > similaridade(A, B)
+    assert similaridade(A, C) < LIMIAR
+
+
+def test_nota_contra_o_principal():
+    (grupo,) = propor_duplicados(LIMIAR, IndiceBlocagem([A, B, C], LIMIAR))
+    assert grupo["principal"]["id"] == A.id
+
+    notas = {d["id"]: d["score"] for d in grupo["duplicados"]}
+    assert notas == {B.id: round(similaridade(A, B), 3), C.id: round(similaridade(A, C), 3)}
+    # --aplicar-acima 0.8: antes C (0.83 contra B) seria mesclado em A; agora ninguém
+    assert [i for i, s in notas.items() if s >= 0.8] == []
+    assert [i for i, s in notas.items() if s >= LIMIAR] == [B.id]
+
+
+def test_mesma_chave_de_cidade_e_cep_que_os_territorios():
+    from app.territorios import cidade_chave
+
+    r = Registro(None, "HOSPITAL X", cidade="Sta. Bárbara d'Oeste", cep="13450-000")
+    assert r.cidade == cidade_chave("Sta. Bárbara d'Oeste") == "STA BARBARA DOESTE"
+    assert r.cep == "13450"
+    assert Registro(None, "HOSPITAL X").cep is None
@@ -0,0 +1,18 @@
+# tests/test_http_cache.py
+"""
+GET condicional: só a ETag dá 304.
+"""
+
+
+def test_etag_da_304(client):
+    r = client.get("/hospitais")
+    assert r.status_code == 200
+    r2 = client.get("/hospitais", headers={"If-None-Match": r.headers["ETag"]})
+    assert r2.status_code == 304
+
+
+def test_if_modified_since_sozinho_nao_da_304(client):
+    r = client.get("/hospitais")
+    assert r.headers.get("Last-Modified")
+    r2 = client.get("/hospitais", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert r2.status_code == 200
@@ -0,0 +1,50 @@
+# tests/test_lifecycle.py
+"""
+Readiness do worker sem preload: /ready é 503 enquanto o aquecimento roda.
+"""
+import threading
+
+import pytest
+
+from app import lifecycle
+
+
+@pytest.fixture
+def etapa_lenta(monkeypatch):
+    liberar = threading.Event()
+
+    def lenta(app):
+        assert liberar.wait(10)
+
+    monkeypatch.setattr(lifecycle, "_WARMERS", [("lenta", lenta)])
+    monkeypatch.setattr(lifecycle, "_STATE", dict(lifecycle._STATE))
+    yield liberar
+    liberar.set()
+
+
+def test_ready_503_ate_o_aquecimento_terminar(app, client, etapa_lenta):
+    t = lifecycle.warm_up_worker(app)
+    r = client.get("/ready")
+    assert r.status_code == 503
+    assert r.get_json()["status"] == "aquecendo"
+    assert client.get("/ping").status_code == 200
+
+    etapa_lenta.set()
+    t.join(10)
+    r = client.get("/ready")
+    assert r.status_code == 200
+    assert r.get_json()["status"] == "pronto"
+
+
+def test_etapa_com_erro_conta_como_pronto(app, client, monkeypatch):
+    def quebra(app):
+        raise RuntimeError("sem planilha")
+
+    monkeypatch.setattr(lifecycle, "_WARMERS", [("quebra", quebra)])
+    monkeypatch.setattr(lifecycle, "_STATE", dict(lifecycle._STATE))
+    lifecycle.warm_up_worker(app).join(10)
+
+    r = client.get("/ready")
+    assert r.status_code == 200
+    assert r.get_json()["status"] == "erro"
+    assert r.get_json()["erros"] == ["quebra: sem planilha"]
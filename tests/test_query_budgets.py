@@ -0,0 +1,93 @@
+# tests/test_query_budgets.py
+"""
+Toda rota com @query_budget passa aqui pelo menos uma vez: o plugin
+tests/pytest_sql.py derruba o teste se ela estourar o orçamento ou fizer N+1.
+"""
+import pytest
+
+from app import query_audit
+
+
+# ======================================================
+# GET
+# ======================================================
+PAGINAS = [
+    "/hospitais",
+    "/hospitais/{hospital}/info",
+    "/hospitais/{hospital}/contatos",
+    "/hospitais/{hospital}/dados",
+    "/hospitais/{hospital}/produtos",
+    "/hospitais/{hospital}/produtos/editar",
+    "/hospitais/{hospital}/relatorios",
+    "/hospitais/{hospital}/oportunidades",
+    "/hospitais/{hospital}/relatorios/pdf",
+    "/relatorios",
+    "/territorios",
+    "/territorios/{uf}",
+    "/territorios/{uf}/{cidade}",
+    "/api/hospitais",
+    "/api/hospitais?fields=id,nome_hospital,contatos,produtos,dados",
+    "/api/hospitais/batch?ids={hospital},1,2,3",
+    "/api/hospitais/{hospital}",
+    "/api/changes?limit=50",
+    "/api/changes?dados=1&limit=50",
+    "/api/produtos/{produto}/equivalentes",
+]
+
+
+@pytest.mark.parametrize("url", PAGINAS)
+def test_get_dentro_do_orcamento(client, ids, url):
+    r = client.get(url.format(**ids))
+    assert r.status_code == 200, r.data[:500]
+    assert "X-SQL-Queries" in r.headers
+
+
+# ======================================================
+# POST
+# ======================================================
+def test_contatos_lote(client, ids):
+    texto = "Nome\tCargo\tTelefone\nAna Souza\tNutricionista\t(31) 99999-0001\nBruno Lima\tCompras\t(31) 99999-0002\n"
+    r = client.post(f"/hospitais/{ids['hospital']}/contatos/lote", data={"colar": texto})
+    assert r.status_code == 302
+
+
+def test_produtos_lote(client, ids):
+    r = client.post(
+        f"/hospitais/{ids['hospital']}/produtos/lote",
+        data={
+            "lote_marca": [ids["marca"], ids["marca"]],
+            "lote_produto": [ids["produto_nome"], ids["produto_nome"]],
+            "lote_quantidade": ["10", "20"],
+        },
+    )
+    assert r.status_code == 302
+
+
+def test_relatorio_csv(client, ids):
+    r = client.post("/relatorios/csv", data={"hospital_id": ids["hospital"]})
+    assert r.status_code == 200
+    assert r.mimetype == "text/csv"
+
+
+def test_excluir_produto(client, ids):
+    r = client.post(f"/hospitais/{ids['hospital']}/produtos/{ids['produto_hospital']}/excluir")
+    assert r.status_code == 302
+
+
+def test_excluir_contato(client, ids):
+    r = client.post(f"/hospitais/{ids['hospital']}/contatos/{ids['contato']}/excluir")
+    assert r.status_code == 302
+
+
+# ======================================================
+# O PRÓPRIO PLUGIN
+# ======================================================
+def test_orcamento_estourado_vira_violacao(app, client):
+    app.config["SQL_QUERY_BUDGETS"] = {"main.relatorios_geral": 0}
+    try:
+        client.get("/relatorios")
+    finally:
+        app.config["SQL_QUERY_BUDGETS"] = {}
+    # consome as violações aqui para o plugin não reprovar este teste
+    encontradas = query_audit.pop_violations()
+    assert any(v["endpoint"] == "main.relatorios_geral" for v in encontradas)
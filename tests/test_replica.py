@@ -0,0 +1,79 @@
+# tests/test_replica.py
+"""
+Primário e réplica em dois arquivos SQLite (a réplica é uma cópia feita na hora).
+"""
+import pytest
+
+from config import Config
+
+
+@pytest.fixture
+def replica_app(app, tmp_path, monkeypatch):
+    from app import create_app, db
+    from app.models import Hospital
+
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'primario.db'}")
+    monkeypatch.setattr(Config, "SQLALCHEMY_BINDS", {"replica": f"sqlite:///{tmp_path / 'replica.db'}"})
+
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        db.session.add(Hospital(nome_hospital="HOSPITAL REPLICA", cidade="BELO HORIZONTE", estado="MG"))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def _copiar_replica(app):
+    from app.replica import copiar_replica_cmd
+
+    r = app.test_cli_runner().invoke(copiar_replica_cmd)
+    assert r.exit_code == 0, r.output
+
+
+def _hospital_id(app):
+    from app.models import Hospital
+
+    with app.app_context():
+        return Hospital.query.filter_by(nome_hospital="HOSPITAL REPLICA").one().id
+
+
+def test_dados_com_replica_sem_a_linha(replica_app):
+    from app import db
+    from app.models import DadosHospital
+
+    hid = _hospital_id(replica_app)
+    _copiar_replica(replica_app)
+    # a linha de dados só existe no primário (réplica atrasada)
+    with replica_app.app_context():
+        db.session.add(DadosHospital(hospital_id=hid, respostas={"leitos": "321"}))
+        db.session.commit()
+
+    r = replica_app.test_client().get(f"/hospitais/{hid}/dados")
+    assert r.status_code == 200
+    assert r.headers["X-DB-Route"] == "primary"
+    assert b"321" in r.data
+
+
+def test_dados_com_replica_em_versao_velha(replica_app):
+    from app import db
+    from app.models import DadosHospital
+
+    hid = _hospital_id(replica_app)
+    with replica_app.app_context():
+        db.session.add(DadosHospital(hospital_id=hid, respostas={"leitos": "100"}))
+        db.session.commit()
+    _copiar_replica(replica_app)
+    with replica_app.app_context():
+        dados = DadosHospital.query.filter_by(hospital_id=hid).one()
+        dados.respostas = {**dados.respostas, "leitos": "200"}
+        db.session.commit()
+
+    r = replica_app.test_client().get(f"/hospitais/{hid}/dados")
+    assert r.status_code == 200
+    assert r.headers["X-DB-Route"] == "primary"
+    assert b"200" in r.data
+    assert "Não consegui carregar".encode() not in r.data